@@ -68,12 +68,16 @@ with GenerateOHLCV(
 
     print("------------ end ------------\n")
 
-    # cycle = 3
-    # for i in range(x):
-    #     print("Exchange:", exchange, "\n")
-    #     print("Number of Cycle: ", i + 1)
-    #     print(ohlcv_object.timeframe_release())
+### To keep the files fresh, refresh just after each candle close instead of polling:
+from TF_Generator.GenerateDaemon import RefreshDaemon
 
-    #     print("------------ end ------------\n")
-    #     if i + 1 < cycle:
-    #         time.sleep(5)
+daemon = RefreshDaemon(jobs=[(exchange, symbol, interval, num_candles)])
+daemon.start()
+try:
+    while True:
+        time.sleep(60)
+        for key, job_stats in daemon.stats().items():
+            print(key, job_stats)
+        print("------------ end ------------\n")
+except KeyboardInterrupt:
+    daemon.stop()
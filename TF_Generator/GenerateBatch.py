@@ -0,0 +1,239 @@
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import threading
+import time
+import sys
+import os
+
+file_path = os.path.abspath(__file__)
+folder_path = os.path.dirname(file_path)
+app_directory = os.path.abspath(os.path.join(folder_path, os.pardir))
+# app_directory = os.path.abspath(os.path.join(file_path, "../.."))
+# print(app_directory)
+
+sys.path.append(app_directory)
+from TF_Generator.GenerateTimeFrame import GenerateOHLCV
+from TF_Generator.OrganizerDataFrame import DataFrameOrg
+from TF_Generator.OrganizerTimeFrame import TimeFrameOrg
+from TF_Generator.ManagerInputs import InputsManager
+from TF_Generator.ManagerLogger import LoggerManager
+from TF_Generator.ManagerTime import TimeManager, TIMEZONE
+from TF_Generator.ManagerFile import FileManager, DEFAULT_STORAGE_FORMAT
+
+APP_DIRECTORY = app_directory
+### DEFAULT_BATCH_WORKERS (int): Number of jobs refreshed concurrently.
+DEFAULT_BATCH_WORKERS = 16
+
+
+class GenerateBatchOHLCV:
+    """
+    Class for generating OHLCV (Open, High, Low, Close, Volume) data of many symbols and exchanges at once.
+
+    All jobs share one logger, one set of managers/organizers (per exchange, timeframe and number of candles),
+    and the pooled HTTP sessions and request scheduler of HistoryOHLCV.
+    Jobs are refreshed concurrently on a bounded worker pool.
+
+    Attributes:
+        - jobs (list): Jobs as (exchange, symbol, timeframe, num_candles) tuples or dicts with the same keys.
+        - data_directory (str): Directory path to store the OHLCV DataFrame files.
+        - max_workers (int): Number of jobs refreshed concurrently.
+        - storage_format (str): Storage format of the OHLCV DataFrame files.
+        - compact (bool): Flag to keep the series in the compact representation.
+        - timezone (str): Display timezone of the released DataFrames.
+        - report (dict): Result of each job of the last batch_release, keyed like the returned frames.
+
+    Methods:
+        - __init__(jobs: list, data_directory: str, max_workers: int, storage_format: str, compact: bool, timezone: str, logger: LoggerManager): Initializes the GenerateBatchOHLCV instance.
+        - _shared_instances(exchange: str, timeframe: str, num_candles: int) -> dict: Returns the instances shared by the jobs of the same kind.
+        - _run_job(job: dict) -> pd.DataFrame: Refreshes and saves one job.
+        - batch_release() -> dict: Refreshes all jobs and returns their timeframe DataFrames.
+    """
+
+    DEFAULT_APP_DIRECTORY = APP_DIRECTORY
+
+    def __init__(
+        self,
+        jobs: list,
+        data_directory=DEFAULT_APP_DIRECTORY,
+        max_workers: int = DEFAULT_BATCH_WORKERS,
+        storage_format: str = DEFAULT_STORAGE_FORMAT,
+        compact: bool = False,
+        timezone: str = TIMEZONE,
+        logger=None,
+    ):
+        """
+        Initialize GenerateBatchOHLCV class.
+
+        Parameters:
+            - jobs (list): Jobs as (exchange, symbol, timeframe, num_candles) tuples or dicts with the same keys.
+            - data_directory (str): Directory path to store the OHLCV DataFrame files.
+            - max_workers (int): Number of jobs refreshed concurrently.
+            - storage_format (str): Storage format of the OHLCV DataFrame files ("parquet", "feather", "csv", "mmap", "partitioned", "sqlite").
+            - compact (bool): Flag to keep the series in the compact representation (float32 values, no TimeStamp column).
+            - timezone (str): Display timezone of the released DataFrames, see GenerateOHLCV (default TIMEZONE).
+            - logger (LoggerManager): Shared logger instance (optional).
+        """
+        self.jobs = [self._normalize_job(job) for job in jobs]
+        self.data_directory = data_directory
+        self.max_workers = max_workers
+        self.storage_format = storage_format
+        self.compact = compact
+        self.timezone = timezone
+        self.logger = logger if logger is not None else LoggerManager()
+        self.logger.logger.warning(f"--- Start : Class {self.__class__.__name__} ---")
+
+        self.report = {}
+        self._instances = {}
+        self._instances_lock = threading.Lock()
+        self._df_organizer_instance = DataFrameOrg(logger=self.logger)
+
+    @staticmethod
+    def _normalize_job(job) -> dict:
+        """
+        Converts a job tuple to a dict with exchange, symbol, timeframe and num_candles keys.
+        """
+        if isinstance(job, dict):
+            return {
+                "exchange": job["exchange"],
+                "symbol": job["symbol"],
+                "timeframe": job["timeframe"],
+                "num_candles": job["num_candles"],
+            }
+        exchange, symbol, timeframe, num_candles = job
+        return {
+            "exchange": exchange,
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "num_candles": num_candles,
+        }
+
+    @staticmethod
+    def _job_key(job: dict) -> tuple:
+        return job["exchange"], job["symbol"], job["timeframe"]
+
+    def _shared_instances(self, exchange: str, timeframe: str, num_candles: int) -> dict:
+        """
+        Returns the instances shared by the jobs of the same exchange, timeframe and number of candles.
+
+        Returns:
+            dict: Instances keyed by GenerateOHLCV attribute name.
+        """
+        with self._instances_lock:
+            if exchange not in self._instances:
+                self._instances[exchange] = {
+                    "file_manager_instance": FileManager(
+                        data_directory=os.path.join(self.data_directory, exchange),
+                        logger=self.logger,
+                        storage_format=self.storage_format,
+                    ),
+                    "tf_organizer_instance": TimeFrameOrg(
+                        exchange=exchange, logger=self.logger, timezone=self.timezone
+                    ),
+                }
+            key = (exchange, timeframe, num_candles)
+            if key not in self._instances:
+                self._instances[key] = {
+                    "reg_input_values_instance": InputsManager(
+                        timeframe=timeframe,
+                        exchange=exchange,
+                        num_candles=num_candles,
+                        logger=self.logger,
+                    ),
+                    "time_manager_instance": TimeManager(
+                        timeframe=timeframe,
+                        exchange=exchange,
+                        num_candles=num_candles,
+                        logger=self.logger,
+                        timezone=self.timezone,
+                    ),
+                }
+            return {
+                **self._instances[exchange],
+                **self._instances[key],
+                "df_organizer_instance": self._df_organizer_instance,
+            }
+
+    def _run_job(self, job: dict) -> pd.DataFrame:
+        """
+        Refreshes one job and saves its files.
+
+        Returns:
+            pd.DataFrame: The timeframe DataFrame of the job.
+        """
+        with GenerateOHLCV(
+            symbol=job["symbol"],
+            timeframe=job["timeframe"],
+            exchange=job["exchange"],
+            num_candles=job["num_candles"],
+            data_directory=self.data_directory,
+            storage_format=self.storage_format,
+            compact=self.compact,
+            timezone=self.timezone,
+            logger=self.logger,
+            shared_instances=self._shared_instances(
+                exchange=job["exchange"],
+                timeframe=job["timeframe"],
+                num_candles=job["num_candles"],
+            ),
+        ) as ohlcv_object:
+            return ohlcv_object.timeframe_release()
+
+    def _run_job_report(self, job: dict) -> (pd.DataFrame, dict):
+        start_time = time.monotonic()
+        try:
+            ohlcv_tf = self._run_job(job)
+            if ohlcv_tf is None or ohlcv_tf.empty:
+                result = {"status": "failed", "error": "No data was released."}
+            else:
+                result = {"status": "ok", "error": None, "rows": len(ohlcv_tf)}
+        except SystemExit:
+            ### InputsManager exits on invalid input values
+            ohlcv_tf = None
+            result = {"status": "failed", "error": "Invalid input values."}
+        except Exception as e:
+            ohlcv_tf = None
+            result = {"status": "failed", "error": str(e) or e.__class__.__name__}
+        if result["status"] != "ok":
+            self.logger.logger.error(f"batch job {self._job_key(job)}: {result['error']}")
+        result["seconds"] = time.monotonic() - start_time
+        return ohlcv_tf, result
+
+    def batch_release(self) -> dict:
+        """
+        Refreshes all jobs concurrently and saves their files.
+        The result of each job is kept in the report attribute.
+
+        Returns:
+            dict: Timeframe DataFrames keyed by (exchange, symbol, timeframe); failed jobs map to None.
+        """
+        self.logger.logger.info("batch_release (function)")
+
+        frames = {}
+        self.report = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(self._run_job_report, self.jobs)
+            for job, (ohlcv_tf, result) in zip(self.jobs, results):
+                frames[self._job_key(job)] = ohlcv_tf
+                self.report[self._job_key(job)] = result
+
+        failed = [key for key, result in self.report.items() if result["status"] != "ok"]
+        self.logger.logger.info(
+            f"batch_release: {len(self.jobs) - len(failed)} ok, {len(failed)} failed"
+        )
+        return frames
+
+
+if __name__ == "__main__":
+    jobs = [
+        ("BingX", "BTC-USDT", "5min", 1000),
+        ("BingX", "ETH-USDT", "5min", 1000),
+        ("Binance", "BTCUSDT", "15min", 500),
+        ("Wallex", "BTCUSDT", "1H", 200),
+    ]
+
+    batch = GenerateBatchOHLCV(jobs=jobs)
+    frames = batch.batch_release()
+    for key, ohlcv_tf in frames.items():
+        print(key, batch.report[key])
+        print(ohlcv_tf)
+        print("------------ end ------------\n")
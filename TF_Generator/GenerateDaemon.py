@@ -0,0 +1,402 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import heapq
+import time
+import sys
+import os
+
+file_path = os.path.abspath(__file__)
+folder_path = os.path.dirname(file_path)
+app_directory = os.path.abspath(os.path.join(folder_path, os.pardir))
+# app_directory = os.path.abspath(os.path.join(file_path, "../.."))
+# print(app_directory)
+
+sys.path.append(app_directory)
+from TF_Generator.GenerateBatch import GenerateBatchOHLCV
+from TF_Generator.GenerateTimeFrame import GenerateOHLCV
+from TF_Generator.ManagerFile import DEFAULT_STORAGE_FORMAT
+from TF_Generator.ManagerLogger import LoggerManager
+from TF_Generator.ManagerTime import TimeManager, TIMEZONE
+
+APP_DIRECTORY = app_directory
+### DEFAULT_GRACE_SECONDS (float): Delay after a candle close before its job is refreshed, so the exchange has published the candle.
+DEFAULT_GRACE_SECONDS = 1.0
+### DEFAULT_LATENCY_BUDGET (float): Freshness latency (seconds after a close) above which a refresh is logged as late.
+DEFAULT_LATENCY_BUDGET = 10.0
+### DEFAULT_DAEMON_WORKERS (int): Number of jobs refreshed concurrently.
+DEFAULT_DAEMON_WORKERS = 8
+### DEFAULT_LATE_RETRY_SECONDS (float): Delay before a job whose closed candle was not delivered yet is refreshed again.
+DEFAULT_LATE_RETRY_SECONDS = 2.0
+### DEFAULT_LATE_RETRIES (int): Number of retries for a closed candle not delivered yet, before waiting for the next close.
+DEFAULT_LATE_RETRIES = 5
+
+
+class RefreshDaemon:
+    """
+    Long-running scheduler that refreshes OHLCV jobs just after their candles close.
+
+    Each job waits in a priority queue ordered by (wake time, priority). The wake time is the next close
+    of the job timeframe (TimeManager._next_close_time) plus a grace delay. Due jobs are refreshed
+    with timeframe_release (which calls dataframe_release) and their files are saved.
+    The freshness latency (time from the candle close to the saved refresh) is recorded per job.
+    A job whose closed candle was not delivered yet is refreshed again after a short delay, a few times,
+    before it waits for the next close.
+
+    Attributes:
+        - jobs (list): Jobs as (exchange, symbol, timeframe, num_candles[, priority]) tuples or dicts with the same keys.
+        - data_directory (str): Directory path to store the OHLCV DataFrame files.
+        - grace_seconds (float): Delay after a candle close before its job is refreshed.
+        - latency_budget (float): Freshness latency above which a refresh is logged as late.
+        - max_workers (int): Number of jobs refreshed concurrently.
+        - late_retry_seconds (float): Delay before a job whose closed candle was not delivered is refreshed again.
+        - late_retries (int): Number of retries for a closed candle not delivered, before waiting for the next close.
+        - storage_format (str): Storage format of the OHLCV DataFrame files.
+        - compact (bool): Flag to keep the series in the compact representation.
+        - timezone (str): Display timezone of the released DataFrames.
+
+    Methods:
+        - __init__(jobs: list, data_directory: str, grace_seconds: float, latency_budget: float, max_workers: int, late_retry_seconds: float, late_retries: int, storage_format: str, compact: bool, timezone: str, logger: LoggerManager): Initializes the RefreshDaemon instance.
+        - _requeue(job: dict, future) -> None: Queues a job again for its next close (or a retry) when its refresh completes.
+        - run(max_cycles: int = None) -> None: Refreshes the due jobs until stopped (blocking).
+        - start() -> threading.Thread: Runs the daemon in a background thread.
+        - stop() -> None: Stops the daemon and saves the files of all jobs.
+        - stats() -> dict: Returns the freshness statistics of each job.
+    """
+
+    DEFAULT_APP_DIRECTORY = APP_DIRECTORY
+
+    def __init__(
+        self,
+        jobs: list,
+        data_directory=DEFAULT_APP_DIRECTORY,
+        grace_seconds: float = DEFAULT_GRACE_SECONDS,
+        latency_budget: float = DEFAULT_LATENCY_BUDGET,
+        max_workers: int = DEFAULT_DAEMON_WORKERS,
+        late_retry_seconds: float = DEFAULT_LATE_RETRY_SECONDS,
+        late_retries: int = DEFAULT_LATE_RETRIES,
+        storage_format: str = DEFAULT_STORAGE_FORMAT,
+        compact: bool = False,
+        timezone: str = TIMEZONE,
+        logger=None,
+    ):
+        """
+        Initialize RefreshDaemon class.
+
+        Parameters:
+            - jobs (list): Jobs as (exchange, symbol, timeframe, num_candles[, priority]) tuples or dicts with the same keys.
+              A lower priority is refreshed first when jobs are due at the same time (default 0).
+            - data_directory (str): Directory path to store the OHLCV DataFrame files.
+            - grace_seconds (float): Delay after a candle close before its job is refreshed.
+            - latency_budget (float): Freshness latency above which a refresh is logged as late.
+            - max_workers (int): Number of jobs refreshed concurrently.
+            - late_retry_seconds (float): Delay before a job whose closed candle was not delivered yet is refreshed again.
+            - late_retries (int): Number of retries for a closed candle not delivered yet, before waiting for the next close.
+            - storage_format (str): Storage format of the OHLCV DataFrame files ("parquet", "feather", "csv", "mmap", "partitioned", "sqlite").
+            - compact (bool): Flag to keep the series in the compact representation (float32 values, no TimeStamp column).
+            - timezone (str): Display timezone of the released DataFrames, see GenerateOHLCV (default TIMEZONE).
+            - logger (LoggerManager): Shared logger instance (optional).
+        """
+        self.logger = logger if logger is not None else LoggerManager()
+        self.logger.logger.warning(f"--- Start : Class {self.__class__.__name__} ---")
+
+        self.jobs = [self._normalize_job(job) for job in jobs]
+        self.data_directory = data_directory
+        self.grace_seconds = grace_seconds
+        self.latency_budget = latency_budget
+        self.max_workers = max_workers
+        self.late_retry_seconds = late_retry_seconds
+        self.late_retries = late_retries
+        self.storage_format = storage_format
+        self.compact = compact
+        self.timezone = timezone
+
+        ### Managers and organizers are shared like in a batch
+        self._batch = GenerateBatchOHLCV(
+            jobs=[],
+            data_directory=data_directory,
+            storage_format=storage_format,
+            timezone=timezone,
+            logger=self.logger,
+        )
+        self._generators = {}
+        self._stats = {}
+        self._queue = []
+        self._sequence = 0
+        self._in_flight = 0
+        self._queue_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _normalize_job(job) -> dict:
+        """
+        Converts a job tuple to a dict with exchange, symbol, timeframe, num_candles and priority keys.
+        """
+        if isinstance(job, dict):
+            priority = job.get("priority", 0)
+        else:
+            priority = job[4] if len(job) > 4 else 0
+            job = job[:4]
+        normalized_job = GenerateBatchOHLCV._normalize_job(job)
+        normalized_job["priority"] = priority
+        return normalized_job
+
+    @staticmethod
+    def _job_key(job: dict) -> tuple:
+        return job["exchange"], job["symbol"], job["timeframe"]
+
+    def _push(
+        self, wake_time: float, job: dict, close_time: int = None, attempt: int = 0
+    ) -> None:
+        ### The sequence number keeps the heap from comparing job dicts
+        self._sequence += 1
+        heapq.heappush(
+            self._queue,
+            (wake_time, job["priority"], self._sequence, close_time, attempt, job),
+        )
+
+    def _generator(self, job: dict) -> GenerateOHLCV:
+        """
+        Returns the long-lived generator of a job, creating it on first use.
+        """
+        key = self._job_key(job)
+        if key not in self._generators:
+            self._generators[key] = GenerateOHLCV(
+                symbol=job["symbol"],
+                timeframe=job["timeframe"],
+                exchange=job["exchange"],
+                num_candles=job["num_candles"],
+                data_directory=self.data_directory,
+                storage_format=self.storage_format,
+                compact=self.compact,
+                timezone=self.timezone,
+                logger=self.logger,
+                shared_instances=self._batch._shared_instances(
+                    exchange=job["exchange"],
+                    timeframe=job["timeframe"],
+                    num_candles=job["num_candles"],
+                ),
+            )
+        return self._generators[key]
+
+    def _period_seconds(self, generator: GenerateOHLCV) -> int:
+        """
+        Returns the length of one candle of the job timeframe in seconds,
+        or None when it is not a fixed number of seconds (W, M).
+        """
+        reg_input_values_instance = generator.reg_input_values_instance
+        unit_seconds = TimeManager.SECONDS_TIME_UNIT.get(
+            reg_input_values_instance.raw_unit
+        )
+        if unit_seconds is None:
+            return None
+        return reg_input_values_instance._numeric_value() * unit_seconds
+
+    @staticmethod
+    def _delivered(generator: GenerateOHLCV, close_time: int) -> bool:
+        """
+        Checks if the series of the job reaches the base candle that closed at close_time.
+        """
+        ohlcv_df = generator.ohlcv_df
+        if ohlcv_df is None or ohlcv_df.empty:
+            return False
+        seconds_time_unit = generator.time_manager_instance.seconds_time_unit
+        return int(ohlcv_df.index.asi8[-1] // 10**9) >= close_time - seconds_time_unit
+
+    def _refresh(self, job: dict, close_time: int = None, attempt: int = 0) -> tuple:
+        """
+        Refreshes one job, saves its files and records its freshness latency.
+
+        Returns:
+            Tuple[float, int, int]: The next wake time, the close time it refreshes and the retry attempt,
+            or None when the job is not queued again.
+        """
+        key = self._job_key(job)
+        stats = self._stats.setdefault(
+            key,
+            {
+                "refreshes": 0,
+                "failures": 0,
+                "late": 0,
+                "retries": 0,
+                "last_latency": None,
+                "max_latency": 0.0,
+                "total_latency": 0.0,
+                "next_close": None,
+            },
+        )
+        try:
+            generator = self._generator(job)
+            generator.timeframe_release()
+            generator._save_files()
+            refreshed = generator.ohlcv_df is not None
+        except SystemExit:
+            ### InputsManager exits on invalid input values
+            self.logger.logger.error(f"daemon job {key}: Invalid input values.")
+            return None
+        except Exception as e:
+            self.logger.logger.error(f"daemon job {key}: {str(e)}")
+            refreshed = False
+
+        if not refreshed:
+            stats["failures"] += 1
+        elif close_time is not None and not self._delivered(generator, close_time):
+            ### The release did not bring the candle that closed, no freshness latency to record
+            if attempt < self.late_retries:
+                stats["retries"] += 1
+                self.logger.logger.info(
+                    f"daemon job {key}: candle closed at {close_time} not delivered, retry {attempt + 1}"
+                )
+                return time.time() + self.late_retry_seconds, close_time, attempt + 1
+            stats["late"] += 1
+            self.logger.logger.warning(
+                f"daemon job {key}: candle closed at {close_time} not delivered"
+            )
+        elif close_time is not None:
+            latency = time.time() - close_time
+            stats["refreshes"] += 1
+            stats["last_latency"] = latency
+            stats["max_latency"] = max(stats["max_latency"], latency)
+            stats["total_latency"] += latency
+            if latency > self.latency_budget:
+                stats["late"] += 1
+                self.logger.logger.warning(
+                    f"daemon job {key}: refreshed {latency:.2f}s after close"
+                )
+
+        generator = self._generators.get(key)
+        if generator is None:
+            return None
+        next_close = generator.time_manager_instance._next_close_time(
+            period_seconds=self._period_seconds(generator)
+        )
+        stats["next_close"] = next_close
+        return next_close + self.grace_seconds, next_close, 0
+
+    def _requeue(self, job: dict, future) -> None:
+        """
+        Queues a job again for its next close (or a retry), called in the worker thread as soon as its refresh completes.
+        """
+        try:
+            next_wake = future.result()
+        except Exception as e:
+            self.logger.logger.error(f"daemon job {self._job_key(job)}: {str(e)}")
+            next_wake = None
+        with self._queue_lock:
+            self._in_flight -= 1
+            if next_wake is not None:
+                wake_time, close_time, attempt = next_wake
+                self._push(wake_time, job, close_time, attempt)
+        self._wakeup.set()
+
+    def run(self, max_cycles: int = None) -> None:
+        """
+        Refreshes all jobs once, then each job just after every close of its timeframe, until stopped.
+        Each job is queued again as soon as its own refresh completes, so a slow refresh
+        does not delay the next close of the other jobs.
+
+        Parameters:
+            - max_cycles (int): Number of wake-ups after which the daemon returns (optional).
+        """
+        self.logger.logger.info("run (function)")
+
+        self._stop_event.clear()
+        start_time = time.time()
+        with self._queue_lock:
+            self._queue = []
+            self._in_flight = 0
+            for job in self.jobs:
+                self._push(start_time, job)
+
+        cycles = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while not self._stop_event.is_set():
+                self._wakeup.clear()
+                with self._queue_lock:
+                    if not self._queue and not self._in_flight:
+                        break
+                    ### Pop every due job, in (wake time, priority) order
+                    due = []
+                    while self._queue and self._queue[0][0] <= time.time():
+                        _, _, _, close_time, attempt, job = heapq.heappop(self._queue)
+                        due.append((job, close_time, attempt))
+                    self._in_flight += len(due)
+                    delay = self._queue[0][0] - time.time() if self._queue else None
+
+                if not due:
+                    ### Woken up by the next wake time, a completed refresh or stop
+                    self._wakeup.wait(delay)
+                    continue
+
+                for job, close_time, attempt in due:
+                    executor.submit(
+                        self._refresh, job, close_time, attempt
+                    ).add_done_callback(
+                        lambda future, job=job: self._requeue(job, future)
+                    )
+
+                cycles += 1
+                if max_cycles is not None and cycles >= max_cycles:
+                    break
+
+    def start(self) -> threading.Thread:
+        """
+        Runs the daemon in a background thread.
+
+        Returns:
+            threading.Thread: The daemon thread.
+        """
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """
+        Stops the daemon and saves the files of all jobs.
+        """
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for generator in self._generators.values():
+            generator.__exit__(None, None, None)
+
+    def stats(self) -> dict:
+        """
+        Returns the freshness statistics of each job, keyed by (exchange, symbol, timeframe):
+        refreshes, failures, late (over latency_budget or not delivered after the retries),
+        retries (of closed candles not delivered yet), last/max/avg latency in seconds after the close,
+        and the next close time.
+
+        Returns:
+            dict: Statistics of each job.
+        """
+        stats = {}
+        for key, job_stats in self._stats.items():
+            refreshes = job_stats["refreshes"]
+            stats[key] = {
+                **job_stats,
+                "avg_latency": job_stats["total_latency"] / refreshes if refreshes else None,
+            }
+        return stats
+
+
+if __name__ == "__main__":
+    jobs = [
+        ("BingX", "BTC-USDT", "1min", 1000, 0),
+        ("BingX", "ETH-USDT", "5min", 1000, 1),
+        ("Binance", "BTCUSDT", "15min", 500, 1),
+    ]
+
+    daemon = RefreshDaemon(jobs=jobs)
+    daemon.start()
+    try:
+        while True:
+            time.sleep(60)
+            for key, job_stats in daemon.stats().items():
+                print(key, job_stats)
+            print("------------ end ------------\n")
+    except KeyboardInterrupt:
+        daemon.stop()
@@ -1,4 +1,9 @@
+from collections import OrderedDict
+import weakref
+import atexit
 import pandas as pd
+import numpy as np
+import threading
 import logging
 import time
 import sys
@@ -12,16 +17,21 @@ app_directory = os.path.abspath(os.path.join(folder_path, os.pardir))
 # print(app_directory)
 
 sys.path.append(app_directory)
-from TF_Generator.OrganizerDataFrame import DataFrameOrg
+from TF_Generator.OrganizerDataFrame import DataFrameOrg, CandleRingBuffer
 from TF_Generator.OrganizerTimeFrame import TimeFrameOrg
 from TF_Generator.ManagerInputs import InputsManager
+from TF_Generator.ManagerCache import CacheManager, SeriesCache
 from TF_Generator.ManagerLogger import LoggerManager
-from TF_Generator.HistoryFetch import HistoryOHLCV
-from TF_Generator.ManagerTime import TimeManager
-from TF_Generator.ManagerFile import FileManager
+from TF_Generator.HistoryFetch import HistoryOHLCV, CACHE_PAGE_LIMIT
+from TF_Generator.ManagerTime import TimeManager, TIMEZONE
+from TF_Generator.ManagerFile import FileManager, DEFAULT_STORAGE_FORMAT
 from datetime import datetime
 
 APP_DIRECTORY = app_directory
+### TF_MEMO_MAX_ENTRIES (int): Maximum number of released timeframe DataFrames memoized per instance (LRU).
+TF_MEMO_MAX_ENTRIES = 16
+### FRESH_RETRY_SECONDS (float): Seconds releases return the in-memory series when the exchange has not published the current candle yet.
+FRESH_RETRY_SECONDS = 1.0
 
 
 class GenerateOHLCV:
@@ -35,20 +45,48 @@ class GenerateOHLCV:
         - num_candles (int): Number of candles to fetch.
         - data_directory (str): Directory path to store the OHLCV DataFrame files.
         - enable_logging (bool): Flag to enable or disable logging.
+        - enable_cache (bool): Flag to enable or disable the on-disk cache of closed history pages.
+        - storage_format (str): Storage format of the OHLCV DataFrame files ("parquet", "feather", "csv", "mmap", "partitioned", "sqlite").
+        - compact (bool): Flag to keep the series in the compact representation (no TimeStamp column, float32 values).
+        - timezone (str): Display timezone of the released DataFrames, the series is kept in UTC.
+        - logger (LoggerManager): Shared logger instance (optional).
+        - shared_instances (dict): Manager/organizer instances shared with other generators (optional).
 
     Methods:
-        - __init__(symbol: str, timeframe: str, exchange: str, num_candles: int, data_directory: str, enable_logging: bool): Initializes the GenerateOHLCV instance.
+        - __init__(symbol: str, timeframe: str, exchange: str, num_candles: int, data_directory: str, enable_logging: bool, enable_cache: bool, storage_format: str, compact: bool, timezone: str, logger: LoggerManager, shared_instances: dict): Initializes the GenerateOHLCV instance.
         - __enter__(): Enter method for context management.
         - __exit__(exc_type, exc_value, traceback): Exit method for context management.
         - __del__(): Destructor, logs a message when the instance is deleted.
+        - _save_at_exit(): Saves the files of the instances not saved yet at interpreter exit.
+        - _load_series(): Loads the series of the requested window from the series cache or the file.
+        - ohlcv_df (pd.DataFrame): The OHLCV series, assigning a new DataFrame bumps ohlcv_version.
+        - _is_fresh() -> bool: Checks if the series was refreshed in the current candle period.
+        - _mark_fresh(): Remembers the candle boundary the series is refreshed to.
+        - _memo_get(new_timeframe: str, num_candles: int = None) -> pd.DataFrame | None: Returns a memoized timeframe DataFrame of the current series version.
+        - _memo_put(new_timeframe: str, ohlcv_tf: pd.DataFrame, num_candles: int = None): Memoizes a timeframe DataFrame of the current series version.
+        - _localize(ohlcv_dataframe: pd.DataFrame) -> pd.DataFrame: Returns a released DataFrame with its index in the display timezone.
+        - _save_files() -> bool: Saves the OHLCV DataFrame and the released timeframe DataFrames.
         - _fetch_market_history(symbol: str, interval: int, startTime: int, endTime: int) -> pd.DataFrame: Fetches market data from an external API.
         - _create_new_data(start_timestamp: int = None, end_timestamp: int = None) -> pd.DataFrame: Creates new OHLCV data.
         - _update_existing_data(existing_ohlcv_df: pd.DataFrame) -> pd.DataFrame: Updates existing OHLCV data.
+        - _release_source(ohlcv_dataframe: pd.DataFrame = None, function_name: str = None) -> tuple: Selects the DataFrame a release works on.
         - dataframe_release(existing_ohlcv_df: pd.DataFrame = None) -> pd.DataFrame: Releases OHLCV DataFrame, either by updating or creating new data.
-        - timeframe_release(ohlcv_dataframe: pd.DataFrame = None, new_timeframe: str = None) -> pd.DataFrame: Releases OHLCV DataFrame with a specified timeframe.
+        - timeframe_release(ohlcv_dataframe: pd.DataFrame = None, new_timeframe: str = None, num_candles: int = None) -> pd.DataFrame: Releases OHLCV DataFrame with a specified timeframe.
+        - _expected_candles(num_candles: int = None) -> int | None: Returns the number of timeframe candles a release is expected to have.
+        - timeframes_release(new_timeframes: list, ohlcv_dataframe: pd.DataFrame = None, num_candles: int = None) -> dict: Releases OHLCV DataFrames with several timeframes in one pass.
+        - repair_gaps() -> dict: Fetches only the candles missing inside the series and merges them in.
     """
 
     DEFAULT_APP_DIRECTORY = APP_DIRECTORY
+    ### Shared by all instances, so the pooled exchange connections live for the whole process
+    HISTORY_CLIENT = HistoryOHLCV()
+    ### One history page cache per cache directory, shared by all instances
+    _CACHE_MANAGERS = {}
+    _CACHE_MANAGERS_LOCK = threading.Lock()
+    ### Loaded series shared by all instances of the process, so new instances skip the disk read
+    SERIES_CACHE = SeriesCache()
+    ### Instances not used as a context manager, their files are saved at interpreter exit (_save_at_exit)
+    _LIVE_INSTANCES = weakref.WeakSet()
 
     def __init__(
         self,
@@ -58,6 +96,12 @@ class GenerateOHLCV:
         num_candles: int,
         data_directory=DEFAULT_APP_DIRECTORY,
         enable_logging=True,
+        enable_cache=True,
+        storage_format: str = DEFAULT_STORAGE_FORMAT,
+        compact: bool = False,
+        timezone: str = TIMEZONE,
+        logger=None,
+        shared_instances: dict = None,
     ):
         """
         Initialize GenerateOHLCV class.
@@ -69,6 +113,18 @@ class GenerateOHLCV:
             - num_candles (int): Number of candles to fetch.
             - data_directory (str): Directory path to store the OHLCV DataFrame files.
             - enable_logging (bool): Flag to enable or disable logging.
+            - enable_cache (bool): Flag to enable or disable the on-disk cache of closed history pages
+              (stored under data_directory/cache).
+            - storage_format (str): Storage format of the OHLCV DataFrame files ("parquet", "feather", "csv", "mmap", "partitioned", "sqlite").
+            - compact (bool): Flag to keep the series in the compact representation: the Datetime index is the only
+              timestamp and the price and volume columns are float32, which halves the memory per candle (default False).
+            - timezone (str): Display timezone of the released DataFrames and the midnight timeframe candles are
+              counted from (default TIMEZONE). The series is fetched, kept, converted and stored with a UTC index
+              and only localized when released; None releases the UTC DataFrames.
+            - logger (LoggerManager): Shared logger instance, used instead of creating a new one (optional).
+            - shared_instances (dict): Instances to reuse instead of creating new ones, keyed by attribute name
+              ("file_manager_instance", "reg_input_values_instance", "time_manager_instance",
+              "df_organizer_instance", "tf_organizer_instance") (optional).
         """
         self.symbol = symbol
         self.timeframe = timeframe
@@ -76,8 +132,15 @@ class GenerateOHLCV:
         self.num_candles = num_candles
         self.data_directory = data_directory
         self.enable_logging = enable_logging
+        self.enable_cache = enable_cache
+        self.storage_format = storage_format
+        self.compact = compact
+        self.timezone = timezone
+        self.shared_instances = shared_instances or {}
 
-        if self.enable_logging:
+        if logger is not None:
+            self.logger = logger
+        elif self.enable_logging:
             self.logger = LoggerManager()
         self.logger.logger.warning(f"--- Start : Class {self.__class__.__name__} ---")
 
@@ -88,13 +151,22 @@ class GenerateOHLCV:
         Initialize or reset instance variables.
         """
         self.dataframe_organizer = None
+        self.ohlcv_version = 0
+        self._tf_memo = OrderedDict()
+        self._localized = {}
+        self._fresh_until = None
+        self.candle_buffer = None
+        self._unfilled_gaps = set()
+        self.gap_report = None
         self.start_timestamp = None
         self.end_timestamp = None
         self.exit_flag = None
         self.ohlcv_df = None
         self.ohlcv_tf = None
+        self.ohlcv_tfs = {}
         self.file_name_df = None
         self.file_name_tf = None
+        self.series_key = None
 
     def _define_instance(self):
         """
@@ -105,38 +177,96 @@ class GenerateOHLCV:
         self.file_manager_instance = None
         self.df_organizer_instance = None
         self.tf_organizer_instance = None
+        self.cache_manager_instance = None
 
     def _setup_instance(self):
-        self.file_manager_instance = FileManager(
-            data_directory=os.path.join(self.data_directory, self.exchange),
-            logger=self.logger,
-        )
-        self.reg_input_values_instance = InputsManager(
-            timeframe=self.timeframe,
-            exchange=self.exchange,
-            num_candles=self.num_candles,
-            logger=self.logger,
-        )
-        self.time_manager_instance = TimeManager(
-            timeframe=self.timeframe,
-            exchange=self.exchange,
-            num_candles=self.num_candles,
-            logger=self.logger,
-        )
-        self.df_organizer_instance = DataFrameOrg(logger=self.logger)
-        self.tf_organizer_instance = TimeFrameOrg(
-            exchange=self.exchange, logger=self.logger
-        )
+        shared = self.shared_instances
+        self.file_manager_instance = shared.get("file_manager_instance")
+        if self.file_manager_instance is None:
+            self.file_manager_instance = FileManager(
+                data_directory=os.path.join(self.data_directory, self.exchange),
+                logger=self.logger,
+                storage_format=self.storage_format,
+            )
+        self.reg_input_values_instance = shared.get("reg_input_values_instance")
+        if self.reg_input_values_instance is None:
+            self.reg_input_values_instance = InputsManager(
+                timeframe=self.timeframe,
+                exchange=self.exchange,
+                num_candles=self.num_candles,
+                logger=self.logger,
+            )
+        self.time_manager_instance = shared.get("time_manager_instance")
+        if self.time_manager_instance is None:
+            self.time_manager_instance = TimeManager(
+                timeframe=self.timeframe,
+                exchange=self.exchange,
+                num_candles=self.num_candles,
+                logger=self.logger,
+                timezone=self.timezone,
+            )
+        self.df_organizer_instance = shared.get("df_organizer_instance")
+        if self.df_organizer_instance is None:
+            self.df_organizer_instance = DataFrameOrg(logger=self.logger)
+        self.tf_organizer_instance = shared.get("tf_organizer_instance")
+        if self.tf_organizer_instance is None:
+            self.tf_organizer_instance = TimeFrameOrg(
+                exchange=self.exchange, logger=self.logger, timezone=self.timezone
+            )
+        if self.enable_cache:
+            self.cache_manager_instance = self._cache_manager(
+                cache_directory=os.path.join(self.data_directory, "cache"),
+                logger=self.logger,
+            )
+
+    @classmethod
+    def _cache_manager(cls, cache_directory: str, logger=None) -> CacheManager:
+        """
+        Returns the shared CacheManager of the cache directory, creating it on first use.
+        """
+        with cls._CACHE_MANAGERS_LOCK:
+            cache_manager = cls._CACHE_MANAGERS.get(cache_directory)
+            if cache_manager is None:
+                cache_manager = CacheManager(
+                    cache_directory=cache_directory, logger=logger
+                )
+                cls._CACHE_MANAGERS[cache_directory] = cache_manager
+            return cache_manager
 
     def _setupCreatorOHLCV(self):
         self._define_variables()
+        self._LIVE_INSTANCES.add(self)
         self._define_instance()
         self._setup_instance()
         self.time_uint = self.reg_input_values_instance._time_unit()
         self.file_name_df = f"{self.symbol}-1{self.time_uint}_df"
-        self.ohlcv_df = self.file_manager_instance._read_df_ohlcv(
-            file_name=self.file_name_df
+        self.series_key = (
+            os.path.abspath(self.data_directory),
+            self.exchange,
+            self.symbol,
+            self.time_uint,
+            self.compact,
         )
+        self._load_series()
+
+    def _load_series(self):
+        """
+        Loads the series of the requested window from the series cache or, on a miss, from the file.
+        """
+        start_timestamp = self.time_manager_instance._start_time_new()
+        self.ohlcv_df = self.SERIES_CACHE.get(key=self.series_key, start=start_timestamp)
+        if self.ohlcv_df is None:
+            ### Only the candles of the requested window are loaded from the file
+            self.ohlcv_df = self.file_manager_instance._read_df_ohlcv(
+                file_name=self.file_name_df, start=start_timestamp
+            )
+            if self.compact:
+                self.ohlcv_df = self.df_organizer_instance._compact_dataframe(
+                    ohlcv_dataframe=self.ohlcv_df
+                )
+            self.SERIES_CACHE.put(
+                key=self.series_key, ohlcv_dataframe=self.ohlcv_df, start=start_timestamp
+            )
 
     def __enter__(self):
         """
@@ -150,37 +280,156 @@ class GenerateOHLCV:
         Exit method for context management.
         """
         self.exit_flag = True
-        if self.ohlcv_df is not None:
-            self.file_manager_instance._save_df_ohlcv(
-                file_name=self.file_name_df, ohlcv_dataframe=self.ohlcv_df
-            )
-            if self.ohlcv_tf is not None:
-                self.file_manager_instance._save_df_ohlcv(
-                    file_name=self.file_name_tf, ohlcv_dataframe=self.ohlcv_tf
-                )
+        if self._save_files():
             self.logger.log_debug("File saved & Exit class")
             self.logger.logger.info(
                 f"Call __exit__ (Class : {self.__class__.__name__})"
             )
 
+    @classmethod
+    def _save_at_exit(cls):
+        """
+        Saves the files of the instances not saved yet, registered with atexit. __del__ may run after the
+        interpreter started to shut down, when the lazily imported parquet engine can not be imported anymore.
+        """
+        for instance in list(cls._LIVE_INSTANCES):
+            if instance.exit_flag is not None:
+                continue
+            instance.exit_flag = True
+            try:
+                instance._save_files()
+            except Exception as e:
+                instance.logger.logger.error(f"Error in _save_at_exit: {str(e)}")
+
     def __del__(self):
         """
         Destructor, logs a message when the instance is deleted.
         """
         if self.exit_flag is None:
-            if self.ohlcv_df is not None:
-                self.file_manager_instance._save_df_ohlcv(
-                    file_name=self.file_name_df, ohlcv_dataframe=self.ohlcv_df
-                )
-                if self.ohlcv_tf is not None:
-                    self.file_manager_instance._save_df_ohlcv(
-                        file_name=self.file_name_tf, ohlcv_dataframe=self.ohlcv_tf
-                    )
+            if self._save_files():
                 self.logger.log_debug("File saved & Exit class")
                 self.logger.logger.info(
                     f"Call __del__ (Class : {self.__class__.__name__})"
                 )
 
+    @property
+    def ohlcv_df(self) -> pd.DataFrame:
+        """
+        The OHLCV series of the instance.
+        """
+        return self._ohlcv_df
+
+    @ohlcv_df.setter
+    def ohlcv_df(self, ohlcv_dataframe: pd.DataFrame):
+        """
+        Sets the OHLCV series (kept in UTC, a localized DataFrame is converted back), a new DataFrame bumps
+        ohlcv_version (DataFrames are not modified in place) and drops the localized DataFrames of the previous version.
+        """
+        ohlcv_dataframe = DataFrameOrg._localize_dataframe(ohlcv_dataframe=ohlcv_dataframe)
+        if ohlcv_dataframe is not getattr(self, "_ohlcv_df", None):
+            self.ohlcv_version = getattr(self, "ohlcv_version", 0) + 1
+            getattr(self, "_localized", {}).clear()
+        self._ohlcv_df = ohlcv_dataframe
+
+    def _is_fresh(self) -> bool:
+        """
+        Checks if the series was refreshed in the current candle period, so it has no new candle to fetch.
+        Called on every release before any other work, it does no time formatting and no logging.
+
+        Returns:
+            - bool: True if the in-memory series is up to date.
+        """
+        return self._fresh_until is not None and time.time() < self._fresh_until
+
+    def _mark_fresh(self):
+        """
+        Remembers the candle boundary the series is refreshed to: until the next boundary, releases return
+        the in-memory series. If the series does not reach the current candle (e.g. the exchange has not
+        published it yet), the series is only kept for FRESH_RETRY_SECONDS, so repeated releases do not fetch
+        on every call and a release after the retry fetches again.
+        """
+        self._fresh_until = None
+        if not isinstance(self.ohlcv_df, pd.DataFrame) or self.ohlcv_df.empty:
+            return
+        seconds_time_unit = self.time_manager_instance.seconds_time_unit
+        now = int(time.time())
+        current_candle = now - now % seconds_time_unit
+        next_boundary = current_candle + seconds_time_unit
+        if int(self.ohlcv_df.index[-1].timestamp()) >= current_candle:
+            self._fresh_until = next_boundary
+        else:
+            self._fresh_until = min(time.time() + FRESH_RETRY_SECONDS, next_boundary)
+
+    def _memo_get(self, new_timeframe: str, num_candles: int = None) -> pd.DataFrame | None:
+        """
+        Returns the memoized timeframe DataFrame of the current series version.
+
+        Returns:
+            - pd.DataFrame | None: The memoized DataFrame, or None if it is not memoized.
+        """
+        key = (self.ohlcv_version, new_timeframe, num_candles)
+        ohlcv_tf = self._tf_memo.get(key)
+        if ohlcv_tf is not None:
+            self._tf_memo.move_to_end(key)
+        return ohlcv_tf
+
+    def _memo_put(self, new_timeframe: str, ohlcv_tf: pd.DataFrame, num_candles: int = None):
+        """
+        Memoizes a timeframe DataFrame of the current series version, evicting the least recently used ones.
+        """
+        if ohlcv_tf is None:
+            return
+        self._tf_memo[(self.ohlcv_version, new_timeframe, num_candles)] = ohlcv_tf
+        while len(self._tf_memo) > TF_MEMO_MAX_ENTRIES:
+            self._tf_memo.popitem(last=False)
+
+    def _localize(self, ohlcv_dataframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns a released DataFrame with its index in the display timezone of the instance.
+        The index values are not converted (only the index dtype changes) and the localized DataFrames of
+        the current series version are kept, so repeated releases return them again.
+
+        Returns:
+            - pd.DataFrame: The localized DataFrame (the DataFrame itself when the timezone is None).
+        """
+        if ohlcv_dataframe is None or self.timezone is None:
+            return ohlcv_dataframe
+        localized = self._localized.get(id(ohlcv_dataframe))
+        if localized is not None and localized[0] is ohlcv_dataframe:
+            return localized[1]
+        if len(self._localized) >= TF_MEMO_MAX_ENTRIES:
+            self._localized.clear()
+        localized_dataframe = self.df_organizer_instance._localize_dataframe(
+            ohlcv_dataframe=ohlcv_dataframe, timezone=self.timezone
+        )
+        self._localized[id(ohlcv_dataframe)] = (ohlcv_dataframe, localized_dataframe)
+        return localized_dataframe
+
+    def _save_files(self) -> bool:
+        """
+        Saves the OHLCV DataFrame and the released timeframe DataFrames.
+
+        Returns:
+        - bool: True if there was data to save.
+        """
+        if self.ohlcv_df is None:
+            return False
+        self.file_manager_instance._save_df_ohlcv(
+            file_name=self.file_name_df, ohlcv_dataframe=self.ohlcv_df
+        )
+        ### The saved series replaces the cached one, it holds the whole current window
+        self.SERIES_CACHE.put(
+            key=self.series_key,
+            ohlcv_dataframe=self.ohlcv_df,
+            start=self.time_manager_instance._start_time_new(),
+        )
+        for file_name_tf, ohlcv_tf in self.ohlcv_tfs.items():
+            if ohlcv_tf is not None:
+                self.file_manager_instance._save_df_ohlcv(
+                    file_name=file_name_tf, ohlcv_dataframe=ohlcv_tf
+                )
+        return True
+
     def _fetch_market_history(
         self,
         symbol: str,
@@ -189,42 +438,72 @@ class GenerateOHLCV:
         endTime: int,
     ) -> pd.DataFrame:
         """
-        Fetches market data from Wallex Market Info API.
+        Fetches market data from the exchange API, page by page when the range exceeds the exchange page limit.
 
         Returns:
         - pd.DataFrame: Market data.
         """
         self.logger.logger.info("_fetch_market_history (function)")
 
-        client = HistoryOHLCV()
         try:
-            market_history = client.get_ohlcv_history(
-                exchange=self.exchange,
-                symbol=symbol,
-                interval=interval,
-                startTime=startTime,
-                endTime=endTime,
+            market_history = self.HISTORY_CLIENT.get_ohlcv_backfill(
+                **self._fetch_arguments(
+                    symbol=symbol, interval=interval, startTime=startTime, endTime=endTime
+                )
             )
-            self.logger.log_debug(
-                f"Market history in DataFrame: \n{pd.DataFrame(market_history)}"
+            return self._parse_market_history(
+                market_history=market_history, startTime=startTime
             )
-            ohlcv_df = pd.DataFrame(data=market_history)
-            if ohlcv_df is not None:
-                return ohlcv_df
         except Exception as e:
             self.logger.logger.error(f"Error in make_df_ohlcv: {str(e)}")
 
-    def _create_new_data(
-        self, start_timestamp: int = None, end_timestamp: int = None
-    ) -> pd.DataFrame:
+    def _fetch_arguments(
+        self, symbol: str, interval: int, startTime: int, endTime: int
+    ) -> dict:
         """
-        Creates new OHLCV data.
+        Builds the keyword arguments of a history backfill request.
 
         Returns:
-        - pd.DataFrame: New OHLCV data.
+        - dict: Arguments of HistoryOHLCV.get_ohlcv_backfill.
         """
-        self.logger.logger.info("_create_new_data (function)")
+        return {
+            "exchange": self.exchange,
+            "symbol": symbol,
+            "interval": interval,
+            "startTime": startTime,
+            "endTime": endTime,
+            "seconds_interval": self.time_manager_instance._seconds_time_unit(),
+            "cache": self.cache_manager_instance,
+        }
 
+    def _parse_market_history(self, market_history, startTime: int = None) -> pd.DataFrame:
+        """
+        Decodes the raw market history payload into an indexed OHLCV DataFrame.
+        Candles before startTime (from cache-aligned pages) are dropped.
+
+        Returns:
+        - pd.DataFrame: Market data.
+        """
+        ohlcv_df = self.df_organizer_instance._decode_market_history(
+            exchange=self.exchange, market_history=market_history
+        )
+        if ohlcv_df is not None and startTime is not None:
+            ohlcv_df = ohlcv_df[ohlcv_df.index.asi8 >= startTime * 10**9]
+        if self.compact:
+            ohlcv_df = self.df_organizer_instance._compact_dataframe(
+                ohlcv_dataframe=ohlcv_df
+            )
+        return ohlcv_df
+
+    def _new_data_window(
+        self, start_timestamp: int = None, end_timestamp: int = None
+    ) -> (str, int, int):
+        """
+        Resolves the interval and the time window of new OHLCV data.
+
+        Returns:
+        - Tuple[str, int, int]: Interval, start timestamp and end timestamp.
+        """
         interval = self.reg_input_values_instance._time_interval()
         self.logger.log_debug(f"interval: {interval}")
 
@@ -234,20 +513,90 @@ class GenerateOHLCV:
         if end_timestamp is None:
             end_timestamp = self.time_manager_instance._end_time_now()
 
+        return interval, start_timestamp, end_timestamp
+
+    def _organize_new_data(self, new_ohlcv_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keeps the fetched market data (already decoded and indexed) as the OHLCV data.
+
+        Returns:
+        - pd.DataFrame: New OHLCV data.
+        """
+        self.ohlcv_df = new_ohlcv_df
+        return self.ohlcv_df
+
+    def _create_new_data(
+        self, start_timestamp: int = None, end_timestamp: int = None
+    ) -> pd.DataFrame:
+        """
+        Creates new OHLCV data.
+
+        Returns:
+        - pd.DataFrame: New OHLCV data.
+        """
+        self.logger.logger.info("_create_new_data (function)")
+
+        interval, start_timestamp, end_timestamp = self._new_data_window(
+            start_timestamp=start_timestamp, end_timestamp=end_timestamp
+        )
+
         new_ohlcv_df = self._fetch_market_history(
             symbol=self.symbol,
             interval=interval,
             startTime=start_timestamp,
             endTime=end_timestamp,
         )
-        new_ohlcv_df = self.df_organizer_instance._regularize_dataframe(
-            exchange=self.exchange, ohlcv_dataframe=new_ohlcv_df
+        return self._organize_new_data(new_ohlcv_df=new_ohlcv_df)
+
+    def _update_window(self, existing_ohlcv_df: pd.DataFrame) -> (int, int, float):
+        """
+        Calculates the time window of the candles to fetch after the existing OHLCV data: from the last
+        stored candle (it may have been open when it was stored) to the candle open now, both included.
+
+        Returns:
+        - Tuple[int, int, float]: Start timestamp, end timestamp and number of candles to fetch.
+        """
+        start_timestamp = self.time_manager_instance._start_time_exists(
+            existing_ohlcv_df=existing_ohlcv_df
         )
-        new_ohlcv_df = self.df_organizer_instance._index_dataframe(
-            ohlcv_dataframe=new_ohlcv_df
+        end_timestamp = self.time_manager_instance._end_time_now()
+        seconds_time_unit = self.time_manager_instance._seconds_time_unit()
+
+        new_candles_needed = (end_timestamp - start_timestamp) // seconds_time_unit + 1
+        return start_timestamp, end_timestamp, new_candles_needed
+
+    def _merge_new_data(
+        self, existing_ohlcv_df: pd.DataFrame, new_ohlcv_data: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Upserts new OHLCV data into the ring buffer of the series (actual candles capacity).
+
+        Returns:
+        - pd.DataFrame: Updated OHLCV data.
+        """
+        actual_candles = self.reg_input_values_instance._actual_candles()
+        if self.candle_buffer is None:
+            self.candle_buffer = CandleRingBuffer(capacity=actual_candles)
+        concatenated_dataframe = self.df_organizer_instance._concatenate_dataframe(
+            existing_ohlcv_df=existing_ohlcv_df,
+            new_ohlcv_data=new_ohlcv_data,
+            actual_candles=actual_candles,
+            candle_buffer=self.candle_buffer,
         )
+        self.ohlcv_df = concatenated_dataframe
+        return self.ohlcv_df
 
-        self.ohlcv_df = new_ohlcv_df
+    def _keep_existing_data(self, existing_ohlcv_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keeps the existing OHLCV data when it is up to date.
+
+        Returns:
+        - pd.DataFrame: Existing OHLCV data.
+        """
+        self.logger.log_debug(
+            f"ohlcv_dataframe is up to date and does not need to be updated: {datetime.now().isoformat(sep=' ', timespec='seconds')}"
+        )
+        self.ohlcv_df = existing_ohlcv_df
         return self.ohlcv_df
 
     def _update_existing_data(self, existing_ohlcv_df: pd.DataFrame) -> pd.DataFrame:
@@ -259,37 +608,53 @@ class GenerateOHLCV:
         """
         self.logger.logger.info("_update_existing_data (function)")
 
-        start_timestamp = self.time_manager_instance._start_time_exists(
+        start_timestamp, end_timestamp, new_candles_needed = self._update_window(
             existing_ohlcv_df=existing_ohlcv_df
         )
-        end_timestamp = self.time_manager_instance._end_time_now()
-        seconds_time_unit = self.time_manager_instance._seconds_time_unit()
-
-        new_candles_needed = (end_timestamp - start_timestamp) / seconds_time_unit
 
         if new_candles_needed > 0:
             new_ohlcv_data = self._create_new_data(
                 start_timestamp=start_timestamp, end_timestamp=end_timestamp
             )
-
-            actual_candles = self.reg_input_values_instance._actual_candles()
-            concatenated_dataframe = self.df_organizer_instance._concatenate_dataframe(
-                existing_ohlcv_df=existing_ohlcv_df,
-                new_ohlcv_data=new_ohlcv_data,
-                actual_candles=actual_candles,
+            return self._merge_new_data(
+                existing_ohlcv_df=existing_ohlcv_df, new_ohlcv_data=new_ohlcv_data
             )
-            self.ohlcv_df = concatenated_dataframe
-            return self.ohlcv_df
         else:
-            self.logger.log_debug(
-                f"ohlcv_dataframe is up to date and does not need to be updated: {datetime.now().isoformat(sep=' ', timespec='seconds')}"
-            )
-            self.ohlcv_df = existing_ohlcv_df
-            return self.ohlcv_df
+            return self._keep_existing_data(existing_ohlcv_df=existing_ohlcv_df)
+
+    def _release_source(
+        self, ohlcv_dataframe: pd.DataFrame = None, function_name: str = None
+    ) -> tuple:
+        """
+        Selects the DataFrame a release works on, for the sync and async release methods.
+        A fresh series (see _is_fresh) is released from memory without logging,
+        a given DataFrame is converted to UTC, otherwise the series must be refreshed first.
+
+        Parameters:
+            - ohlcv_dataframe (pd.DataFrame): DataFrame given to the release (optional).
+            - function_name (str): Name of the release method, logged when the release does work.
+
+        Returns:
+            - Tuple[pd.DataFrame, tuple, bool]: The DataFrame (the series itself when it must be refreshed),
+              the series key (None for a given DataFrame) and whether the series must be refreshed first.
+        """
+        if ohlcv_dataframe is None and self._is_fresh():
+            ### Refreshed in the current candle period
+            return self.ohlcv_df, self.series_key, False
+
+        self.logger.logger.info(f"{function_name} (function)")
+
+        if ohlcv_dataframe is None:
+            return self.ohlcv_df, self.series_key, True
+        ohlcv_dataframe = self.df_organizer_instance._localize_dataframe(
+            ohlcv_dataframe=ohlcv_dataframe
+        )
+        return ohlcv_dataframe, None, False
 
     def dataframe_release(self, existing_ohlcv_df: pd.DataFrame = None) -> pd.DataFrame:
         """
         Releases OHLCV DataFrame, either by updating or creating new data.
+        The released DataFrame is localized to the display timezone, the series itself stays in UTC.
 
         Parameters:
             - existing_ohlcv_df (pd.DataFrame): Existing OHLCV DataFrame.
@@ -297,50 +662,337 @@ class GenerateOHLCV:
         Returns:
             - pd.DataFrame: Released OHLCV DataFrame.
         """
-        self.logger.logger.info("dataframe_release (function)")
-
-        if existing_ohlcv_df is None:
-            existing_ohlcv_df = self.ohlcv_df
+        existing_ohlcv_df, series_key, needs_refresh = self._release_source(
+            ohlcv_dataframe=existing_ohlcv_df, function_name="dataframe_release"
+        )
+        if series_key is not None and not needs_refresh:
+            return self._localize(existing_ohlcv_df)
 
         if isinstance(existing_ohlcv_df, pd.DataFrame):
             # Existing data found, update it
             self._update_existing_data(existing_ohlcv_df=existing_ohlcv_df)
         else:
             # Existing data not found, create it
-            self.logger.logger.info("The CSV DataFrame file does not exists.")
+            self.logger.logger.info("The DataFrame file does not exists.")
             self._create_new_data()
 
-        return self.ohlcv_df
+        self._mark_fresh()
+        return self._localize(self.ohlcv_df)
 
     def timeframe_release(
-        self, ohlcv_dataframe: pd.DataFrame = None, new_timeframe: str = None
+        self,
+        ohlcv_dataframe: pd.DataFrame = None,
+        new_timeframe: str = None,
+        num_candles: int = None,
     ) -> pd.DataFrame:
         """
         Releases OHLCV DataFrame with a specified timeframe.
+        The new timeframe may have a coarser time unit than the series (e.g. 4H from the minute series).
+        The released DataFrame is localized to the display timezone, like dataframe_release.
 
         Parameters:
             - ohlcv_dataframe (pd.DataFrame): OHLCV DataFrame.
             - new_timeframe (str): New timeframe for the released DataFrame.
+            - num_candles (int): Number of candles of the new timeframe the series must cover (optional).
 
         Returns:
             - pd.DataFrame: Released OHLCV DataFrame with the specified timeframe.
         """
-        self.logger.logger.info("timeframe_release (function)")
+        ohlcv_dataframe, series_key, needs_refresh = self._release_source(
+            ohlcv_dataframe=ohlcv_dataframe, function_name="timeframe_release"
+        )
+        if needs_refresh:
+            self.dataframe_release()
+            ### The series of the instance, its aggregated frame is updated incrementally
+            ohlcv_dataframe = self.ohlcv_df
 
-        if ohlcv_dataframe is None:
-            ohlcv_dataframe = self.dataframe_release()
+        return self._localize(
+            self._convert_timeframe(
+                ohlcv_dataframe=ohlcv_dataframe,
+                new_timeframe=new_timeframe,
+                series_key=series_key,
+                num_candles=num_candles,
+            )
+        )
 
+    def _convert_timeframe(
+        self,
+        ohlcv_dataframe: pd.DataFrame,
+        new_timeframe: str = None,
+        series_key: tuple = None,
+        num_candles: int = None,
+    ) -> pd.DataFrame:
+        """
+        Converts the OHLCV DataFrame to the new timeframe and keeps it for saving.
+
+        Returns:
+            - pd.DataFrame: OHLCV DataFrame with the new timeframe.
+        """
         if new_timeframe is None:
             new_timeframe = self.timeframe
 
-        self.ohlcv_tf = self.tf_organizer_instance.convert_timeframe(
-            ohlcv_dataframe=ohlcv_dataframe, new_timeframe=new_timeframe
-        )
+        ### The series of the instance did not change since the last release of the timeframe
+        self.ohlcv_tf = None
+        if series_key is not None:
+            self.ohlcv_tf = self._memo_get(new_timeframe=new_timeframe, num_candles=num_candles)
+
+        if self.ohlcv_tf is None:
+            self.ohlcv_tf = self.tf_organizer_instance.convert_timeframe(
+                ohlcv_dataframe=ohlcv_dataframe,
+                new_timeframe=new_timeframe,
+                series_key=series_key,
+                num_candles=num_candles,
+                expected_candles=self._expected_candles(num_candles=num_candles),
+            )
+            if series_key is not None:
+                self._memo_put(
+                    new_timeframe=new_timeframe, ohlcv_tf=self.ohlcv_tf, num_candles=num_candles
+                )
 
         self.file_name_tf = f"{self.symbol}-{new_timeframe}_tf"
+        self.ohlcv_tfs[self.file_name_tf] = self.ohlcv_tf
 
         return self.ohlcv_tf
 
+    def _expected_candles(self, num_candles: int = None) -> int | None:
+        """
+        Returns the number of timeframe candles a release is expected to have: the num_candles of the instance
+        when the release does not require a number, so a short coverage is logged instead of passing silently.
+        """
+        return self.num_candles if num_candles is None else None
+
+    def timeframes_release(
+        self,
+        new_timeframes: list,
+        ohlcv_dataframe: pd.DataFrame = None,
+        num_candles: int = None,
+    ) -> dict:
+        """
+        Releases OHLCV DataFrames with several timeframes in one pass: each timeframe is aggregated from
+        the nearest finer released timeframe that divides it (see TimeFrameOrg.convert_timeframes).
+        Each DataFrame is saved with its own _tf file name.
+
+        Parameters:
+            - new_timeframes (list): Timeframes of the released DataFrames.
+            - ohlcv_dataframe (pd.DataFrame): OHLCV DataFrame.
+            - num_candles (int): Number of candles of each timeframe the series must cover (optional).
+
+        Returns:
+            - dict: Released OHLCV DataFrames keyed by timeframe.
+        """
+        ohlcv_dataframe, series_key, needs_refresh = self._release_source(
+            ohlcv_dataframe=ohlcv_dataframe, function_name="timeframes_release"
+        )
+        if needs_refresh:
+            self.dataframe_release()
+            ohlcv_dataframe = self.ohlcv_df
+
+        ohlcv_tfs = self._convert_timeframes(
+            ohlcv_dataframe=ohlcv_dataframe,
+            new_timeframes=new_timeframes,
+            series_key=series_key,
+            num_candles=num_candles,
+        )
+        return {
+            new_timeframe: self._localize(ohlcv_tf)
+            for new_timeframe, ohlcv_tf in ohlcv_tfs.items()
+        }
+
+    def _convert_timeframes(
+        self,
+        ohlcv_dataframe: pd.DataFrame,
+        new_timeframes: list,
+        series_key: tuple = None,
+        num_candles: int = None,
+    ) -> dict:
+        """
+        Converts the OHLCV DataFrame to several timeframes and keeps them for saving.
+        Timeframes memoized for the current series version are not converted again.
+
+        Returns:
+            - dict: OHLCV DataFrames keyed by timeframe.
+        """
+        ohlcv_tfs = {}
+        if series_key is not None:
+            for new_timeframe in new_timeframes:
+                ohlcv_tfs[new_timeframe] = self._memo_get(
+                    new_timeframe=new_timeframe, num_candles=num_candles
+                )
+
+        missing_timeframes = [
+            new_timeframe for new_timeframe in new_timeframes if ohlcv_tfs.get(new_timeframe) is None
+        ]
+        if missing_timeframes:
+            converted = self.tf_organizer_instance.convert_timeframes(
+                ohlcv_dataframe=ohlcv_dataframe,
+                new_timeframes=missing_timeframes,
+                series_key=series_key,
+                num_candles=num_candles,
+                expected_candles=self._expected_candles(num_candles=num_candles),
+            )
+            for new_timeframe, ohlcv_tf in converted.items():
+                ohlcv_tfs[new_timeframe] = ohlcv_tf
+                if series_key is not None:
+                    self._memo_put(
+                        new_timeframe=new_timeframe, ohlcv_tf=ohlcv_tf, num_candles=num_candles
+                    )
+
+        ohlcv_tfs = {new_timeframe: ohlcv_tfs[new_timeframe] for new_timeframe in new_timeframes}
+        for new_timeframe, ohlcv_tf in ohlcv_tfs.items():
+            self.ohlcv_tfs[f"{self.symbol}-{new_timeframe}_tf"] = ohlcv_tf
+
+        return ohlcv_tfs
+
+    def repair_gaps(self) -> dict:
+        """
+        Fetches only the candles missing inside the series (holes left by downtime or short pages) and merges them in.
+        Neighbouring holes that fit in one exchange page are fetched with one request, the requests are sent
+        concurrently, and holes the exchange returned no candles for (e.g. no trades) are not requested again by the instance.
+
+        Returns:
+            - dict: Gap report, see _merge_gap_data (also kept in gap_report).
+        """
+        self.logger.logger.info("repair_gaps (function)")
+
+        missing_ranges, gap_windows = self._gap_windows()
+        try:
+            gap_pages = self.HISTORY_CLIENT.get_ohlcv_pages(
+                **self._gap_arguments(gap_windows=gap_windows)
+            )
+        except Exception as e:
+            self.logger.logger.error(f"Error in repair_gaps: {str(e)}")
+            gap_pages = [None] * len(gap_windows)
+        gap_frames = self._gap_frames(gap_windows=gap_windows, gap_pages=gap_pages)
+        return self._merge_gap_data(
+            missing_ranges=missing_ranges, gap_windows=gap_windows, gap_frames=gap_frames
+        )
+
+    def _gap_windows(self) -> (np.ndarray, list):
+        """
+        Scans the series for missing ranges and plans the requests that fetch them.
+
+        Returns:
+            - Tuple[np.ndarray, list]: Missing ranges to fetch and the (start, end) windows of the requests.
+        """
+        missing_ranges = self.time_manager_instance._missing_ranges(
+            existing_ohlcv_df=self.ohlcv_df
+        )
+        if self._unfilled_gaps:
+            missing_ranges = missing_ranges[
+                np.array(
+                    [(start, end) not in self._unfilled_gaps for start, end in missing_ranges.tolist()],
+                    dtype=bool,
+                )
+            ]
+        page_limit = self.HISTORY_CLIENT.PAGE_LIMIT.get(self.exchange) or CACHE_PAGE_LIMIT
+        gap_windows = self.time_manager_instance._merge_ranges(
+            missing_ranges=missing_ranges, max_candles=page_limit
+        )
+        return missing_ranges, [(int(start), int(end)) for start, end in gap_windows]
+
+    def _gap_arguments(self, gap_windows: list) -> dict:
+        """
+        Builds the keyword arguments of the gap window requests (HistoryOHLCV.get_ohlcv_pages).
+        The page cache is not used: a short page served from it is the hole the repair has to fetch again.
+
+        Returns:
+        - dict: Arguments of HistoryOHLCV.get_ohlcv_pages.
+        """
+        return {
+            "exchange": self.exchange,
+            "symbol": self.symbol,
+            "interval": self.reg_input_values_instance._time_interval(),
+            "windows": gap_windows,
+            "seconds_interval": self.time_manager_instance._seconds_time_unit(),
+            "cache": None,
+        }
+
+    def _gap_frames(self, gap_windows: list, gap_pages: list) -> list:
+        """
+        Decodes the pages of the gap windows, failed requests stay None.
+
+        Returns:
+            - list: OHLCV DataFrame (or None) of each window.
+        """
+        return [
+            None
+            if gap_page is None
+            else self._parse_market_history(market_history=gap_page, startTime=window[0])
+            for window, gap_page in zip(gap_windows, gap_pages)
+        ]
+
+    def _merge_gap_data(
+        self, missing_ranges: np.ndarray, gap_windows: list, gap_frames: list
+    ) -> dict:
+        """
+        Merges the fetched candles into the series and reports the gaps found and filled.
+        Filled candles are closed candles before the last saved one, so the aggregated timeframe frames of the series
+        are dropped and the next save writes the whole files.
+
+        Returns:
+            - dict: "gaps" (missing ranges found), "missing" (candles missing), "requests" (windows fetched),
+              "filled" (candles filled) and "unfilled" (ranges the exchange returned no candles for).
+        """
+        seconds_time_unit = self.time_manager_instance.seconds_time_unit
+        missing_candles = int(
+            ((missing_ranges[:, 1] - missing_ranges[:, 0]) // seconds_time_unit + 1).sum()
+        )
+        ### Failed requests return None, their windows are requested again by the next repair
+        answered_windows = [
+            window
+            for window, gap_frame in zip(gap_windows, gap_frames)
+            if isinstance(gap_frame, pd.DataFrame)
+        ]
+        gap_frames = [
+            gap_frame
+            for gap_frame in gap_frames
+            if isinstance(gap_frame, pd.DataFrame) and not gap_frame.empty
+        ]
+        if gap_frames:
+            self._merge_new_data(
+                existing_ohlcv_df=self.ohlcv_df, new_ohlcv_data=pd.concat(gap_frames)
+            )
+
+        ### Holes left inside the answered windows have no candles on the exchange
+        remaining_ranges = self.time_manager_instance._missing_ranges(
+            existing_ohlcv_df=self.ohlcv_df
+        ).tolist()
+        unfilled_ranges = [
+            (start, end)
+            for start, end in remaining_ranges
+            if any(window[0] <= start and end <= window[1] for window in answered_windows)
+        ]
+        remaining_candles = sum(
+            (end - start) // seconds_time_unit + 1
+            for start, end in remaining_ranges
+            if any(window[0] <= start and end <= window[1] for window in gap_windows)
+        )
+        self._unfilled_gaps.update(unfilled_ranges)
+
+        filled_candles = missing_candles - remaining_candles
+        if filled_candles > 0:
+            self.tf_organizer_instance.invalidate_aggregates(series_key=self.series_key)
+            for file_name in [self.file_name_df, *self.ohlcv_tfs]:
+                self.file_manager_instance._reset_flush(file_name=file_name)
+            self.SERIES_CACHE.put(
+                key=self.series_key,
+                ohlcv_dataframe=self.ohlcv_df,
+                start=self.time_manager_instance._start_time_new(),
+            )
+
+        self.gap_report = {
+            "gaps": len(missing_ranges),
+            "missing": missing_candles,
+            "requests": len(gap_windows),
+            "filled": filled_candles,
+            "unfilled": len(unfilled_ranges),
+        }
+        self.logger.log_debug(f"gap report: {self.gap_report}")
+        return self.gap_report
+
+
+atexit.register(GenerateOHLCV._save_at_exit)
+
 
 if __name__ == "__main__":
     symbol_13 = "BTCUSDT"
@@ -360,23 +1012,20 @@ if __name__ == "__main__":
     with GenerateOHLCV(
         symbol=symbol, timeframe=tf, exchange=exchange, num_candles=num_candles
     ) as ohlcv_object:
-        x = 2
-        for i in range(x):
-            print("Exchange:", exchange, "\n")
-            print("Number of Cycle: ", i + 1)
-            print(ohlcv_object.timeframe_release())
+        print("Exchange:", exchange, "\n")
+        print(ohlcv_object.timeframe_release())
+        print("------------ end ------------\n")
+
+    ### Keep the files fresh: refresh just after each candle close instead of polling with time.sleep
+    from TF_Generator.GenerateDaemon import RefreshDaemon
 
+    daemon = RefreshDaemon(jobs=[(exchange, symbol, tf, num_candles)])
+    daemon.start()
+    try:
+        while True:
+            time.sleep(60)
+            for key, job_stats in daemon.stats().items():
+                print(key, job_stats)
             print("------------ end ------------\n")
-            if i + 1 < x:
-                time.sleep(5)
-
-    # ohlcv_object = GenerateOHLCV(symbol=symbol, timeframe=tf, num_candles=num_candles)
-    # x = 3
-    # for i in range(x):
-    #     print("Number of Cycle: ", i + 1)
-    #     ohlcv_object.dataframe_release()
-    #     print(ohlcv_object.timeframe_release())
-    #     print(ohlcv_object.timeframe_release(new_timeframe="15min"))
-    #     print("------------ end ------------\n")
-    #     if i + 1 < x:
-    #         time.sleep(5)
+    except KeyboardInterrupt:
+        daemon.stop()
@@ -0,0 +1,306 @@
+import pandas as pd
+import asyncio
+import sys
+import os
+
+file_path = os.path.abspath(__file__)
+folder_path = os.path.dirname(file_path)
+app_directory = os.path.abspath(os.path.join(folder_path, os.pardir))
+# app_directory = os.path.abspath(os.path.join(file_path, "../.."))
+# print(app_directory)
+
+sys.path.append(app_directory)
+from TF_Generator.HistoryFetchAsync import AsyncHistoryOHLCV
+from TF_Generator.GenerateTimeFrame import GenerateOHLCV
+
+
+class AsyncGenerateOHLCV(GenerateOHLCV):
+    """
+    Asyncio counterpart of GenerateOHLCV.
+
+    Market history is fetched with AsyncHistoryOHLCV on the running event loop, while decoding,
+    concatenation, resampling and file saving run in worker threads,
+    so many (exchange, symbol) series can be refreshed concurrently on one event loop.
+    The constructor does not read the series from disk, it is loaded in a worker thread
+    by __aenter__ or the first release.
+
+    Methods:
+        - _load_series(): Defers the initial load of the series to _ensure_loaded.
+        - _ensure_loaded(): Loads the series in a worker thread, once.
+        - __aenter__(): Enter method for async context management, loads the series.
+        - __aexit__(exc_type, exc_value, traceback): Exit method for async context management, saves the files.
+        - _fetch_market_history(symbol: str, interval: int, startTime: int, endTime: int) -> pd.DataFrame: Fetches market data from an external API.
+        - _create_new_data(start_timestamp: int = None, end_timestamp: int = None) -> pd.DataFrame: Creates new OHLCV data.
+        - _update_existing_data(existing_ohlcv_df: pd.DataFrame) -> pd.DataFrame: Updates existing OHLCV data.
+        - dataframe_release(existing_ohlcv_df: pd.DataFrame = None) -> pd.DataFrame: Releases OHLCV DataFrame, either by updating or creating new data.
+        - timeframe_release(ohlcv_dataframe: pd.DataFrame = None, new_timeframe: str = None, num_candles: int = None) -> pd.DataFrame: Releases OHLCV DataFrame with a specified timeframe.
+        - timeframes_release(new_timeframes: list, ohlcv_dataframe: pd.DataFrame = None, num_candles: int = None) -> dict: Releases OHLCV DataFrames with several timeframes in one pass.
+        - repair_gaps() -> dict: Fetches only the candles missing inside the series and merges them in.
+    """
+
+    ### Shared by all instances, one pooled session per exchange and event loop
+    HISTORY_CLIENT = AsyncHistoryOHLCV()
+
+    def _load_series(self):
+        """
+        Defers the initial load of the series, the constructor runs on the event loop thread.
+        """
+        self._series_load = None
+
+    async def _ensure_loaded(self):
+        """
+        Loads the series from the series cache or the file in a worker thread,
+        concurrent callers wait for the same load.
+        """
+        if self._series_load is None:
+            self._series_load = asyncio.ensure_future(
+                asyncio.to_thread(super()._load_series)
+            )
+        await self._series_load
+
+    async def __aenter__(self):
+        """
+        Enter method for async context management.
+        """
+        self.logger.logger.info("--- run with (async with statement) ---")
+        await self._ensure_loaded()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        Exit method for async context management.
+        """
+        await asyncio.to_thread(self.__exit__, exc_type, exc_value, traceback)
+
+    async def _fetch_market_history(
+        self,
+        symbol: str,
+        interval: int,
+        startTime: int,
+        endTime: int,
+    ) -> pd.DataFrame:
+        """
+        Fetches market data from the exchange API, page by page when the range exceeds the exchange page limit.
+
+        Returns:
+        - pd.DataFrame: Market data.
+        """
+        self.logger.logger.info("_fetch_market_history (function)")
+
+        try:
+            market_history = await self.HISTORY_CLIENT.get_ohlcv_backfill(
+                **self._fetch_arguments(
+                    symbol=symbol, interval=interval, startTime=startTime, endTime=endTime
+                )
+            )
+            return await asyncio.to_thread(
+                self._parse_market_history,
+                market_history=market_history,
+                startTime=startTime,
+            )
+        except Exception as e:
+            self.logger.logger.error(f"Error in make_df_ohlcv: {str(e)}")
+
+    async def _create_new_data(
+        self, start_timestamp: int = None, end_timestamp: int = None
+    ) -> pd.DataFrame:
+        """
+        Creates new OHLCV data.
+
+        Returns:
+        - pd.DataFrame: New OHLCV data.
+        """
+        self.logger.logger.info("_create_new_data (function)")
+
+        interval, start_timestamp, end_timestamp = self._new_data_window(
+            start_timestamp=start_timestamp, end_timestamp=end_timestamp
+        )
+
+        new_ohlcv_df = await self._fetch_market_history(
+            symbol=self.symbol,
+            interval=interval,
+            startTime=start_timestamp,
+            endTime=end_timestamp,
+        )
+        return self._organize_new_data(new_ohlcv_df=new_ohlcv_df)
+
+    async def _update_existing_data(
+        self, existing_ohlcv_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Updates existing OHLCV data.
+
+        Returns:
+        - pd.DataFrame: Updated OHLCV data.
+        """
+        self.logger.logger.info("_update_existing_data (function)")
+
+        start_timestamp, end_timestamp, new_candles_needed = self._update_window(
+            existing_ohlcv_df=existing_ohlcv_df
+        )
+
+        if new_candles_needed > 0:
+            new_ohlcv_data = await self._create_new_data(
+                start_timestamp=start_timestamp, end_timestamp=end_timestamp
+            )
+            return await asyncio.to_thread(
+                self._merge_new_data,
+                existing_ohlcv_df=existing_ohlcv_df,
+                new_ohlcv_data=new_ohlcv_data,
+            )
+        else:
+            return self._keep_existing_data(existing_ohlcv_df=existing_ohlcv_df)
+
+    async def dataframe_release(
+        self, existing_ohlcv_df: pd.DataFrame = None
+    ) -> pd.DataFrame:
+        """
+        Releases OHLCV DataFrame, either by updating or creating new data.
+
+        Parameters:
+            - existing_ohlcv_df (pd.DataFrame): Existing OHLCV DataFrame.
+
+        Returns:
+            - pd.DataFrame: Released OHLCV DataFrame.
+        """
+        existing_ohlcv_df, series_key, needs_refresh = self._release_source(
+            ohlcv_dataframe=existing_ohlcv_df, function_name="dataframe_release"
+        )
+        if series_key is not None and not needs_refresh:
+            return self._localize(existing_ohlcv_df)
+
+        await self._ensure_loaded()
+        if needs_refresh:
+            existing_ohlcv_df = self.ohlcv_df
+
+        if isinstance(existing_ohlcv_df, pd.DataFrame):
+            # Existing data found, update it
+            await self._update_existing_data(existing_ohlcv_df=existing_ohlcv_df)
+        else:
+            # Existing data not found, create it
+            self.logger.logger.info("The DataFrame file does not exists.")
+            await self._create_new_data()
+
+        self._mark_fresh()
+        return self._localize(self.ohlcv_df)
+
+    async def timeframe_release(
+        self,
+        ohlcv_dataframe: pd.DataFrame = None,
+        new_timeframe: str = None,
+        num_candles: int = None,
+    ) -> pd.DataFrame:
+        """
+        Releases OHLCV DataFrame with a specified timeframe.
+
+        Parameters:
+            - ohlcv_dataframe (pd.DataFrame): OHLCV DataFrame.
+            - new_timeframe (str): New timeframe for the released DataFrame.
+            - num_candles (int): Number of candles of the new timeframe the series must cover (optional).
+
+        Returns:
+            - pd.DataFrame: Released OHLCV DataFrame with the specified timeframe.
+        """
+        ohlcv_dataframe, series_key, needs_refresh = self._release_source(
+            ohlcv_dataframe=ohlcv_dataframe, function_name="timeframe_release"
+        )
+        if needs_refresh:
+            await self.dataframe_release()
+            ohlcv_dataframe = self.ohlcv_df
+
+        ohlcv_tf = await asyncio.to_thread(
+            self._convert_timeframe,
+            ohlcv_dataframe=ohlcv_dataframe,
+            new_timeframe=new_timeframe,
+            series_key=series_key,
+            num_candles=num_candles,
+        )
+        return self._localize(ohlcv_tf)
+
+    async def timeframes_release(
+        self,
+        new_timeframes: list,
+        ohlcv_dataframe: pd.DataFrame = None,
+        num_candles: int = None,
+    ) -> dict:
+        """
+        Releases OHLCV DataFrames with several timeframes in one pass (see GenerateOHLCV.timeframes_release).
+
+        Parameters:
+            - new_timeframes (list): Timeframes of the released DataFrames.
+            - ohlcv_dataframe (pd.DataFrame): OHLCV DataFrame.
+            - num_candles (int): Number of candles of each timeframe the series must cover (optional).
+
+        Returns:
+            - dict: Released OHLCV DataFrames keyed by timeframe.
+        """
+        ohlcv_dataframe, series_key, needs_refresh = self._release_source(
+            ohlcv_dataframe=ohlcv_dataframe, function_name="timeframes_release"
+        )
+        if needs_refresh:
+            await self.dataframe_release()
+            ohlcv_dataframe = self.ohlcv_df
+
+        ohlcv_tfs = await asyncio.to_thread(
+            self._convert_timeframes,
+            ohlcv_dataframe=ohlcv_dataframe,
+            new_timeframes=new_timeframes,
+            series_key=series_key,
+            num_candles=num_candles,
+        )
+        return {
+            new_timeframe: self._localize(ohlcv_tf)
+            for new_timeframe, ohlcv_tf in ohlcv_tfs.items()
+        }
+
+    async def repair_gaps(self) -> dict:
+        """
+        Fetches only the candles missing inside the series and merges them in (see GenerateOHLCV.repair_gaps).
+        The missing ranges are fetched concurrently.
+
+        Returns:
+            - dict: Gap report (also kept in gap_report).
+        """
+        self.logger.logger.info("repair_gaps (function)")
+
+        await self._ensure_loaded()
+        missing_ranges, gap_windows = await asyncio.to_thread(self._gap_windows)
+        try:
+            gap_pages = await self.HISTORY_CLIENT.get_ohlcv_pages(
+                **self._gap_arguments(gap_windows=gap_windows)
+            )
+        except Exception as e:
+            self.logger.logger.error(f"Error in repair_gaps: {str(e)}")
+            gap_pages = [None] * len(gap_windows)
+        gap_frames = await asyncio.to_thread(
+            self._gap_frames, gap_windows=gap_windows, gap_pages=gap_pages
+        )
+        return await asyncio.to_thread(
+            self._merge_gap_data,
+            missing_ranges=missing_ranges,
+            gap_windows=gap_windows,
+            gap_frames=list(gap_frames),
+        )
+
+
+if __name__ == "__main__":
+    symbols = ["BTC-USDT", "ETH-USDT", "BNB-USDT"]
+    exchange = "BingX"
+    tf = "5min"
+    num_candles = 1000
+
+    async def refresh(symbol):
+        async with AsyncGenerateOHLCV(
+            symbol=symbol, timeframe=tf, exchange=exchange, num_candles=num_candles
+        ) as ohlcv_object:
+            return symbol, await ohlcv_object.timeframe_release()
+
+    async def main():
+        ### Refresh all symbols concurrently on one event loop
+        for symbol, ohlcv_tf in await asyncio.gather(*map(refresh, symbols)):
+            print("Exchange:", exchange, "--> Symbol:", symbol, "\n")
+            print(ohlcv_tf)
+            print("------------ end ------------\n")
+        await AsyncHistoryOHLCV.close()
+
+    asyncio.run(main())
@@ -1,9 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
+import threading
 import requests
+import time
+import sys
+import os
+
+file_path = os.path.abspath(__file__)
+folder_path = os.path.dirname(file_path)
+app_directory = os.path.abspath(os.path.join(folder_path, os.pardir))
+# app_directory = os.path.abspath(os.path.join(file_path, "../.."))
+# print(app_directory)
+
+sys.path.append(app_directory)
+from TF_Generator.ManagerRequest import RequestScheduler
+
+### DEFAULT_POOL_CONFIG (dict): Default settings of the pooled HTTP session of each exchange.
+DEFAULT_POOL_CONFIG = {"pool_size": 10, "keep_alive": True, "gzip": True}
+### PAGE_LIMIT (dict): Maximum number of candles returned by one request (None: the whole range in one request).
+PAGE_LIMIT = {
+    "Wallex": None,
+    "Nobitex": None,
+    "Binance": 1000,
+    "Coinbase": 300,
+    "BingX": 1440,
+}
+### MAX_RATE_LIMIT_RETRIES (int): Number of times a request is sent again after a rate-limit response (HTTP 429).
+MAX_RATE_LIMIT_RETRIES = 3
+### DEFAULT_MAX_WORKERS (int): Maximum number of pages fetched concurrently during a backfill.
+DEFAULT_MAX_WORKERS = 8
+### CACHE_PAGE_LIMIT (int): Page size of cached backfills on exchanges without a page limit.
+CACHE_PAGE_LIMIT = 1000
+### UDF_KEYS (tuple): Array keys of the UDF history payload (Wallex, Nobitex).
+UDF_KEYS = ("t", "o", "h", "l", "c", "v")
 
 
 class ExchangeAPI:
     """
     A class for interacting with Exchange APIs to retrieve market history data.
+
+    HTTP sessions are pooled per exchange and shared by every instance in the process,
+    so consecutive requests to the same exchange reuse keep-alive TCP/TLS connections.
+    Requests are throttled by the shared per-exchange RequestScheduler (SCHEDULER).
     """
 
     BASE_URL = {
@@ -22,16 +61,137 @@ class ExchangeAPI:
         "Coinbase": "/products",
     }
 
+    ### Process-wide base-URL overrides (see override_base_url)
+    _BASE_URL_OVERRIDE = {}
+
+    ### Process-wide pooled sessions, one per exchange (see _get_session)
+    _POOL_CONFIG = dict(DEFAULT_POOL_CONFIG)
+    _SESSIONS = {}
+    _SESSIONS_LOCK = threading.Lock()
+    ### Process-wide request scheduler, keyed by the BASE_URL exchange names
+    SCHEDULER = RequestScheduler()
+
     def __init__(self):
         pass
 
-    def make_request(self, url: str, params: dict = None) -> dict:
+    @classmethod
+    def override_base_url(cls, exchange: str = None, url: str = None) -> None:
+        """
+        Points an exchange at another server (e.g. MockExchangeServer), for all instances.
+        Without a url the override of the exchange (or of all exchanges without an exchange) is removed.
+
+        Args:
+            exchange (str, optional): The name of the exchange, one of the BASE_URL keys.
+            url (str, optional): Base URL used instead of BASE_URL[exchange].
+        """
+        if exchange is None:
+            cls._BASE_URL_OVERRIDE.clear()
+        elif url is None:
+            cls._BASE_URL_OVERRIDE.pop(exchange, None)
+        else:
+            cls._BASE_URL_OVERRIDE[exchange] = url
+
+    def _base_url(self, exchange: str) -> str:
+        return self._BASE_URL_OVERRIDE.get(exchange, self.BASE_URL.get(exchange))
+
+    def _cache_source(self, exchange: str) -> str:
+        """
+        Returns the name the pages of an exchange are cached under. An overridden base URL is part of it,
+        so pages of another server (e.g. MockExchangeServer) are never served as history of the exchange.
+        """
+        override_url = self._BASE_URL_OVERRIDE.get(exchange)
+        return exchange if override_url is None else f"{exchange}@{override_url}"
+
+    @classmethod
+    def configure_pool(
+        cls, pool_size: int = None, keep_alive: bool = None, gzip: bool = None
+    ) -> None:
         """
-        Sends an HTTP GET request to the specified endpoint.
+        Configures the pooled HTTP sessions shared by all instances.
+        Existing sessions are closed and rebuilt with the new settings on the next request.
+
+        Args:
+            pool_size (int, optional): Maximum number of connections kept alive per exchange.
+            keep_alive (bool, optional): Reuse connections between requests.
+            gzip (bool, optional): Ask the exchange for compressed responses.
+        """
+        with cls._SESSIONS_LOCK:
+            for key, value in (
+                ("pool_size", pool_size),
+                ("keep_alive", keep_alive),
+                ("gzip", gzip),
+            ):
+                if value is not None:
+                    cls._POOL_CONFIG[key] = value
+            cls._close_sessions()
+
+    @classmethod
+    def close_sessions(cls) -> None:
+        """
+        Closes all pooled sessions and their connections.
+        """
+        with cls._SESSIONS_LOCK:
+            cls._close_sessions()
+
+    @classmethod
+    def _close_sessions(cls) -> None:
+        for session in cls._SESSIONS.values():
+            session.close()
+        cls._SESSIONS.clear()
+
+    @classmethod
+    def _get_session(cls, exchange: str = None) -> requests.Session:
+        """
+        Returns the pooled session of the exchange, creating it on first use.
+
+        Args:
+            exchange (str, optional): The name of the exchange, one of the BASE_URL keys.
+
+        Returns:
+            requests.Session: The shared session of the exchange.
+        """
+        with cls._SESSIONS_LOCK:
+            session = cls._SESSIONS.get(exchange)
+            if session is None:
+                config = cls._POOL_CONFIG
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=config["pool_size"]
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(
+                    {
+                        "Accept-Encoding": "gzip, deflate"
+                        if config["gzip"]
+                        else "identity",
+                        "Connection": "keep-alive" if config["keep_alive"] else "close",
+                    }
+                )
+                cls._SESSIONS[exchange] = session
+            return session
+
+    @staticmethod
+    def _retry_after(headers) -> float | None:
+        """
+        Reads the back-off time of a rate-limit response.
+
+        Returns:
+            float | None: Seconds from the Retry-After header, or None if it is missing.
+        """
+        try:
+            return float(headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
+
+    def make_request(self, url: str, params: dict = None, exchange: str = None) -> dict:
+        """
+        Sends an HTTP GET request to the specified endpoint through the pooled session of the exchange.
 
         Args:
             url (str): The URL of the API endpoint.
             params (dict, optional): Query parameters to include in the request. Defaults to None.
+            exchange (str, optional): The name of the exchange whose session is used. Defaults to None.
 
         Returns:
             dict: The JSON response from the API.
@@ -41,7 +201,16 @@ class ExchangeAPI:
             requests.exceptions.HTTPError: If an HTTP error (4xx or 5xx) occurs.
         """
         try:
-            response = requests.get(url, params=params)
+            session = self._get_session(exchange)
+            response = session.get(url, params=params)
+            for _ in range(MAX_RATE_LIMIT_RETRIES):
+                if response.status_code != 429:
+                    break
+                self.SCHEDULER.backoff(
+                    exchange, seconds=self._retry_after(response.headers)
+                )
+                self.SCHEDULER.acquire(exchange)
+                response = session.get(url, params=params)
             return response.json()
         except requests.exceptions.RequestException as e:
             raise requests.exceptions.RequestException(f"(Request) error: {e}")
@@ -54,6 +223,8 @@ class HistoryOHLCV(ExchangeAPI):
     A class for retrieving market history data from Exchange APIs.
     """
 
+    PAGE_LIMIT = PAGE_LIMIT
+
     def __init__(self):
         super().__init__()
 
@@ -74,7 +245,33 @@ class HistoryOHLCV(ExchangeAPI):
         Returns:
             dict: A dictionary containing market history data.
         """
-        api_url = self.BASE_URL.get(exchange)
+        url, params = self._request_arguments(
+            exchange=exchange,
+            symbol=symbol,
+            interval=interval,
+            startTime=startTime,
+            endTime=endTime,
+        )
+
+        ### Wait for the turn of the symbol in the exchange request budget
+        self.SCHEDULER.acquire(exchange=exchange, key=symbol)
+
+        ### Send request to the exchange API and return the market history data
+        ohlcv_history = self.make_request(url, params=params, exchange=exchange)
+        if bool(ohlcv_history):
+            return ohlcv_history
+        print("Error to fetch market history!, please check input values.")
+
+    def _request_arguments(
+        self, exchange: str, symbol: str, interval: str, startTime: int, endTime: int
+    ) -> (str, dict):
+        """
+        Builds the URL and the query parameters of a history request in the dialect of the exchange.
+
+        Returns:
+            Tuple[str, dict]: The URL of the endpoint and the query parameters.
+        """
+        api_url = self._base_url(exchange)
         api_path = self.PATH_URL.get(exchange)
         url = f"{api_url}{api_path}"
 
@@ -97,31 +294,265 @@ class HistoryOHLCV(ExchangeAPI):
                 params = {
                     "symbol": symbol,
                     "interval": interval,
-                    "limit": "1000",
-                    # "startTime": startTime * 1000,
-                    # "endTime": endTime * 1000,
+                    "limit": str(self.PAGE_LIMIT["Binance"]),
+                    "startTime": startTime * 1000,
+                    "endTime": endTime * 1000,
                 }
             case "Coinbase":
                 url = url + f"/{symbol}/candles"
                 params = {
                     "granularity": interval,
-                    "startTime": startTime * 1,
-                    "endTime": endTime * 1,
+                    "start": datetime.fromtimestamp(startTime, timezone.utc).isoformat(),
+                    "end": datetime.fromtimestamp(endTime, timezone.utc).isoformat(),
                 }
             case "BingX":
                 params = {
                     "symbol": symbol,
                     "interval": interval,
-                    "limit": "1440",
+                    "limit": str(self.PAGE_LIMIT["BingX"]),
                     "startTime": startTime * 1000,
                     "endTime": endTime * 1000,
                 }
 
-        ### Send request to the exchange API and return the market history data
-        ohlcv_history = self.make_request(url, params=params)
-        if bool(ohlcv_history):
-            return ohlcv_history
-        print("Error to fetch market history!, please check input values.")
+        return url, params
+
+    def get_ohlcv_backfill(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        startTime: int,
+        endTime: int,
+        seconds_interval: int,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        cache=None,
+    ):
+        """
+        Retrieves market history data for a time range of any length.
+        The range is split into pages that respect the candle limit of the exchange (PAGE_LIMIT),
+        the pages are fetched concurrently and stitched together in time order.
+
+        With a cache, the pages are aligned to a fixed grid of page_limit candles so the same
+        closed window always maps to the same cache entry. The first page may then start before startTime.
+
+        Args:
+            exchange (str): The name of the exchange from which to retrieve data.
+            symbol (str): The symbol for which to retrieve market history data.
+            interval (str): The time interval for data, in the format of the exchange.
+            startTime (int): The start time for data retrieval (Unix timestamp in seconds).
+            endTime (int): The end time for data retrieval (Unix timestamp in seconds).
+            seconds_interval (int): Length of one candle of the interval in seconds.
+            max_workers (int, optional): Maximum number of concurrent requests. Defaults to DEFAULT_MAX_WORKERS.
+            cache (CacheManager, optional): On-disk cache of closed pages. Defaults to None.
+
+        Returns:
+            dict | list: Market history data in the payload format of the exchange.
+        """
+        windows, closed_before = self._backfill_windows(
+            exchange=exchange,
+            startTime=startTime,
+            endTime=endTime,
+            seconds_interval=seconds_interval,
+            cache=cache,
+        )
+        pages = self.get_ohlcv_pages(
+            exchange=exchange,
+            symbol=symbol,
+            interval=interval,
+            windows=windows,
+            seconds_interval=seconds_interval,
+            max_workers=max_workers,
+            cache=cache,
+            closed_before=closed_before,
+        )
+        if len(pages) == 1:
+            return pages[0]
+
+        return self._merge_pages(exchange=exchange, pages=pages)
+
+    def get_ohlcv_pages(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        windows: list,
+        seconds_interval: int,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        cache=None,
+        closed_before: int = None,
+    ) -> list:
+        """
+        Retrieves the pages of the given windows concurrently, one request per window (each window must fit in
+        one page of the exchange). Used by get_ohlcv_backfill and to fetch the disjoint windows of a gap repair.
+
+        Args:
+            exchange (str): The name of the exchange from which to retrieve data.
+            symbol (str): The symbol for which to retrieve market history data.
+            interval (str): The time interval for data, in the format of the exchange.
+            windows (list): (start, end) Unix timestamps in seconds, both ends inclusive.
+            seconds_interval (int): Length of one candle of the interval in seconds.
+            max_workers (int, optional): Maximum number of concurrent requests. Defaults to DEFAULT_MAX_WORKERS.
+            cache (CacheManager, optional): On-disk cache of closed pages. Defaults to None.
+            closed_before (int, optional): Start time of the open candle, windows ending before it are closed.
+
+        Returns:
+            list: The pages in the order of the windows, in the payload format of the exchange (None if failed).
+        """
+        cache_source = self._cache_source(exchange)
+
+        def fetch_page(window):
+            ### Pages of fully closed candles never change, serve them from the cache
+            closed = cache is not None and window[1] < closed_before
+            if closed:
+                page = cache.get(cache_source, symbol, interval, window[0], window[1])
+                if page is not None:
+                    return page
+            page = self.get_ohlcv_history(
+                exchange=exchange,
+                symbol=symbol,
+                interval=interval,
+                startTime=window[0],
+                endTime=window[1],
+            )
+            if closed and self._page_complete(
+                exchange=exchange,
+                page=page,
+                window=window,
+                seconds_interval=seconds_interval,
+            ):
+                cache.put(cache_source, symbol, interval, window[0], window[1], page)
+            return page
+
+        if len(windows) <= 1:
+            return [fetch_page(window) for window in windows]
+
+        ### executor.map keeps the order of the windows
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(windows))) as executor:
+            return list(executor.map(fetch_page, windows))
+
+    def _backfill_windows(
+        self,
+        exchange: str,
+        startTime: int,
+        endTime: int,
+        seconds_interval: int,
+        cache=None,
+    ) -> (list, int):
+        """
+        Returns the page windows of a backfill and the start time of the open candle.
+        Windows that end before the open candle hold closed candles only.
+
+        Returns:
+            tuple: (windows, closed_before)
+        """
+        page_limit = self.PAGE_LIMIT.get(exchange)
+        if cache is not None and page_limit is None:
+            page_limit = CACHE_PAGE_LIMIT
+        time_now = int(time.time())
+        closed_before = time_now - time_now % seconds_interval
+
+        windows = self._page_windows(
+            startTime=startTime,
+            endTime=endTime,
+            seconds_interval=seconds_interval,
+            page_limit=page_limit,
+            align=cache is not None,
+        )
+        return windows, closed_before
+
+    @staticmethod
+    def _page_windows(
+        startTime: int,
+        endTime: int,
+        seconds_interval: int,
+        page_limit: int = None,
+        align: bool = False,
+    ) -> list:
+        """
+        Splits [startTime, endTime] into windows of at most page_limit candles.
+        With align, the windows follow a fixed grid of page_limit candles counted from the epoch.
+
+        Returns:
+            list: (start, end) tuples in time order, both ends inclusive.
+        """
+        if page_limit is None or endTime <= startTime:
+            return [(startTime, endTime)]
+
+        page_span = page_limit * seconds_interval
+        windows = []
+        window_start = startTime - startTime % page_span if align else startTime
+        while window_start <= endTime:
+            window_end = min(window_start + page_span - seconds_interval, endTime)
+            windows.append((window_start, window_end))
+            window_start = window_end + seconds_interval
+        return windows
+
+    def _page_complete(
+        self, exchange: str, page, window: tuple, seconds_interval: int
+    ) -> bool:
+        """
+        Checks if a page holds every candle of its window (at most the page limit of the exchange).
+        Only complete pages are cached: a short or truncated page would otherwise be served from the disk for good.
+
+        Returns:
+            bool: True if the page can be cached.
+        """
+        expected_rows = (window[1] - window[0]) // seconds_interval + 1
+        page_limit = self.PAGE_LIMIT.get(exchange)
+        if page_limit is not None:
+            expected_rows = min(expected_rows, page_limit)
+        return self._page_rows(exchange=exchange, page=page) >= expected_rows
+
+    @staticmethod
+    def _page_rows(exchange: str, page) -> int:
+        """
+        Returns the number of candles in a page (0 for failed or empty pages).
+        """
+        match exchange:
+            case "Wallex" | "Nobitex":
+                if isinstance(page, dict) and page.get("s") == "ok":
+                    return len(page.get("t") or [])
+            case "BingX":
+                if isinstance(page, dict) and page.get("code") in (0, "0"):
+                    return len(page.get("data") or [])
+            case _:
+                if isinstance(page, list):
+                    return len(page)
+        return 0
+
+    @staticmethod
+    def _merge_pages(exchange: str, pages: list):
+        """
+        Stitches the pages of a backfill into one payload of the exchange format.
+
+        Args:
+            exchange (str): The name of the exchange the pages come from.
+            pages (list): Payloads in time order (failed pages are None).
+
+        Returns:
+            dict | list: The merged payload.
+        """
+        match exchange:
+            case "Wallex" | "Nobitex":
+                merged = {key: [] for key in UDF_KEYS}
+                for page in pages:
+                    if isinstance(page, dict):
+                        for key in UDF_KEYS:
+                            merged[key].extend(page.get(key) or [])
+                merged["s"] = "ok" if merged["t"] else "no_data"
+                return merged
+            case "BingX":
+                merged = {"code": 0, "msg": "", "data": []}
+                for page in pages:
+                    if isinstance(page, dict):
+                        merged["data"].extend(page.get("data") or [])
+                return merged
+            case _:
+                merged = []
+                for page in pages:
+                    if isinstance(page, list):
+                        merged.extend(page)
+                return merged
 
 
 if __name__ == "__main__":
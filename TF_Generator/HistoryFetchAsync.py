@@ -0,0 +1,272 @@
+import asyncio
+import aiohttp
+import sys
+import os
+
+file_path = os.path.abspath(__file__)
+folder_path = os.path.dirname(file_path)
+app_directory = os.path.abspath(os.path.join(folder_path, os.pardir))
+# app_directory = os.path.abspath(os.path.join(file_path, "../.."))
+# print(app_directory)
+
+sys.path.append(app_directory)
+from TF_Generator.HistoryFetch import (
+    HistoryOHLCV,
+    DEFAULT_MAX_WORKERS,
+    MAX_RATE_LIMIT_RETRIES,
+)
+
+
+class AsyncHistoryOHLCV(HistoryOHLCV):
+    """
+    An asyncio counterpart of HistoryOHLCV for retrieving market history data from Exchange APIs.
+
+    One aiohttp session (connection pool) is kept per exchange and event loop,
+    and shared by every instance in the process.
+    Request building, page limits and page stitching are the same as HistoryOHLCV.
+    """
+
+    ### Pooled sessions, one per (exchange, event loop)
+    _ASYNC_SESSIONS = {}
+
+    def __init__(self):
+        super().__init__()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @classmethod
+    async def close(cls) -> None:
+        """
+        Closes the pooled sessions of the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        for key in [key for key in cls._ASYNC_SESSIONS if key[1] is loop]:
+            await cls._ASYNC_SESSIONS.pop(key).close()
+
+    @classmethod
+    def _get_async_session(cls, exchange: str = None) -> aiohttp.ClientSession:
+        """
+        Returns the pooled session of the exchange on the running event loop, creating it on first use.
+
+        Args:
+            exchange (str, optional): The name of the exchange, one of the BASE_URL keys.
+
+        Returns:
+            aiohttp.ClientSession: The shared session of the exchange.
+        """
+        loop = asyncio.get_running_loop()
+        session = cls._ASYNC_SESSIONS.get((exchange, loop))
+        if session is None or session.closed:
+            config = cls._POOL_CONFIG
+            connector = aiohttp.TCPConnector(
+                limit_per_host=config["pool_size"],
+                force_close=not config["keep_alive"],
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    "Accept-Encoding": "gzip, deflate" if config["gzip"] else "identity"
+                },
+            )
+            cls._ASYNC_SESSIONS[(exchange, loop)] = session
+        return session
+
+    async def make_request(
+        self, url: str, params: dict = None, exchange: str = None
+    ) -> dict:
+        """
+        Sends an HTTP GET request to the specified endpoint through the pooled session of the exchange.
+
+        Args:
+            url (str): The URL of the API endpoint.
+            params (dict, optional): Query parameters to include in the request. Defaults to None.
+            exchange (str, optional): The name of the exchange whose session is used. Defaults to None.
+
+        Returns:
+            dict: The JSON response from the API.
+
+        Raises:
+            aiohttp.ClientError: If a network-related error occurs.
+        """
+        if params is not None:
+            params = {key: str(value) for key, value in params.items()}
+        try:
+            session = self._get_async_session(exchange)
+            for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                async with session.get(url, params=params) as response:
+                    if response.status != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                        return await response.json(content_type=None)
+                    retry_after = self._retry_after(response.headers)
+                self.SCHEDULER.backoff(exchange, seconds=retry_after)
+                await self.SCHEDULER.acquire_async(exchange)
+        except aiohttp.ClientError as e:
+            raise aiohttp.ClientError(f"(Request) error: {e}")
+
+    async def get_ohlcv_history(
+        self, exchange: str, symbol: str, interval: str, startTime: int, endTime: int
+    ):
+        """
+        Retrieves market history data for a specific symbol and time range from the specified exchange API.
+        Exchange: "Wallex", "Nobitex", "Binance", "Coinbase", "BingX"
+
+        Args:
+            exchange (str): The name of the exchange from which to retrieve data.
+            symbol (str): The symbol for which to retrieve market history data.
+            interval (str): The time interval for data, specified in minutes for most exchanges.
+            startTime (int): The start time for data retrieval (Unix timestamp in seconds).
+            endTime (int): The end time for data retrieval (Unix timestamp in seconds).
+
+        Returns:
+            dict: A dictionary containing market history data.
+        """
+        url, params = self._request_arguments(
+            exchange=exchange,
+            symbol=symbol,
+            interval=interval,
+            startTime=startTime,
+            endTime=endTime,
+        )
+
+        ### Wait for the turn of the symbol in the exchange request budget
+        await self.SCHEDULER.acquire_async(exchange=exchange, key=symbol)
+
+        ### Send request to the exchange API and return the market history data
+        ohlcv_history = await self.make_request(url, params=params, exchange=exchange)
+        if bool(ohlcv_history):
+            return ohlcv_history
+        print("Error to fetch market history!, please check input values.")
+
+    async def get_ohlcv_backfill(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        startTime: int,
+        endTime: int,
+        seconds_interval: int,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        cache=None,
+    ):
+        """
+        Retrieves market history data for a time range of any length.
+        The pages are fetched concurrently (at most max_workers in flight) and stitched together in time order.
+        Closed pages are served from and stored to the cache, as in HistoryOHLCV.get_ohlcv_backfill.
+
+        Args:
+            exchange (str): The name of the exchange from which to retrieve data.
+            symbol (str): The symbol for which to retrieve market history data.
+            interval (str): The time interval for data, in the format of the exchange.
+            startTime (int): The start time for data retrieval (Unix timestamp in seconds).
+            endTime (int): The end time for data retrieval (Unix timestamp in seconds).
+            seconds_interval (int): Length of one candle of the interval in seconds.
+            max_workers (int, optional): Maximum number of concurrent requests. Defaults to DEFAULT_MAX_WORKERS.
+            cache (CacheManager, optional): On-disk cache of closed pages. Defaults to None.
+
+        Returns:
+            dict | list: Market history data in the payload format of the exchange.
+        """
+        windows, closed_before = self._backfill_windows(
+            exchange=exchange,
+            startTime=startTime,
+            endTime=endTime,
+            seconds_interval=seconds_interval,
+            cache=cache,
+        )
+
+        pages = await self.get_ohlcv_pages(
+            exchange=exchange,
+            symbol=symbol,
+            interval=interval,
+            windows=windows,
+            seconds_interval=seconds_interval,
+            max_workers=max_workers,
+            cache=cache,
+            closed_before=closed_before,
+        )
+        if len(pages) == 1:
+            return pages[0]
+
+        return self._merge_pages(exchange=exchange, pages=pages)
+
+    async def get_ohlcv_pages(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        windows: list,
+        seconds_interval: int,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        cache=None,
+        closed_before: int = None,
+    ) -> list:
+        """
+        Retrieves the pages of the given windows concurrently (at most max_workers in flight),
+        one request per window, as in HistoryOHLCV.get_ohlcv_pages.
+
+        Returns:
+            list: The pages in the order of the windows, in the payload format of the exchange (None if failed).
+        """
+        semaphore = asyncio.Semaphore(max_workers)
+        cache_source = self._cache_source(exchange)
+
+        async def fetch_page(window):
+            ### Pages of fully closed candles never change, serve them from the cache
+            closed = cache is not None and window[1] < closed_before
+            if closed:
+                page = await asyncio.to_thread(
+                    cache.get, cache_source, symbol, interval, window[0], window[1]
+                )
+                if page is not None:
+                    return page
+            async with semaphore:
+                page = await self.get_ohlcv_history(
+                    exchange=exchange,
+                    symbol=symbol,
+                    interval=interval,
+                    startTime=window[0],
+                    endTime=window[1],
+                )
+            if closed and self._page_complete(
+                exchange=exchange,
+                page=page,
+                window=window,
+                seconds_interval=seconds_interval,
+            ):
+                await asyncio.to_thread(
+                    cache.put, cache_source, symbol, interval, window[0], window[1], page
+                )
+            return page
+
+        ### gather keeps the order of the windows
+        return list(await asyncio.gather(*(fetch_page(window) for window in windows)))
+
+
+if __name__ == "__main__":
+    import time
+
+    async def main():
+        time_now = int(time.time())
+        time_now = time_now - (time_now % 60)
+
+        async with AsyncHistoryOHLCV() as api:
+            ### Retrieve several symbols concurrently on one event loop
+            results = await asyncio.gather(
+                *(
+                    api.get_ohlcv_history(
+                        exchange="BingX",
+                        symbol=symbol,
+                        interval="1m",
+                        startTime=time_now - 60 * 60,
+                        endTime=time_now,
+                    )
+                    for symbol in ("BTC-USDT", "ETH-USDT")
+                )
+            )
+        for result in results:
+            print(result)
+
+    asyncio.run(main())
@@ -0,0 +1,288 @@
+from collections import OrderedDict
+import threading
+import hashlib
+import json
+import os
+
+### DEFAULT_CACHE_MAX_BYTES (int): Size cap of the response cache directory in bytes.
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+### CACHE_EVICT_RATIO (float): After an eviction the cache is trimmed to this share of its size cap.
+CACHE_EVICT_RATIO = 0.9
+### DEFAULT_SERIES_CACHE_MAX_BYTES (int): Memory budget of the in-process cache of loaded series in bytes.
+DEFAULT_SERIES_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+class CacheManager:
+    """
+    Content-addressed on-disk cache of exchange history pages.
+
+    Pages are keyed by (exchange, symbol, interval, window start, window end) and stored as JSON files
+    named after the SHA-256 of the key. Only pages of fully closed candles should be stored,
+    since they never change. The directory has a size cap with LRU eviction (file mtime is the last use).
+
+    Methods:
+        - __init__(cache_directory: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES, logger=None): Initializes the CacheManager instance.
+        - get(exchange: str, symbol: str, interval: str, startTime: int, endTime: int): Returns a cached page or None.
+        - put(exchange: str, symbol: str, interval: str, startTime: int, endTime: int, page) -> None: Stores a page.
+        - stats() -> dict: Returns hit, miss and size statistics.
+        - _evict() -> None: Removes the least recently used pages until the cache is under its size cap.
+    """
+
+    def __init__(
+        self, cache_directory: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES, logger=None
+    ):
+        """
+        Initialize CacheManager class.
+
+        Parameters:
+            cache_directory (str): The directory path where cached pages are stored.
+            max_bytes (int): Size cap of the cache directory in bytes.
+            logger: LoggerManager instance (optional).
+        """
+        self.cache_directory = cache_directory
+        self.max_bytes = max_bytes
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._size = None
+
+    def _key_path(
+        self, exchange: str, symbol: str, interval: str, startTime: int, endTime: int
+    ) -> str:
+        key = json.dumps([exchange, symbol, str(interval), int(startTime), int(endTime)])
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.cache_directory, digest[:2], f"{digest}.json")
+
+    def _cache_files(self) -> list:
+        cache_files = []
+        if not os.path.isdir(self.cache_directory):
+            return cache_files
+        for sub_directory in os.scandir(self.cache_directory):
+            if sub_directory.is_dir():
+                for entry in os.scandir(sub_directory.path):
+                    if entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        cache_files.append((stat.st_mtime, stat.st_size, entry.path))
+        return cache_files
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._cache_files())
+        return self._size
+
+    def get(
+        self, exchange: str, symbol: str, interval: str, startTime: int, endTime: int
+    ):
+        """
+        Returns a cached page, or None if the page is not cached.
+
+        Returns:
+            dict | list | None: The raw page in the payload format of the exchange.
+        """
+        path = self._key_path(exchange, symbol, interval, startTime, endTime)
+        try:
+            with open(path) as cache_file:
+                page = json.load(cache_file)
+            ### Mark the page as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self._misses += 1
+            return None
+        with self._lock:
+            self._hits += 1
+        return page
+
+    def put(
+        self,
+        exchange: str,
+        symbol: str,
+        interval: str,
+        startTime: int,
+        endTime: int,
+        page,
+    ) -> None:
+        """
+        Stores a page of fully closed candles.
+        """
+        path = self._key_path(exchange, symbol, interval, startTime, endTime)
+        data = json.dumps(page, separators=(",", ":"))
+        try:
+            ### An overwritten page replaces the size of the old file
+            replaced_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w") as cache_file:
+                cache_file.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            if self.logger:
+                self.logger.logger.error(f"CacheManager put: {str(e)}")
+            return
+
+        with self._lock:
+            if self._size is None:
+                ### The first scan of the directory already counts the new file
+                self._size = self._current_size()
+            else:
+                self._size += len(data) - replaced_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used pages until the cache is under CACHE_EVICT_RATIO of its size cap.
+        """
+        cache_files = sorted(self._cache_files())
+        size = sum(size for _, size, _ in cache_files)
+        target = self.max_bytes * CACHE_EVICT_RATIO
+        for _, file_size, path in cache_files:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+                size -= file_size
+            except OSError:
+                pass
+        self._size = size
+        if self.logger:
+            self.logger.log_debug(f"CacheManager evicted to {size} bytes")
+
+    def stats(self) -> dict:
+        """
+        Returns hit, miss and size statistics.
+
+        Returns:
+            dict: hits, misses and size (bytes) of the cache.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": self._current_size(),
+            }
+
+
+class SeriesCache:
+    """
+    Process-wide in-memory cache of loaded OHLCV series, shared by the GenerateOHLCV instances of a process.
+
+    Entries are keyed by (data directory, exchange, symbol, base unit) and hold the DataFrame with the first
+    candle time it covers: every stored candle from that time on is in the DataFrame. A lookup from an
+    earlier time misses, so the series is read from disk again. Writers put their saved DataFrame,
+    replacing the entry, so readers never see an older version than the last save of the process.
+    The cache has a memory budget with LRU eviction. Cached DataFrames are shared and must not be modified in place.
+
+    Methods:
+        - __init__(max_bytes: int = DEFAULT_SERIES_CACHE_MAX_BYTES, logger=None): Initializes the SeriesCache instance.
+        - get(key: tuple, start: int = None) -> pd.DataFrame | None: Returns the cached series from start on, or None.
+        - put(key: tuple, ohlcv_dataframe: pd.DataFrame, start: int = None) -> None: Stores or replaces a series.
+        - invalidate(key: tuple = None) -> None: Removes one series, or all series.
+        - stats() -> dict: Returns hit, miss, eviction and size statistics.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_SERIES_CACHE_MAX_BYTES, logger=None):
+        """
+        Initialize SeriesCache class.
+
+        Parameters:
+            max_bytes (int): Memory budget of the cached DataFrames in bytes.
+            logger: LoggerManager instance (optional).
+        """
+        self.max_bytes = max_bytes
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: tuple, start: int = None):
+        """
+        Returns the cached series from start on (Unix timestamp in seconds), or None
+        if it is not cached or the cached series does not cover start.
+
+        Returns:
+            pd.DataFrame | None: The cached OHLCV DataFrame.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (
+                start is not None and entry[1] is not None and start < entry[1]
+            ):
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            ohlcv_dataframe = entry[0]
+
+        if start is None or ohlcv_dataframe.empty:
+            return ohlcv_dataframe
+        first = ohlcv_dataframe.index.asi8.searchsorted(int(start * 1e9))
+        return ohlcv_dataframe.iloc[first:] if first else ohlcv_dataframe
+
+    def put(self, key: tuple, ohlcv_dataframe, start: int = None) -> None:
+        """
+        Stores or replaces a series.
+
+        Parameters:
+            key (tuple): (data directory, exchange, symbol, base unit).
+            ohlcv_dataframe (pd.DataFrame): The series, it must hold every stored candle from start on.
+            start (int): First candle time covered by the series, Unix timestamp in seconds
+                (default: the first candle of the series).
+        """
+        if ohlcv_dataframe is None:
+            self.invalidate(key=key)
+            return
+        if not ohlcv_dataframe.empty:
+            first = int(ohlcv_dataframe.index.asi8[0] // 10**9)
+            start = first if start is None else min(start, first)
+        size = int(ohlcv_dataframe.memory_usage(index=True, deep=False).sum())
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (ohlcv_dataframe, start, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+        if self.logger:
+            self.logger.log_debug(f"SeriesCache put {key}: {size} bytes")
+
+    def invalidate(self, key: tuple = None) -> None:
+        """
+        Removes one series, or all series when key is None.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._size = 0
+                return
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size -= entry[2]
+
+    def stats(self) -> dict:
+        """
+        Returns hit, miss, eviction and size statistics.
+
+        Returns:
+            dict: hits, misses, evictions, entries and size (bytes) of the cache.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "size": self._size,
+            }
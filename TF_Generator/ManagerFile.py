@@ -1,4 +1,9 @@
 import pandas as pd
+import numpy as np
+import itertools
+import threading
+import sqlite3
+import json
 import sys
 import os
 
@@ -9,31 +14,116 @@ app_directory = os.path.abspath(os.path.join(folder_path, os.pardir))
 # print(app_directory)
 
 sys.path.append(app_directory)
-from TF_Generator.OrganizerDataFrame import DataFrameOrg
+from TF_Generator.OrganizerDataFrame import DataFrameOrg, STORAGE_TIMEZONE
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+### STORAGE_FUNCTIONS (dict): Mapping of storage formats to their (save, read) method names.
+STORAGE_FUNCTIONS = {
+    "parquet": ("_save_parquet", "_read_parquet"),
+    "feather": ("_save_feather", "_read_feather"),
+    "csv": ("_save_csv", "_read_csv"),
+    "mmap": ("_save_mmap", "_read_mmap"),
+    "partitioned": ("_save_partitioned", "_read_partitioned"),
+    "sqlite": ("_save_sqlite", "_read_sqlite"),
+}
+### APPEND_FUNCTIONS (dict): Storage formats that append new rows to the file itself instead of writing segments.
+APPEND_FUNCTIONS = {"mmap": "_append_mmap"}
+### STORE_FORMATS (set): Storage formats that keep the whole history: saves upsert the new rows in place
+### (no rewrite, no segments, no trimming) and reads load only the requested time range.
+STORE_FORMATS = {"partitioned", "sqlite"}
+### SHARED_FILES (dict): Storage formats that keep all series of a data directory in one file, and its name.
+SHARED_FILES = {"sqlite": "ohlcv.sqlite"}
+### FILE_EXTENSIONS (dict): Mapping of storage formats to file extensions.
+FILE_EXTENSIONS = {
+    "parquet": "parquet",
+    "feather": "feather",
+    "csv": "csv",
+    "mmap": "mmap",
+    "partitioned": "parts",
+    "sqlite": "sqlite",
+}
+### MMAP_HEADER_BYTES (int): Size of the JSON header of a memory-mapped file, the records start after it.
+MMAP_HEADER_BYTES = 4096
+### MMAP_MAGIC (bytes): First bytes of a memory-mapped file.
+MMAP_MAGIC = b"OHLCVMM1"
+### PARTITION_INDEX (str): File name of the partition index of a partitioned store.
+PARTITION_INDEX = "_index.json"
+### PARTITION_UNIT (str): NumPy datetime unit of a partition (one memory-mapped chunk per month, UTC).
+PARTITION_UNIT = "M"
+### SQLITE_BUSY_TIMEOUT (float): Seconds a SQLite connection waits for the write lock of another process.
+SQLITE_BUSY_TIMEOUT = 30.0
+### SQLITE_SERIES_TABLE (str): Table with the columns, index name and timezone of every SQLite series.
+SQLITE_SERIES_TABLE = "_series"
+### DEFAULT_STORAGE_FORMAT (str): Columnar binary storage when pyarrow is installed, otherwise CSV.
+DEFAULT_STORAGE_FORMAT = "parquet" if pyarrow is not None else "csv"
+### MAX_DELTA_SEGMENTS (int): Number of appended segments after which a file is compacted.
+MAX_DELTA_SEGMENTS = 64
+### COMPACT_STALE_RATIO (float): Share of trimmed rows (relative to the DataFrame) kept on disk before a file is compacted.
+COMPACT_STALE_RATIO = 0.1
 
 
 class FileManager:
     """
     Class for managing OHLCV (Open, High, Low, Close, Volume) DataFrame files, including saving and reading.
 
+    Files are stored in one of the STORAGE_FUNCTIONS formats. The columnar binary formats (Parquet, Feather)
+    keep the dtypes and the timezone-aware index, so reading does not parse text or rebuild the index.
+    Files of the other formats are still read (e.g. existing CSV files) and replaced on the next save.
+
+    Saving is append-only: the rows that are new or changed since the last flush are written as a segment
+    in the FILE_NAME.delta directory, and the file is compacted in the background when it holds
+    too many trimmed rows (COMPACT_STALE_RATIO) or segments (MAX_DELTA_SEGMENTS).
+    The file itself is only complete after a compaction: the rows of up to MAX_DELTA_SEGMENTS saves
+    are in the segments, so readers outside FileManager (pandas, CSV tools) see the file without them
+    and must read the series with _read_df_ohlcv. Segment names are reserved with an exclusive create,
+    so writers of the same series in several processes do not overwrite each other's segments.
+    The STORE_FORMATS (time partitions, SQLite in WAL mode) keep the whole history, upsert the new rows
+    and read only the requested range.
+
     Methods:
-        - __init__(data_directory: str, logger=None): Initializes the FileManager instance.
+        - __init__(data_directory: str, logger=None, storage_format: str = DEFAULT_STORAGE_FORMAT): Initializes the FileManager instance.
         - _setup_file_manager(): Sets up the FileManager by initializing necessary instances.
-        - _save_df_ohlcv(file_name: str, ohlcv_dataframe: pd.DataFrame) -> None: Saves the OHLCV DataFrame to a CSV file.
-        - _read_df_ohlcv(file_name: str) -> pd.DataFrame | None: Reads the existing OHLCV DataFrame from a CSV file.
+        - _save_df_ohlcv(file_name: str, ohlcv_dataframe: pd.DataFrame) -> None: Saves the new rows of the OHLCV DataFrame in the storage format.
+        - _read_df_ohlcv(file_name: str, start: int = None, end: int = None) -> pd.DataFrame | None: Reads the existing OHLCV DataFrame (optionally a time range).
+        - _wait_compactions() -> None: Waits for the background compactions in progress.
+        - _reset_flush(file_name: str) -> None: Forgets the flush state of a file, so its next save writes the whole DataFrame.
         - __del__(): Destructor, performs cleanup tasks when the instance is deleted.
     """
 
-    def __init__(self, data_directory: str, logger=None):
+    def __init__(
+        self,
+        data_directory: str,
+        logger=None,
+        storage_format: str = DEFAULT_STORAGE_FORMAT,
+    ):
         """
         Initialize FileManager class.
 
         Parameters:
             data_directory (str): The directory path where OHLCV DataFrame files will be stored.
             logger: Optional logger instance for logging messages.
+            storage_format (str): One of the STORAGE_FUNCTIONS formats ("parquet", "feather", "csv", "mmap", "partitioned", "sqlite").
         """
+        if storage_format not in STORAGE_FUNCTIONS:
+            raise ValueError(
+                f"Invalid storage format: {storage_format}, "
+                f"it should be one of {list(STORAGE_FUNCTIONS)}."
+            )
         self.data_directory = data_directory
         self.logger = logger
+        self.storage_format = storage_format
+
+        ### Flushed state, lock and background compaction of each file
+        self._flushed = {}
+        self._file_locks = {}
+        self._compactions = {}
+        self._flushed_lock = threading.Lock()
+        ### Stamp of every append, a compaction is dropped when the file changed after its snapshot
+        self._generations = itertools.count(1)
 
         if self.logger is None:
             pass
@@ -48,9 +138,75 @@ class FileManager:
         # Initialize DataFrame Organizer
         self.df_organizer_instance = DataFrameOrg(logger=self.logger)
 
+    def _file_path(self, file_name: str, storage_format: str = None) -> str:
+        """
+        Returns the path of a file in the storage format.
+        """
+        if storage_format is None:
+            storage_format = self.storage_format
+        if storage_format in SHARED_FILES:
+            return os.path.join(self.data_directory, SHARED_FILES[storage_format])
+        return os.path.join(
+            self.data_directory, f"{file_name}.{FILE_EXTENSIONS[storage_format]}"
+        )
+
+    def _delta_directory(self, file_name: str) -> str:
+        """
+        Returns the directory of the appended segments of a file.
+        """
+        return os.path.join(self.data_directory, f"{file_name}.delta")
+
+    def _delta_segments(self, file_name: str) -> list:
+        """
+        Returns the appended segments of a file as (sequence, path) tuples in append order.
+        """
+        delta_directory = self._delta_directory(file_name=file_name)
+        if not os.path.isdir(delta_directory):
+            return []
+        segments = []
+        for entry in os.scandir(delta_directory):
+            sequence, _, extension = entry.name.partition(".")
+            if sequence.isdigit() and extension in FILE_EXTENSIONS.values():
+                try:
+                    if entry.stat().st_size == 0:
+                        ### Reserved by a writer and not written yet
+                        continue
+                except FileNotFoundError:
+                    ### Removed by a compaction
+                    continue
+                segments.append((int(sequence), entry.path))
+        return sorted(segments)
+
+    def _file_lock(self, file_name: str) -> threading.Lock:
+        with self._flushed_lock:
+            return self._file_locks.setdefault(file_name, threading.Lock())
+
+    @staticmethod
+    def _flush_state(
+        ohlcv_dataframe: pd.DataFrame, rows: int, segments: int, next_sequence: int
+    ) -> dict:
+        """
+        Returns the flushed state of a file: the first and last index values and the last row on disk,
+        the number of rows on disk (including trimmed rows) and of appended segments.
+        """
+        index_values = ohlcv_dataframe.index.asi8
+        return {
+            "first": index_values[0],
+            "last": index_values[-1],
+            "last_row": ohlcv_dataframe.iloc[-1].to_numpy(),
+            "rows": rows,
+            "segments": segments,
+            "next_sequence": next_sequence,
+        }
+
     def _save_df_ohlcv(self, file_name: str, ohlcv_dataframe: pd.DataFrame) -> None:
         """
-        Saves the OHLCV DataFrame to a CSV file.
+        Saves the OHLCV DataFrame in the storage format.
+
+        Only the rows that are new or changed since the last flush (rows from the last flushed candle on)
+        are appended as a segment; an unchanged DataFrame is not written at all.
+        The whole file is written when nothing was flushed before, when the DataFrame starts before the file,
+        and by a background compaction when the file holds too many trimmed rows or segments.
 
         Parameters:
             file_name (str): The name of the file to be saved.
@@ -59,42 +215,307 @@ class FileManager:
         if self.logger:
             self.logger.logger.info("_save_df_ohlcv (function)")
 
+        if ohlcv_dataframe is None or ohlcv_dataframe.empty:
+            return
+
+        with self._file_lock(file_name=file_name):
+            state = self._flushed.get(file_name)
+            index_values = ohlcv_dataframe.index.asi8
+            if state is None or index_values[0] < state["first"]:
+                self._write_file(file_name=file_name, ohlcv_dataframe=ohlcv_dataframe)
+                return
+
+            ### Rows before the last flushed candle are closed and already on disk
+            start = index_values.searchsorted(state["last"])
+            new_rows = ohlcv_dataframe.iloc[start:]
+            rewritten = start < len(index_values) and index_values[start] == state["last"]
+            if new_rows.empty or (
+                len(new_rows) == 1
+                and rewritten
+                and np.array_equal(new_rows.iloc[-1].to_numpy(), state["last_row"])
+            ):
+                if self.logger:
+                    self.logger.log_debug(f"{file_name}: no new rows to save")
+                return
+
+            if self.storage_format in STORE_FORMATS:
+                ### Stores upsert the new rows, the rewritten candle is replaced
+                self._save_store(file_name=file_name, ohlcv_dataframe=new_rows)
+                segments, next_sequence = state["segments"], state["next_sequence"]
+            elif self.storage_format in APPEND_FUNCTIONS:
+                ### The file itself grows, the rewritten candle is replaced in place
+                append_function = APPEND_FUNCTIONS[self.storage_format]
+                appended = getattr(self, append_function)(
+                    file_path=self._file_path(file_name=file_name),
+                    new_rows=new_rows,
+                    rewritten=rewritten,
+                )
+                if not appended:
+                    self._write_file(file_name=file_name, ohlcv_dataframe=ohlcv_dataframe)
+                    return
+                segments, next_sequence = state["segments"], state["next_sequence"]
+            else:
+                sequence = self._append_segment(
+                    file_name=file_name,
+                    sequence=state["next_sequence"],
+                    new_rows=new_rows,
+                )
+                segments, next_sequence = state["segments"] + 1, sequence + 1
+            state.update(
+                self._flush_state(
+                    ohlcv_dataframe=ohlcv_dataframe,
+                    rows=state["rows"] + len(new_rows) - int(rewritten),
+                    segments=segments,
+                    next_sequence=next_sequence,
+                )
+            )
+            state["first"] = min(state["first"], index_values[0])
+            state["generation"] = next(self._generations)
+
+            stale_rows = state["rows"] - len(ohlcv_dataframe)
+            if self.storage_format in STORE_FORMATS:
+                return
+            if (
+                state["segments"] >= MAX_DELTA_SEGMENTS
+                or stale_rows > len(ohlcv_dataframe) * COMPACT_STALE_RATIO
+            ):
+                self._compact_in_background(
+                    file_name=file_name,
+                    ohlcv_dataframe=ohlcv_dataframe.copy(),
+                    last_sequence=state["next_sequence"] - 1,
+                    generation=state["generation"],
+                )
+
+    def _save_store(self, file_name: str, ohlcv_dataframe: pd.DataFrame) -> None:
+        """
+        Upserts the rows of the OHLCV DataFrame into a store format (STORE_FORMATS).
+        """
+        os.makedirs(self.data_directory, exist_ok=True)
+        save_function = STORAGE_FUNCTIONS[self.storage_format][0]
+        getattr(self, save_function)(
+            file_path=self._file_path(file_name=file_name),
+            file_name=file_name,
+            ohlcv_dataframe=ohlcv_dataframe,
+        )
+
+    def _write_file(
+        self, file_name: str, ohlcv_dataframe: pd.DataFrame, last_sequence: int = None
+    ) -> int:
+        """
+        Writes the whole OHLCV DataFrame and removes the appended segments up to last_sequence (all by default).
+        The file is written to a temporary path and then renamed, so readers never see a partial file.
+        The caller holds the lock of the file.
+
+        Returns:
+            int: Number of segments left (appended after last_sequence).
+        """
         # Ensure the data directory exists
         os.makedirs(self.data_directory, exist_ok=True)
-        # Construct the file path
-        file_path = os.path.join(self.data_directory, f"{file_name}.csv")
-        # Save the DataFrame to a CSV file
-        ohlcv_dataframe.to_csv(file_path)
+        if self.storage_format in STORE_FORMATS:
+            ### Stores keep their history, the rows are upserted in place
+            self._save_store(file_name=file_name, ohlcv_dataframe=ohlcv_dataframe)
+        else:
+            # Construct the file path
+            file_path = self._file_path(file_name=file_name)
+            # Save the DataFrame in the storage format
+            save_function = STORAGE_FUNCTIONS[self.storage_format][0]
+            temp_path = f"{file_path}.{os.getpid()}.tmp"
+            getattr(self, save_function)(
+                file_path=temp_path, ohlcv_dataframe=ohlcv_dataframe
+            )
+            os.replace(temp_path, file_path)
+
+        remaining_segments = 0
+        for sequence, segment_path in self._delta_segments(file_name=file_name):
+            if last_sequence is None or sequence <= last_sequence:
+                os.remove(segment_path)
+            else:
+                remaining_segments += 1
+
+        if last_sequence is None:
+            state = self._flushed.get(file_name) or {"next_sequence": 0}
+            self._flushed[file_name] = self._flush_state(
+                ohlcv_dataframe=ohlcv_dataframe,
+                rows=len(ohlcv_dataframe),
+                segments=0,
+                next_sequence=state["next_sequence"],
+            )
+        return remaining_segments
+
+    def _append_segment(
+        self, file_name: str, sequence: int, new_rows: pd.DataFrame
+    ) -> int:
+        """
+        Writes new rows as the next appended segment of a file.
+        The segment name is reserved with an exclusive create (an empty file, skipped by readers),
+        a sequence taken by another writer is skipped.
+
+        Returns:
+            int: The sequence of the written segment.
+        """
+        delta_directory = self._delta_directory(file_name=file_name)
+        os.makedirs(delta_directory, exist_ok=True)
+        while True:
+            segment_path = os.path.join(
+                delta_directory,
+                f"{sequence:08d}.{FILE_EXTENSIONS[self.storage_format]}",
+            )
+            try:
+                os.close(os.open(segment_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                sequence += 1
+
+        temp_path = f"{segment_path}.{os.getpid()}.tmp"
+        save_function = STORAGE_FUNCTIONS[self.storage_format][0]
+        try:
+            getattr(self, save_function)(file_path=temp_path, ohlcv_dataframe=new_rows)
+            os.replace(temp_path, segment_path)
+        except BaseException:
+            ### Release the reserved name
+            os.remove(segment_path)
+            raise
+        return sequence
+
+    def _compact_in_background(
+        self,
+        file_name: str,
+        ohlcv_dataframe: pd.DataFrame,
+        last_sequence: int,
+        generation: int,
+    ) -> None:
+        """
+        Rewrites a file without its trimmed rows and segments in a background thread.
+        The thread is not a daemon thread, so a compaction in progress completes before the process exits.
+        The compaction is dropped when the file was appended to after the snapshot (generation changed),
+        the next save starts a new one.
+        """
+        with self._flushed_lock:
+            if file_name in self._compactions:
+                return
+            self._compactions[file_name] = threading.Thread(
+                target=self._compact,
+                args=(file_name, ohlcv_dataframe, last_sequence, generation),
+                name=f"compact-{file_name}",
+            )
+            self._compactions[file_name].start()
 
-    def _read_df_ohlcv(self, file_name: str) -> pd.DataFrame | None:
+    def _compact(
+        self,
+        file_name: str,
+        ohlcv_dataframe: pd.DataFrame,
+        last_sequence: int,
+        generation: int,
+    ) -> None:
+        try:
+            with self._file_lock(file_name=file_name):
+                state = self._flushed.get(file_name)
+                if state is None or state.get("generation") != generation:
+                    ### Rows were appended (in place for mmap files) or the whole file was written
+                    ### since the snapshot was taken, replacing the file would lose them
+                    if self.logger:
+                        self.logger.log_debug(f"{file_name}: compaction dropped")
+                    return
+                remaining_segments = self._write_file(
+                    file_name=file_name,
+                    ohlcv_dataframe=ohlcv_dataframe,
+                    last_sequence=last_sequence,
+                )
+                state["rows"] = len(ohlcv_dataframe)
+                state["segments"] = remaining_segments
+                state["first"] = ohlcv_dataframe.index.asi8[0]
+            if self.logger:
+                self.logger.log_debug(f"{file_name}: compacted")
+        except Exception as e:
+            if self.logger:
+                self.logger.logger.error(f"Error in _compact ({file_name}): {str(e)}")
+        finally:
+            with self._flushed_lock:
+                self._compactions.pop(file_name, None)
+
+    def _wait_compactions(self) -> None:
+        """
+        Waits for the background compactions in progress.
         """
-        Reads the existing OHLCV DataFrame from a CSV file.
+        with self._flushed_lock:
+            compactions = list(self._compactions.values())
+        for compaction in compactions:
+            compaction.join()
+
+    def _reset_flush(self, file_name: str) -> None:
+        """
+        Forgets the flush state of a file, so its next save writes the whole DataFrame.
+        Needed when rows before the last flushed candle change (e.g. repaired gaps), saves only append newer rows.
+        A background compaction in progress is dropped, the whole file is written by the next save.
+        """
+        with self._file_lock(file_name=file_name):
+            self._flushed.pop(file_name, None)
+
+    def _read_df_ohlcv(
+        self, file_name: str, start: int = None, end: int = None
+    ) -> pd.DataFrame | None:
+        """
+        Reads the existing OHLCV DataFrame with its appended segments, optionally only the rows in [start, end].
+        The file in the storage format is read first, then a file in any other format.
+        Store formats (STORE_FORMATS) read only the rows of the range.
+        The index is returned in UTC (STORAGE_TIMEZONE), files written with a local index included.
 
         Parameters:
             file_name (str): The name of the file to be read.
+            start (int): First candle time to read, Unix timestamp in seconds (optional).
+            end (int): Last candle time to read, Unix timestamp in seconds (optional).
 
         Returns:
-            pd.DataFrame | None: The read OHLCV DataFrame or None if the file does not exist.
+            pd.DataFrame | None: The read OHLCV DataFrame or None if the file does not exist or has no rows in the range.
         """
         if self.logger:
             self.logger.logger.info("read_df_ohlcv (function)")
 
-        # Construct the file path
-        file_path = os.path.join(self.data_directory, f"{file_name}.csv")
+        storage_formats = [self.storage_format] + [
+            storage_format
+            for storage_format in STORAGE_FUNCTIONS
+            if storage_format != self.storage_format
+        ]
+        for storage_format in storage_formats:
+            # Construct the file path
+            file_path = self._file_path(file_name=file_name, storage_format=storage_format)
 
-        # Check if the file exists
-        if os.path.exists(file_path):
+            # Check if the file exists
+            if not os.path.exists(file_path):
+                continue
             if self.logger:
                 self.logger.logger.info(
-                    "The CSV DataFrame file exists and is being read."
+                    f"The {storage_format} DataFrame file exists and is being read."
                 )
-            # Read the DataFrame from the CSV file
-            existing_ohlcv_df = pd.read_csv(file_path)
+            with self._file_lock(file_name=file_name):
+                ### A file that can not be read (e.g. corrupt) is skipped, the next format is tried
+                try:
+                    read_result = self._read_format(
+                        file_name=file_name,
+                        file_path=file_path,
+                        storage_format=storage_format,
+                        start=start,
+                        end=end,
+                    )
+                except Exception as e:
+                    if self.logger:
+                        self.logger.logger.error(
+                            f"Error in _read_df_ohlcv ({file_path}): {str(e)}"
+                        )
+                    continue
+                if read_result is None:
+                    continue
+                existing_ohlcv_df, rows, segments, next_sequence = read_result
+                if existing_ohlcv_df.empty:
+                    continue
+                if storage_format == self.storage_format:
+                    self._flushed[file_name] = self._flush_state(
+                        ohlcv_dataframe=existing_ohlcv_df,
+                        rows=rows,
+                        segments=segments,
+                        next_sequence=next_sequence,
+                    )
 
-            # Index the DataFrame
-            existing_ohlcv_df = self.df_organizer_instance._index_dataframe(
-                ohlcv_dataframe=existing_ohlcv_df
-            )
             if self.logger:
                 self.logger.log_debug(
                     f"existing_ohlcv_df: True \n{existing_ohlcv_df}\n"
@@ -104,6 +525,465 @@ class FileManager:
             self.logger.logger.info("existing_ohlcv_df does not exists (return: None)")
         return
 
+    def _read_format(
+        self,
+        file_name: str,
+        file_path: str,
+        storage_format: str,
+        start: int = None,
+        end: int = None,
+    ) -> tuple | None:
+        """
+        Reads the OHLCV DataFrame of a file in one storage format, with its appended segments.
+
+        Returns:
+            Tuple[pd.DataFrame, int, int, int] | None: The DataFrame of the rows in [start, end], the number of
+            rows on disk, the number of segments and the next segment sequence, or None if the file has no DataFrame.
+        """
+        read_function = STORAGE_FUNCTIONS[storage_format][1]
+        if storage_format in STORE_FORMATS:
+            existing_ohlcv_df = getattr(self, read_function)(
+                file_path=file_path, file_name=file_name, start=start, end=end
+            )
+            if existing_ohlcv_df is None:
+                return None
+            return existing_ohlcv_df, len(existing_ohlcv_df), 0, 0
+
+        existing_ohlcv_df = self.df_organizer_instance._localize_dataframe(
+            ohlcv_dataframe=getattr(self, read_function)(file_path=file_path)
+        )
+        if existing_ohlcv_df is None:
+            return None
+        existing_ohlcv_df, segments, next_sequence = self._read_segments(
+            file_name=file_name, ohlcv_dataframe=existing_ohlcv_df
+        )
+        rows = len(existing_ohlcv_df)
+        existing_ohlcv_df = self._slice_range(
+            ohlcv_dataframe=existing_ohlcv_df, start=start, end=end
+        )
+        return existing_ohlcv_df, rows, segments, next_sequence
+
+    @staticmethod
+    def _slice_range(
+        ohlcv_dataframe: pd.DataFrame, start: int = None, end: int = None
+    ) -> pd.DataFrame:
+        """
+        Returns the rows of the DataFrame in [start, end] (Unix timestamps in seconds).
+        """
+        if start is None and end is None:
+            return ohlcv_dataframe
+        index_values = ohlcv_dataframe.index.asi8
+        first = 0 if start is None else index_values.searchsorted(int(start * 1e9))
+        last = (
+            len(index_values)
+            if end is None
+            else index_values.searchsorted(int(end * 1e9), side="right")
+        )
+        return ohlcv_dataframe.iloc[first:last]
+
+    def _read_segments(
+        self, file_name: str, ohlcv_dataframe: pd.DataFrame
+    ) -> (pd.DataFrame, int, int):
+        """
+        Applies the appended segments of a file to its DataFrame, a later row replaces an earlier one.
+
+        Returns:
+            Tuple[pd.DataFrame, int, int]: The DataFrame, the number of segments and the next segment sequence.
+        """
+        segment_frames = []
+        next_sequence = 0
+        for sequence, segment_path in self._delta_segments(file_name=file_name):
+            storage_format = segment_path.rsplit(".", 1)[-1]
+            read_function = STORAGE_FUNCTIONS[storage_format][1]
+            try:
+                segment_frames.append(
+                    self.df_organizer_instance._localize_dataframe(
+                        ohlcv_dataframe=getattr(self, read_function)(file_path=segment_path)
+                    )
+                )
+            except FileNotFoundError:
+                ### Removed by a compaction of another process, its rows are in the file
+                continue
+            next_sequence = sequence + 1
+
+        if segment_frames:
+            ohlcv_dataframe = pd.concat([ohlcv_dataframe] + segment_frames)
+            ohlcv_dataframe = ohlcv_dataframe[
+                ~ohlcv_dataframe.index.duplicated(keep="last")
+            ].sort_index()
+        return ohlcv_dataframe, len(segment_frames), next_sequence
+
+    @staticmethod
+    def _save_parquet(file_path: str, ohlcv_dataframe: pd.DataFrame) -> None:
+        ohlcv_dataframe.to_parquet(file_path, engine="pyarrow", index=True)
+
+    @staticmethod
+    def _read_parquet(file_path: str) -> pd.DataFrame:
+        ### The index and its timezone are restored from the pandas metadata of the file
+        return pd.read_parquet(file_path, engine="pyarrow")
+
+    @staticmethod
+    def _save_feather(file_path: str, ohlcv_dataframe: pd.DataFrame) -> None:
+        ### Feather does not store an index, it is kept as the first column
+        ohlcv_dataframe.reset_index().to_feather(file_path)
+
+    @staticmethod
+    def _read_feather(file_path: str) -> pd.DataFrame:
+        ohlcv_dataframe = pd.read_feather(file_path)
+        return ohlcv_dataframe.set_index(ohlcv_dataframe.columns[0])
+
+    @staticmethod
+    def _save_csv(file_path: str, ohlcv_dataframe: pd.DataFrame) -> None:
+        ohlcv_dataframe.to_csv(file_path)
+
+    def _read_csv(self, file_path: str) -> pd.DataFrame:
+        # Read the DataFrame from the CSV file and index it
+        return self.df_organizer_instance._index_dataframe(
+            ohlcv_dataframe=pd.read_csv(file_path)
+        )
+
+    @staticmethod
+    def _mmap_dtype(columns: int, value_dtype: str = "<f8") -> np.dtype:
+        ### One fixed-width record per candle: int64 index (ns since epoch, UTC) and float64 (float32 compact) columns
+        return np.dtype([("index", "<i8"), ("values", value_dtype, (columns,))])
+
+    @staticmethod
+    def _mmap_value_dtype(ohlcv_dataframe: pd.DataFrame) -> str:
+        ### Compact DataFrames (all columns float32) keep their size on disk
+        if len(ohlcv_dataframe.columns) and (ohlcv_dataframe.dtypes == np.float32).all():
+            return "<f4"
+        return "<f8"
+
+    @staticmethod
+    def _mmap_records(ohlcv_dataframe: pd.DataFrame, value_dtype: str = "<f8") -> np.ndarray:
+        records = np.empty(
+            len(ohlcv_dataframe),
+            dtype=FileManager._mmap_dtype(len(ohlcv_dataframe.columns), value_dtype),
+        )
+        records["index"] = ohlcv_dataframe.index.asi8
+        records["values"] = ohlcv_dataframe.to_numpy(dtype=value_dtype)
+        return records
+
+    @staticmethod
+    def _mmap_header(file_path: str) -> dict:
+        with open(file_path, "rb") as mmap_file:
+            header = mmap_file.read(MMAP_HEADER_BYTES)
+        if not header.startswith(MMAP_MAGIC):
+            raise ValueError(f"Invalid memory-mapped OHLCV file: {file_path}")
+        return json.loads(header[len(MMAP_MAGIC) :].rstrip(b" "))
+
+    @staticmethod
+    def _save_mmap(file_path: str, ohlcv_dataframe: pd.DataFrame) -> None:
+        index = ohlcv_dataframe.index
+        value_dtype = FileManager._mmap_value_dtype(ohlcv_dataframe)
+        header = MMAP_MAGIC + json.dumps(
+            {
+                "columns": [str(column) for column in ohlcv_dataframe.columns],
+                "index": index.name,
+                "timezone": str(index.tz) if index.tz is not None else None,
+                "dtype": value_dtype,
+            }
+        ).encode()
+        with open(file_path, "wb") as mmap_file:
+            mmap_file.write(header.ljust(MMAP_HEADER_BYTES, b" "))
+            FileManager._mmap_records(ohlcv_dataframe, value_dtype).tofile(mmap_file)
+
+    @staticmethod
+    def _read_mmap(file_path: str) -> pd.DataFrame:
+        """
+        Maps the file copy-on-write: the value columns are views of the shared page cache
+        (no copy, no parsing), only the index is materialized.
+        Rows appended by a writer are seen by the next read; a partially written record is ignored.
+        """
+        header = FileManager._mmap_header(file_path=file_path)
+        dtype = FileManager._mmap_dtype(
+            len(header["columns"]), header.get("dtype", "<f8")
+        )
+        rows = (os.path.getsize(file_path) - MMAP_HEADER_BYTES) // dtype.itemsize
+        if rows > 0:
+            records = np.memmap(
+                file_path, dtype=dtype, mode="c", offset=MMAP_HEADER_BYTES, shape=(rows,)
+            )
+        else:
+            records = np.empty(0, dtype=dtype)
+
+        index = pd.DatetimeIndex(
+            np.asarray(records["index"]).view("datetime64[ns]"), name=header["index"]
+        )
+        if header["timezone"] is not None:
+            ### The records are UTC, files written with a local index are read in UTC as well
+            index = index.tz_localize(STORAGE_TIMEZONE)
+        return pd.DataFrame(
+            records["values"], index=index, columns=header["columns"], copy=False
+        )
+
+    @staticmethod
+    def _append_mmap(file_path: str, new_rows: pd.DataFrame, rewritten: bool) -> bool:
+        """
+        Appends new rows to a memory-mapped file, overwriting its last record when it is rewritten.
+
+        Returns:
+            bool: False when the rows do not fit the file (the caller writes the whole file).
+        """
+        try:
+            header = FileManager._mmap_header(file_path=file_path)
+        except (OSError, ValueError):
+            return False
+        value_dtype = header.get("dtype", "<f8")
+        if (
+            header["columns"] != [str(column) for column in new_rows.columns]
+            or FileManager._mmap_value_dtype(new_rows) != value_dtype
+        ):
+            return False
+
+        records = FileManager._mmap_records(new_rows, value_dtype)
+        itemsize = records.dtype.itemsize
+        rows = (os.path.getsize(file_path) - MMAP_HEADER_BYTES) // itemsize
+        position = MMAP_HEADER_BYTES + (rows - int(rewritten)) * itemsize
+        with open(file_path, "r+b") as mmap_file:
+            if rewritten:
+                ### The record to overwrite must be the rewritten candle
+                mmap_file.seek(position)
+                last_index = np.frombuffer(mmap_file.read(8), dtype="<i8")
+                if len(last_index) != 1 or last_index[0] != records["index"][0]:
+                    return False
+            mmap_file.seek(position)
+            mmap_file.write(records.tobytes())
+            mmap_file.truncate()
+        return True
+
+    @staticmethod
+    def _partition_index(file_path: str) -> dict:
+        try:
+            with open(os.path.join(file_path, PARTITION_INDEX)) as index_file:
+                return json.load(index_file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _save_partitioned(
+        file_path: str, ohlcv_dataframe: pd.DataFrame, file_name: str = None
+    ) -> None:
+        """
+        Upserts the rows of the DataFrame into the monthly partitions of the store, then writes the partition index.
+        Rows newer than a partition (the usual save) are appended to it in place, its last record is overwritten
+        when the open candle is rewritten. Otherwise the partition is rewritten (temporary file and rename),
+        replacing only the stored rows whose timestamps are in the DataFrame.
+        """
+        os.makedirs(file_path, exist_ok=True)
+        columns = [str(column) for column in ohlcv_dataframe.columns]
+        partition_index = FileManager._partition_index(file_path=file_path)
+        if partition_index is None or partition_index["columns"] != columns:
+            partition_index = {"columns": columns, "partitions": {}}
+        partitions = partition_index["partitions"]
+
+        index_values = ohlcv_dataframe.index.asi8
+        units = index_values.view("datetime64[ns]").astype(f"datetime64[{PARTITION_UNIT}]")
+        bounds = np.flatnonzero(units[1:] != units[:-1]) + 1
+        for first, last in zip(
+            np.concatenate([[0], bounds]), np.concatenate([bounds, [len(units)]])
+        ):
+            partition_name = str(units[first])
+            partition_rows = ohlcv_dataframe.iloc[first:last]
+            partition_path = os.path.join(file_path, f"{partition_name}.mmap")
+            partition = partitions.get(partition_name)
+            if partition is None or not os.path.exists(partition_path):
+                partition = None
+            elif index_values[first] >= partition["last"]:
+                rewritten = bool(index_values[first] == partition["last"])
+                if FileManager._append_mmap(
+                    file_path=partition_path, new_rows=partition_rows, rewritten=rewritten
+                ):
+                    partition["last"] = int(index_values[last - 1])
+                    partition["rows"] += len(partition_rows) - int(rewritten)
+                    continue
+            if partition is not None:
+                ### Keep the stored rows the new rows do not replace
+                existing_rows = FileManager._read_mmap(file_path=partition_path)
+                keep = ~np.isin(existing_rows.index.asi8, index_values[first:last])
+                if keep.any():
+                    partition_rows = pd.concat(
+                        [existing_rows[keep], partition_rows]
+                    ).sort_index()
+
+            temp_path = f"{partition_path}.{os.getpid()}.tmp"
+            FileManager._save_mmap(file_path=temp_path, ohlcv_dataframe=partition_rows)
+            os.replace(temp_path, partition_path)
+            partition_values = partition_rows.index.asi8
+            partitions[partition_name] = {
+                "first": int(partition_values[0]),
+                "last": int(partition_values[-1]),
+                "rows": len(partition_rows),
+            }
+
+        partition_index["partitions"] = dict(sorted(partitions.items()))
+        index_path = os.path.join(file_path, PARTITION_INDEX)
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as index_file:
+            json.dump(partition_index, index_file)
+        os.replace(temp_path, index_path)
+
+    @staticmethod
+    def _read_partitioned(
+        file_path: str, file_name: str = None, start: int = None, end: int = None
+    ) -> pd.DataFrame:
+        """
+        Reads the rows in [start, end] (Unix timestamps in seconds) from the partitions that overlap the range.
+        """
+        partition_index = FileManager._partition_index(file_path=file_path)
+        if partition_index is None:
+            return pd.DataFrame()
+        start_value = None if start is None else int(start * 1e9)
+        end_value = None if end is None else int(end * 1e9)
+
+        partition_frames = []
+        for partition_name, partition in partition_index["partitions"].items():
+            if start_value is not None and partition["last"] < start_value:
+                continue
+            if end_value is not None and partition["first"] > end_value:
+                continue
+            partition_frames.append(
+                FileManager._read_mmap(
+                    file_path=os.path.join(file_path, f"{partition_name}.mmap")
+                )
+            )
+        if not partition_frames:
+            return pd.DataFrame()
+        ohlcv_dataframe = (
+            partition_frames[0]
+            if len(partition_frames) == 1
+            else pd.concat(partition_frames)
+        )
+        return FileManager._slice_range(
+            ohlcv_dataframe=ohlcv_dataframe, start=start, end=end
+        )
+
+    ### Thread-local SQLite connections, keyed by (process, database path)
+    _SQLITE_CONNECTIONS = threading.local()
+
+    @staticmethod
+    def _sqlite_connection(file_path: str) -> sqlite3.Connection:
+        """
+        Returns the SQLite connection of the current thread to a database in WAL mode,
+        so readers do not block the writer and the writer does not block readers.
+        """
+        connections = FileManager._SQLITE_CONNECTIONS.__dict__.setdefault(
+            "connections", {}
+        )
+        key = (os.getpid(), file_path)
+        connection = connections.get(key)
+        if connection is None:
+            connection = sqlite3.connect(
+                file_path, timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{SQLITE_SERIES_TABLE}" ('
+                "exchange TEXT NOT NULL, symbol TEXT NOT NULL, columns TEXT NOT NULL, "
+                "index_name TEXT, timezone TEXT, PRIMARY KEY (exchange, symbol))"
+            )
+            connections[key] = connection
+        return connection
+
+    @staticmethod
+    def _sqlite_table(file_path: str) -> str:
+        ### One table per exchange: the data directory of an exchange holds the database
+        exchange = os.path.basename(os.path.dirname(os.path.abspath(file_path)))
+        return exchange.replace('"', "")
+
+    @staticmethod
+    def _save_sqlite(
+        file_path: str, ohlcv_dataframe: pd.DataFrame, file_name: str
+    ) -> None:
+        """
+        Upserts the rows of the DataFrame into the exchange table, keyed on (symbol, time).
+        The symbol is the series file name (symbol and timeframe), the time is the index in nanoseconds (UTC).
+        """
+        table = FileManager._sqlite_table(file_path=file_path)
+        columns = [str(column) for column in ohlcv_dataframe.columns]
+        index = ohlcv_dataframe.index
+        connection = FileManager._sqlite_connection(file_path=file_path)
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" ('
+                "symbol TEXT NOT NULL, time INTEGER NOT NULL, "
+                "PRIMARY KEY (symbol, time)) WITHOUT ROWID"
+            )
+            table_columns = {
+                row[1] for row in connection.execute(f'PRAGMA table_info("{table}")')
+            }
+            for column in columns:
+                if column not in table_columns:
+                    connection.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}" REAL')
+            connection.execute(
+                f'INSERT OR REPLACE INTO "{SQLITE_SERIES_TABLE}" VALUES (?, ?, ?, ?, ?)',
+                (
+                    table,
+                    file_name,
+                    json.dumps(columns),
+                    index.name,
+                    str(index.tz) if index.tz is not None else None,
+                ),
+            )
+
+            quoted_columns = ", ".join(f'"{column}"' for column in columns)
+            updates = ", ".join(f'"{column}" = excluded."{column}"' for column in columns)
+            values = ohlcv_dataframe.to_numpy(dtype="f8").tolist()
+            connection.executemany(
+                f'INSERT INTO "{table}" (symbol, time, {quoted_columns}) '
+                f"VALUES (?, ?{', ?' * len(columns)}) "
+                f"ON CONFLICT (symbol, time) DO UPDATE SET {updates}",
+                (
+                    (file_name, time_value, *row_values)
+                    for time_value, row_values in zip(index.asi8.tolist(), values)
+                ),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _read_sqlite(
+        file_path: str, file_name: str, start: int = None, end: int = None
+    ) -> pd.DataFrame:
+        """
+        Reads the rows of a series in [start, end] (Unix timestamps in seconds) with the primary key index.
+        """
+        table = FileManager._sqlite_table(file_path=file_path)
+        connection = FileManager._sqlite_connection(file_path=file_path)
+        series = connection.execute(
+            f'SELECT columns, index_name, timezone FROM "{SQLITE_SERIES_TABLE}" '
+            "WHERE exchange = ? AND symbol = ?",
+            (table, file_name),
+        ).fetchone()
+        if series is None:
+            return pd.DataFrame()
+        columns, index_name, timezone = json.loads(series[0]), series[1], series[2]
+
+        quoted_columns = ", ".join(f'"{column}"' for column in columns)
+        rows = connection.execute(
+            f'SELECT time, {quoted_columns} FROM "{table}" '
+            "WHERE symbol = ? AND time BETWEEN ? AND ? ORDER BY time",
+            (
+                file_name,
+                -(2**63) if start is None else int(start * 1e9),
+                2**63 - 1 if end is None else int(end * 1e9),
+            ),
+        ).fetchall()
+        if not rows:
+            return pd.DataFrame()
+        time_values = np.fromiter((row[0] for row in rows), dtype="i8", count=len(rows))
+        values = np.array([row[1:] for row in rows], dtype="f8")
+
+        index = pd.DatetimeIndex(time_values.view("datetime64[ns]"), name=index_name)
+        if timezone is not None:
+            index = index.tz_localize(STORAGE_TIMEZONE)
+        return pd.DataFrame(values, index=index, columns=columns, copy=False)
+
     def __del__(self):
         """
         Destructor, logs a message when the instance is deleted.
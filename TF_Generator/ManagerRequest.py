@@ -0,0 +1,345 @@
+from collections import deque
+import threading
+import asyncio
+import time
+
+### EXCHANGE_RATE_LIMITS (dict): Request budget of each exchange (budget weight per period seconds, weight of one history request).
+EXCHANGE_RATE_LIMITS = {
+    "Wallex": {"budget": 60, "period": 60, "weight": 1},
+    "Nobitex": {"budget": 60, "period": 60, "weight": 1},
+    "BingX": {"budget": 100, "period": 10, "weight": 1},
+    "Binance": {"budget": 6000, "period": 60, "weight": 2},
+    "Coinbase": {"budget": 10, "period": 1, "weight": 1},
+}
+### DEFAULT_RATE_LIMIT (dict): Request budget of exchanges missing from EXCHANGE_RATE_LIMITS.
+DEFAULT_RATE_LIMIT = {"budget": 60, "period": 60, "weight": 1}
+
+
+class TokenBucket:
+    """
+    Token bucket holding the request budget of one exchange.
+
+    Methods:
+        - __init__(budget: float, period: float): Initializes a full bucket.
+        - _refill(now: float) -> None: Adds the tokens earned since the last refill.
+        - _wait_time(weight: float, now: float) -> float: Seconds until the weight can be consumed.
+        - _consume(weight: float) -> None: Removes the weight from the bucket.
+        - _drain(seconds: float, now: float) -> None: Empties the bucket for the given number of seconds.
+    """
+
+    def __init__(self, budget: float, period: float):
+        """
+        Initialize TokenBucket class.
+
+        Parameters:
+            budget (float): Maximum weight that can be spent in one period.
+            period (float): Length of the period in seconds.
+        """
+        self.capacity = float(budget)
+        self.rate = float(budget) / float(period)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+    def _wait_time(self, weight: float, now: float) -> float:
+        self._refill(now)
+        ### A request heavier than the whole budget waits for a full bucket
+        weight = min(weight, self.capacity)
+        if self.tokens >= weight:
+            return 0.0
+        return (weight - self.tokens) / self.rate + max(0.0, self.updated - now)
+
+    def _consume(self, weight: float) -> None:
+        self.tokens -= min(weight, self.capacity)
+
+    def _drain(self, seconds: float, now: float) -> None:
+        self._refill(now)
+        self.tokens = 0.0
+        ### Tokens start to refill again after the back-off
+        self.updated = max(self.updated, now + seconds)
+
+
+class RequestScheduler:
+    """
+    Shared per-exchange request scheduler.
+
+    Each exchange (same keys as ExchangeAPI.BASE_URL) has its own token bucket.
+    Waiting requests are queued per key (usually the symbol) and served round-robin,
+    so a long backfill of one symbol can not starve the refresh of the others.
+    Waiting threads sleep on a condition; a waiting coroutine sleeps on the event of its ticket,
+    which is set when the ticket reaches the head of the queue (no polling).
+
+    Methods:
+        - __init__(rate_limits: dict = None): Initializes the RequestScheduler instance.
+        - configure(exchange: str, budget: float = None, period: float = None, weight: float = None) -> None: Changes the request budget of an exchange.
+        - acquire(exchange: str, key: str = None, weight: float = None) -> float: Blocks until the request may be sent.
+        - acquire_async(exchange: str, key: str = None, weight: float = None) -> float: Coroutine counterpart of acquire.
+        - _notify(exchange: str) -> None: Wakes the waiters after the queue or the bucket of an exchange changed.
+        - backoff(exchange: str, seconds: float = None) -> None: Pauses an exchange after a rate-limit response (HTTP 429).
+        - stats(exchange: str = None) -> dict: Returns queue depth and wait-time statistics.
+    """
+
+    def __init__(self, rate_limits: dict = None):
+        """
+        Initialize RequestScheduler class.
+
+        Parameters:
+            rate_limits (dict): Request budget of each exchange. Defaults to EXCHANGE_RATE_LIMITS.
+        """
+        if rate_limits is None:
+            rate_limits = EXCHANGE_RATE_LIMITS
+
+        self.rate_limits = {
+            exchange: dict(limit) for exchange, limit in rate_limits.items()
+        }
+        self._condition = threading.Condition()
+        self._buckets = {}
+        self._queues = {}
+        self._rotation = {}
+        self._stats = {}
+
+    def configure(
+        self,
+        exchange: str,
+        budget: float = None,
+        period: float = None,
+        weight: float = None,
+    ) -> None:
+        """
+        Changes the request budget of an exchange.
+
+        Parameters:
+            exchange (str): The name of the exchange.
+            budget (float): Maximum weight that can be spent in one period.
+            period (float): Length of the period in seconds.
+            weight (float): Default weight of one request.
+        """
+        with self._condition:
+            limit = self._rate_limit(exchange)
+            for key, value in (("budget", budget), ("period", period), ("weight", weight)):
+                if value is not None:
+                    limit[key] = value
+            self._buckets[exchange] = TokenBucket(
+                budget=limit["budget"], period=limit["period"]
+            )
+            self._notify(exchange)
+
+    def _rate_limit(self, exchange: str) -> dict:
+        if exchange not in self.rate_limits:
+            self.rate_limits[exchange] = dict(DEFAULT_RATE_LIMIT)
+        return self.rate_limits[exchange]
+
+    def _setup_exchange(self, exchange: str) -> None:
+        if exchange not in self._buckets:
+            limit = self._rate_limit(exchange)
+            self._buckets[exchange] = TokenBucket(
+                budget=limit["budget"], period=limit["period"]
+            )
+        if exchange not in self._queues:
+            self._queues[exchange] = {}
+            self._rotation[exchange] = deque()
+            self._stats[exchange] = {
+                "requests": 0,
+                "total_wait": 0.0,
+                "max_wait": 0.0,
+                "backoffs": 0,
+            }
+
+    def _enqueue(
+        self, exchange: str, key: str, weight: float, waker: tuple = None
+    ) -> list:
+        """
+        Queues a ticket [weight, enqueue time, waker], waker is the (event loop, asyncio.Event) of a coroutine.
+        """
+        with self._condition:
+            self._setup_exchange(exchange)
+            if weight is None:
+                weight = self.rate_limits[exchange]["weight"]
+            ticket = [weight, time.monotonic(), waker]
+            queue = self._queues[exchange]
+            if key not in queue:
+                queue[key] = deque()
+                self._rotation[exchange].append(key)
+            queue[key].append(ticket)
+            return ticket
+
+    def _dequeue(self, exchange: str, key: str, ticket: list) -> None:
+        """
+        Removes a ticket that was not granted (its waiter was cancelled or raised), so it does not stay at the
+        head of the round-robin queue and block the exchange. Granted tickets are already removed.
+        """
+        with self._condition:
+            queue = self._queues[exchange]
+            tickets = queue.get(key)
+            if tickets is None or not any(queued is ticket for queued in tickets):
+                return
+            queue[key] = deque(queued for queued in tickets if queued is not ticket)
+            if not queue[key]:
+                del queue[key]
+                self._rotation[exchange].remove(key)
+            self._notify(exchange)
+
+    def _notify(self, exchange: str) -> None:
+        """
+        Wakes the waiters after the queue or the bucket of an exchange changed: the threads through the condition,
+        and the coroutine whose ticket is at the head of the round-robin queue through its event.
+        The caller holds the condition.
+        """
+        self._condition.notify_all()
+        rotation = self._rotation.get(exchange)
+        if not rotation:
+            return
+        waker = self._queues[exchange][rotation[0]][0][2]
+        if waker is not None:
+            loop, event = waker
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                ### The event loop of the coroutine is closed
+                pass
+
+    def _try_acquire(self, exchange: str, key: str, ticket: list) -> (bool, float):
+        """
+        Grants the ticket when it is at the head of the round-robin queue and the bucket has enough tokens.
+
+        Returns:
+            Tuple[bool, float]: Whether the ticket was granted and the seconds to wait otherwise (None: not at the head).
+        """
+        rotation = self._rotation[exchange]
+        queue = self._queues[exchange]
+        if rotation[0] != key or queue[key][0] is not ticket:
+            return False, None
+
+        now = time.monotonic()
+        bucket = self._buckets[exchange]
+        wait_time = bucket._wait_time(ticket[0], now)
+        if wait_time > 0:
+            return False, wait_time
+
+        bucket._consume(ticket[0])
+        queue[key].popleft()
+        rotation.popleft()
+        if queue[key]:
+            rotation.append(key)
+        else:
+            del queue[key]
+
+        waited = now - ticket[1]
+        stats = self._stats[exchange]
+        stats["requests"] += 1
+        stats["total_wait"] += waited
+        stats["max_wait"] = max(stats["max_wait"], waited)
+        self._notify(exchange)
+        return True, waited
+
+    def acquire(self, exchange: str, key: str = None, weight: float = None) -> float:
+        """
+        Blocks until a request to the exchange may be sent.
+
+        Parameters:
+            exchange (str): The name of the exchange.
+            key (str): Fairness key of the request (usually the symbol).
+            weight (float): Weight of the request. Defaults to the weight of the exchange.
+
+        Returns:
+            float: Seconds spent waiting in the queue.
+        """
+        ticket = self._enqueue(exchange=exchange, key=key, weight=weight)
+        try:
+            with self._condition:
+                while True:
+                    granted, wait_time = self._try_acquire(exchange, key, ticket)
+                    if granted:
+                        return wait_time
+                    self._condition.wait(timeout=wait_time)
+        finally:
+            self._dequeue(exchange=exchange, key=key, ticket=ticket)
+
+    async def acquire_async(
+        self, exchange: str, key: str = None, weight: float = None
+    ) -> float:
+        """
+        Waits (without blocking the event loop) until a request to the exchange may be sent.
+
+        Parameters:
+            exchange (str): The name of the exchange.
+            key (str): Fairness key of the request (usually the symbol).
+            weight (float): Weight of the request. Defaults to the weight of the exchange.
+
+        Returns:
+            float: Seconds spent waiting in the queue.
+        """
+        event = asyncio.Event()
+        ticket = self._enqueue(
+            exchange=exchange,
+            key=key,
+            weight=weight,
+            waker=(asyncio.get_running_loop(), event),
+        )
+        try:
+            while True:
+                with self._condition:
+                    event.clear()
+                    granted, wait_time = self._try_acquire(exchange, key, ticket)
+                if granted:
+                    return wait_time
+                ### Woken up when the ticket reaches the head of the queue, at the head when the bucket has the tokens
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=wait_time)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._dequeue(exchange=exchange, key=key, ticket=ticket)
+
+    def backoff(self, exchange: str, seconds: float = None) -> None:
+        """
+        Pauses an exchange after a rate-limit response (HTTP 429).
+
+        Parameters:
+            exchange (str): The name of the exchange.
+            seconds (float): Back-off time in seconds. Defaults to the period of the exchange.
+        """
+        with self._condition:
+            self._setup_exchange(exchange)
+            if seconds is None:
+                seconds = self.rate_limits[exchange]["period"]
+            self._buckets[exchange]._drain(seconds=seconds, now=time.monotonic())
+            self._stats[exchange]["backoffs"] += 1
+            self._notify(exchange)
+
+    def stats(self, exchange: str = None) -> dict:
+        """
+        Returns queue depth and wait-time statistics.
+
+        Parameters:
+            exchange (str): The name of the exchange. Defaults to all exchanges.
+
+        Returns:
+            dict: Statistics of the exchange, or a dictionary of statistics keyed by exchange.
+        """
+        with self._condition:
+            if exchange is not None:
+                return self._exchange_stats(exchange)
+            return {name: self._exchange_stats(name) for name in self._stats}
+
+    def _exchange_stats(self, exchange: str) -> dict:
+        self._setup_exchange(exchange)
+        stats = dict(self._stats[exchange])
+        now = time.monotonic()
+        waiting = [ticket for queue in self._queues[exchange].values() for ticket in queue]
+        stats["queue_depth"] = len(waiting)
+        stats["queued_keys"] = len(self._queues[exchange])
+        stats["oldest_wait"] = max((now - ticket[1] for ticket in waiting), default=0.0)
+        stats["avg_wait"] = (
+            stats["total_wait"] / stats["requests"] if stats["requests"] else 0.0
+        )
+        bucket = self._buckets[exchange]
+        bucket._refill(now)
+        stats["tokens"] = bucket.tokens
+        return stats
@@ -1,5 +1,6 @@
 from datetime import datetime
 import pandas as pd
+import numpy as np
 import sys
 import os
 
@@ -12,6 +13,10 @@ app_directory = os.path.abspath(os.path.join(folder_path, os.pardir))
 sys.path.append(app_directory)
 from TF_Generator.ManagerInputs import InputsManager
 
+### TIMEZONE (str): Default display timezone of the released DataFrames, timeframe candles are counted from its midnight.
+### Series are kept, converted and stored with a UTC index, the timezone is applied when they are released.
+TIMEZONE = "Asia/Tehran"
+
 
 class TimeManager:
     """
@@ -21,20 +26,30 @@ class TimeManager:
         - SECONDS_TIME_UNIT (dict): Mapping of time units to seconds.
 
     Methods:
-        - __init__(timeframe: str, exchange: str, num_candles: int, logger=None): Initializes the TimeManager instance.
+        - __init__(timeframe: str, exchange: str, num_candles: int, logger=None, timezone: str = TIMEZONE): Initializes the TimeManager instance.
         - _setup_time_manager(): Sets up TimeManager using InputsManager.
         - _seconds_time_unit(time_unit: str = None) -> int: Gets the seconds for the specified time unit.
         - _totaltime_seconds(actual_candles: int) -> int: Calculates the total time in seconds.
         - _end_time_now() -> int: Gets the current end time in timestamp and datetime formats.
+        - _next_close_time(period_seconds: int = None) -> int: Calculates the close time of the candle open now.
         - _start_time_new() -> int: Calculates the new start time in timestamp and datetime formats.
-        - _start_time_exists(existing_ohlcv_df: pd.DataFrame) -> int: Calculates the existing start time after the last timestamp in the provided DataFrame.
+        - _start_time_exists(existing_ohlcv_df: pd.DataFrame) -> int: Calculates the existing start time from the last timestamp in the provided DataFrame.
         - _time_exists_info(existing_ohlcv_df: pd.DataFrame) -> Tuple[int, int]: Gets the first and last timestamps from the existing DataFrame.
+        - _missing_ranges(existing_ohlcv_df: pd.DataFrame) -> np.ndarray: Finds the ranges of candles missing inside the existing DataFrame.
+        - _merge_ranges(missing_ranges: np.ndarray, max_candles: int) -> np.ndarray: Merges neighbouring missing ranges that fit in one request.
         ### - __del__(): Destructor, logs a message when the instance is deleted.
     """
 
     SECONDS_TIME_UNIT = {"min": 60, "H": 3600, "D": 86400}
 
-    def __init__(self, timeframe: str, exchange: str, num_candles: int, logger=None):
+    def __init__(
+        self,
+        timeframe: str,
+        exchange: str,
+        num_candles: int,
+        logger=None,
+        timezone: str = TIMEZONE,
+    ):
         """
         Initialize TimeManager class.
 
@@ -43,11 +58,13 @@ class TimeManager:
             exchange (str): Name of the exchange for which the input is being standardized.
             num_candles (int): Number of candles.
             logger: LoggerManager instance.
+            timezone (str): Timezone whose midnight candles longer than one time unit are counted from.
         """
         self.timeframe = timeframe
         self.exchange = exchange
         self.num_candles = num_candles
         self.logger = logger
+        self.timezone = timezone or "UTC"
 
         if self.logger:
             self.logger.logger.warning(
@@ -138,6 +155,30 @@ class TimeManager:
 
         return end_timestamp_now
 
+    def _next_close_time(self, period_seconds: int = None) -> int:
+        """
+        Calculates the close time of the candle open now.
+        Candles longer than one time unit are counted from local midnight, like the resampled timeframes.
+
+        Parameters:
+            period_seconds (int): Length of the candle in seconds (a multiple of the time unit, optional).
+
+        Returns:
+            int: Close time in timestamp format.
+        """
+        next_close_time = self._end_time_now() + self.seconds_time_unit
+
+        if period_seconds is not None and period_seconds > self.seconds_time_unit:
+            utc_offset = pd.Timestamp(next_close_time, unit="s", tz=self.timezone).utcoffset()
+            next_close_time += -(
+                next_close_time + int(utc_offset.total_seconds())
+            ) % period_seconds
+
+        if self.logger:
+            self.logger.log_debug(f"_next_close_time (TimeStamp): {next_close_time}")
+
+        return next_close_time
+
     def _start_time_new(self) -> int:
         """
         Calculates the new start time in timestamp and datetime formats.
@@ -172,7 +213,8 @@ class TimeManager:
 
     def _start_time_exists(self, existing_ohlcv_df: pd.DataFrame) -> int:
         """
-        Calculates the existing start time after the last timestamp in the provided DataFrame.
+        Calculates the existing start time from the last timestamp in the provided DataFrame.
+        The last stored candle may have been stored while it was still open, so it is fetched again.
 
         Parameters:
             existing_ohlcv_df (pd.DataFrame): Existing OHLCV DataFrame.
@@ -202,7 +244,8 @@ class TimeManager:
         if start_timestamp_new + self.seconds_time_unit < first_timestamp_exists:
             return start_timestamp_new
         else:
-            start_timestamp_exists = last_timestamp_exists + self.seconds_time_unit
+            ### The last candle may have been open when it was stored, it is fetched again and overwritten
+            start_timestamp_exists = last_timestamp_exists
 
             if self.logger:
                 self.logger.log_debug(
@@ -256,6 +299,61 @@ class TimeManager:
 
         return first_timestamp_exists, last_timestamp_exists
 
+    def _missing_ranges(self, existing_ohlcv_df: pd.DataFrame) -> np.ndarray:
+        """
+        Finds the ranges of candles missing inside the existing DataFrame (holes left by downtime or short pages).
+        The int64 index is scanned once: every step between consecutive candles longer than the time unit is a hole.
+
+        Parameters:
+            existing_ohlcv_df (pd.DataFrame): Existing OHLCV DataFrame.
+
+        Returns:
+            np.ndarray: (start, end) timestamps of the first and last missing candle of every range, shape (n, 2).
+        """
+        if self.logger:
+            self.logger.logger.info("_missing_ranges (function)")
+
+        if existing_ohlcv_df is None or len(existing_ohlcv_df) < 2:
+            return np.empty((0, 2), dtype=np.int64)
+
+        seconds_time_unit = self.seconds_time_unit
+        time_values = existing_ohlcv_df.index.asi8 // 10**9
+        holes = np.flatnonzero(np.diff(time_values) > seconds_time_unit)
+        missing_ranges = np.column_stack(
+            (
+                time_values[holes] + seconds_time_unit,
+                time_values[holes + 1] - seconds_time_unit,
+            )
+        )
+
+        if self.logger:
+            self.logger.log_debug(f"missing ranges: {len(missing_ranges)}")
+
+        return missing_ranges
+
+    def _merge_ranges(self, missing_ranges: np.ndarray, max_candles: int) -> np.ndarray:
+        """
+        Merges neighbouring missing ranges whose whole span fits in max_candles candles,
+        so they are fetched with one request (the candles between them are fetched again).
+
+        Parameters:
+            missing_ranges (np.ndarray): (start, end) timestamps of the missing ranges in time order.
+            max_candles (int): Maximum number of candles of a merged range.
+
+        Returns:
+            np.ndarray: Merged (start, end) timestamps, shape (n, 2).
+        """
+        if not max_candles or len(missing_ranges) < 2:
+            return missing_ranges
+
+        merged = [list(missing_ranges[0])]
+        for start, end in missing_ranges[1:]:
+            if (end - merged[-1][0]) // self.seconds_time_unit < max_candles:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+        return np.array(merged, dtype=np.int64)
+
     # def __del__(self):
     #     """
     #     Destructor, logs a message when the instance is deleted.
@@ -0,0 +1,389 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from datetime import datetime
+import numpy as np
+import threading
+import random
+import json
+import time
+import sys
+import os
+import re
+
+file_path = os.path.abspath(__file__)
+folder_path = os.path.dirname(file_path)
+app_directory = os.path.abspath(os.path.join(folder_path, os.pardir))
+# app_directory = os.path.abspath(os.path.join(file_path, "../.."))
+# print(app_directory)
+
+sys.path.append(app_directory)
+from TF_Generator.HistoryFetch import ExchangeAPI, PAGE_LIMIT
+
+### MOCK_PAGE_LIMIT (dict): Candles served per request by the mock exchanges (None: no limit).
+MOCK_PAGE_LIMIT = dict(PAGE_LIMIT)
+### MOCK_ERROR_STATUS (tuple): HTTP status codes served when a request is chosen to fail.
+MOCK_ERROR_STATUS = (429, 500)
+### UNIT_SECONDS (dict): Seconds of the interval units of Binance and BingX.
+UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 604800, "M": 2592000}
+
+
+class MockExchangeServer:
+    """
+    Local stand-in HTTP server speaking the history dialects (ExchangeAPI.PATH_URL) of
+    Wallex, Nobitex, Binance, Coinbase and BingX, for offline profiling and load tests.
+
+    Candles are deterministic synthetic prices of the symbol and the candle time,
+    or recorded candles loaded from fixtures. Latency, page limits and error rates are configurable.
+    While the server runs (with statement or start()), ExchangeAPI points every exchange at it.
+
+    Methods:
+        - __init__(host: str, port: int, latency: float, error_rate: float, page_limits: dict, fixtures: dict, seed: int): Initializes the MockExchangeServer instance.
+        - start() -> MockExchangeServer: Starts the server in a background thread and overrides the exchange base URLs.
+        - stop() -> None: Stops the server and removes the base-URL overrides.
+        - base_url(exchange: str) -> str: Returns the base URL of an exchange on the server.
+        - load_fixtures(directory: str) -> None: Loads recorded candles from JSON files.
+        - _candles(exchange: str, symbol: str, seconds_interval: int, start: int, end: int) -> np.ndarray: Returns the candles of a window.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        page_limits: dict = None,
+        fixtures: dict = None,
+        seed: int = 0,
+    ):
+        """
+        Initialize MockExchangeServer class.
+
+        Parameters:
+            host (str): Address to listen on.
+            port (int): Port to listen on (0: any free port).
+            latency (float): Seconds added to every response.
+            error_rate (float): Probability (0-1) that a request fails with one of MOCK_ERROR_STATUS.
+            page_limits (dict): Candles served per request of each exchange. Defaults to MOCK_PAGE_LIMIT.
+            fixtures (dict): Recorded candles keyed by (exchange, symbol), as [[time, open, high, low, close, volume], ...] with time in seconds.
+            seed (int): Seed of the synthetic prices and of the error generator.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.error_rate = error_rate
+        self.page_limits = dict(MOCK_PAGE_LIMIT if page_limits is None else page_limits)
+        self.seed = seed
+        self.fixtures = {}
+        for key, candles in (fixtures or {}).items():
+            self._add_fixture(key, candles)
+
+        self.requests = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """
+        Starts the server in a background thread and points every exchange of ExchangeAPI at it.
+
+        Returns:
+            MockExchangeServer: The running server.
+        """
+        self._server = ThreadingHTTPServer((self.host, self.port), _MockHandler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+        for exchange in ExchangeAPI.BASE_URL:
+            ExchangeAPI.override_base_url(exchange, self.base_url(exchange))
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops the server and removes the base-URL overrides.
+        """
+        for exchange in ExchangeAPI.BASE_URL:
+            ExchangeAPI.override_base_url(exchange)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def base_url(self, exchange: str) -> str:
+        """
+        Returns the base URL of an exchange on the server, in the form of ExchangeAPI.BASE_URL.
+        """
+        url = f"http://{self.host}:{self.port}"
+        ### The Wallex path has no leading slash
+        return url + "/" if ExchangeAPI.BASE_URL[exchange].endswith("/") else url
+
+    def load_fixtures(self, directory: str) -> None:
+        """
+        Loads recorded candles from JSON files named "{exchange}_{symbol}.json",
+        each holding [[time, open, high, low, close, volume], ...] with time in seconds.
+        """
+        for file_name in os.listdir(directory):
+            match = re.match(r"([A-Za-z]+)_(.+)\.json$", file_name)
+            if match:
+                with open(os.path.join(directory, file_name)) as fixture_file:
+                    self._add_fixture(match.groups(), json.load(fixture_file))
+
+    def _add_fixture(self, key, candles) -> None:
+        candles = np.asarray(candles, dtype=float).reshape(-1, 6)
+        self.fixtures[tuple(key)] = candles[np.argsort(candles[:, 0], kind="stable")]
+
+    def _fail_status(self) -> int | None:
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self._random.choice(MOCK_ERROR_STATUS)
+
+    def _count(self, exchange: str) -> None:
+        with self._lock:
+            self.requests[exchange] = self.requests.get(exchange, 0) + 1
+
+    def _candles(
+        self,
+        exchange: str,
+        symbol: str,
+        seconds_interval: int,
+        start: int,
+        end: int,
+        limit: int = None,
+    ) -> np.ndarray:
+        """
+        Returns the candles of [start, end] as rows of (time, open, high, low, close, volume).
+        The open candle is the last one; no candle is served after it.
+
+        Returns:
+            np.ndarray: Candles in time order, at most limit rows.
+        """
+        now = int(time.time())
+        end = min(end, now - now % seconds_interval)
+
+        fixture = self.fixtures.get((exchange, symbol))
+        if fixture is not None:
+            candles = fixture[(fixture[:, 0] >= start) & (fixture[:, 0] <= end)]
+            return candles if limit is None else candles[:limit]
+
+        first = -(-start // seconds_interval) * seconds_interval
+        times = np.arange(first, end + 1, seconds_interval, dtype=np.int64)
+        if limit is not None:
+            times = times[:limit]
+        return self._synthetic_candles(symbol, times, seconds_interval)
+
+    def _synthetic_candles(
+        self, symbol: str, times: np.ndarray, seconds_interval: int
+    ) -> np.ndarray:
+        """
+        Deterministic prices: the same symbol and time always give the same candle.
+        """
+        symbol_seed = sum(map(ord, symbol)) + self.seed
+        level = 100.0 + symbol_seed % 900
+
+        def price(t):
+            noise = np.modf(np.sin(t * 12.9898 + symbol_seed) * 43758.5453)[0]
+            return level * (1 + 0.05 * np.sin(t / 86400.0) + 0.002 * noise)
+
+        times_float = times.astype(float)
+        open_price = price(times_float)
+        close_price = price(times_float + seconds_interval)
+        spread = level * 0.001 * (1 + np.abs(np.sin(times_float)))
+        high_price = np.maximum(open_price, close_price) + spread
+        low_price = np.minimum(open_price, close_price) - spread
+        volume = 10 + 90 * np.abs(np.sin(times_float / 977.0 + symbol_seed))
+        return np.column_stack(
+            [times_float, open_price, high_price, low_price, close_price, volume]
+        ).round(6)
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of MockExchangeServer, one method per exchange dialect.
+    """
+
+    ROUTES = (
+        (re.compile(r"^/v1/udf/history$"), "Wallex", "_udf_history"),
+        (re.compile(r"^/market/udf/history$"), "Nobitex", "_udf_history"),
+        (re.compile(r"^/api/v3/uiKlines$"), "Binance", "_binance_klines"),
+        (re.compile(r"^/products/(?P<symbol>[^/]+)/candles$"), "Coinbase", "_coinbase_candles"),
+        (re.compile(r"^/openApi/swap/v3/quote/klines$"), "BingX", "_bingx_klines"),
+    )
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        mock = self.server.mock
+        request = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(request.query).items()}
+
+        for pattern, exchange, handler_name in self.ROUTES:
+            match = pattern.match(request.path)
+            if match:
+                break
+        else:
+            return self._send(404, {"error": f"Unknown path {request.path}"})
+
+        mock._count(exchange)
+        if mock.latency:
+            time.sleep(mock.latency)
+
+        status = mock._fail_status()
+        if status is not None:
+            return self._send(status, {"code": status, "msg": "mock error"})
+
+        query.update(match.groupdict())
+        try:
+            payload = getattr(self, handler_name)(mock, exchange, query)
+        except (KeyError, ValueError) as e:
+            return self._send(400, {"code": 400, "msg": f"Invalid parameter: {e}"})
+        self._send(200, payload)
+
+    def _send(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    @staticmethod
+    def _resolution_seconds(resolution: str) -> int:
+        ### UDF resolution: minutes ("1", "60") or days ("1D")
+        if resolution.endswith("D"):
+            return int(resolution[:-1] or 1) * 86400
+        return int(resolution) * 60
+
+    @staticmethod
+    def _interval_seconds(interval: str) -> int:
+        ### Binance/BingX interval: "1m", "1h", "1d", "1w", "1M"
+        return int(interval[:-1]) * UNIT_SECONDS[interval[-1]]
+
+    @staticmethod
+    def _time_seconds(value: str) -> int:
+        ### Coinbase accepts ISO 8601 or Unix seconds
+        try:
+            return int(float(value))
+        except ValueError:
+            return int(datetime.fromisoformat(value).timestamp())
+
+    def _udf_history(self, mock, exchange, query):
+        candles = mock._candles(
+            exchange=exchange,
+            symbol=query["symbol"],
+            seconds_interval=self._resolution_seconds(query["resolution"]),
+            start=int(query["from"]),
+            end=int(query["to"]),
+            limit=mock.page_limits.get(exchange),
+        )
+        if not len(candles):
+            return {"s": "no_data"}
+        payload = {"s": "ok", "t": candles[:, 0].astype(int).tolist()}
+        for column, key in enumerate("ohlcv", start=1):
+            payload[key] = [str(value) for value in candles[:, column]]
+        return payload
+
+    def _binance_klines(self, mock, exchange, query):
+        seconds_interval = self._interval_seconds(query["interval"])
+        limit = min(int(query.get("limit", 500)), mock.page_limits.get(exchange) or 1000)
+        now = int(time.time())
+        end = int(query["endTime"]) // 1000 if "endTime" in query else now
+        start = (
+            int(query["startTime"]) // 1000
+            if "startTime" in query
+            else end - (limit - 1) * seconds_interval
+        )
+        candles = mock._candles(exchange, query["symbol"], seconds_interval, start, end, limit)
+        return [
+            [
+                int(row[0]) * 1000,
+                *(str(value) for value in row[1:6]),
+                (int(row[0]) + seconds_interval) * 1000 - 1,
+                str(round(row[5] * row[4], 6)),
+                100,
+                "0",
+                "0",
+                "0",
+            ]
+            for row in candles
+        ]
+
+    def _coinbase_candles(self, mock, exchange, query):
+        seconds_interval = int(query["granularity"])
+        limit = mock.page_limits.get(exchange)
+        now = int(time.time())
+        end = self._time_seconds(query["end"]) if "end" in query else now
+        start = (
+            self._time_seconds(query["start"])
+            if "start" in query
+            else end - ((limit or 300) - 1) * seconds_interval
+        )
+        candles = mock._candles(exchange, query["symbol"], seconds_interval, start, end, limit)
+        ### Coinbase: [time, low, high, open, close, volume], newest first
+        return [
+            [int(row[0]), row[3], row[2], row[1], row[4], row[5]] for row in candles[::-1]
+        ]
+
+    def _bingx_klines(self, mock, exchange, query):
+        seconds_interval = self._interval_seconds(query["interval"])
+        limit = min(int(query.get("limit", 500)), mock.page_limits.get(exchange) or 1440)
+        now = int(time.time())
+        end = int(query["endTime"]) // 1000 if "endTime" in query else now
+        start = (
+            int(query["startTime"]) // 1000
+            if "startTime" in query
+            else end - (limit - 1) * seconds_interval
+        )
+        candles = mock._candles(exchange, query["symbol"], seconds_interval, start, end, limit)
+        return {
+            "code": 0,
+            "msg": "",
+            "data": [
+                {
+                    "open": str(row[1]),
+                    "close": str(row[4]),
+                    "high": str(row[2]),
+                    "low": str(row[3]),
+                    "volume": str(row[5]),
+                    "time": int(row[0]) * 1000,
+                }
+                for row in candles
+            ],
+        }
+
+
+if __name__ == "__main__":
+    from TF_Generator.HistoryFetch import HistoryOHLCV
+
+    with MockExchangeServer(latency=0.05, error_rate=0.0) as server:
+        print("Mock exchanges listening on port", server.port)
+        api = HistoryOHLCV()
+        time_now = int(time.time())
+        time_now = time_now - (time_now % 60)
+        for exchange, symbol, interval in (
+            ("Wallex", "BTCUSDT", "1"),
+            ("Nobitex", "BTCUSDT", "1"),
+            ("Binance", "BTCUSDT", "1m"),
+            ("Coinbase", "BTC-USDT", "60"),
+            ("BingX", "BTC-USDT", "1m"),
+        ):
+            market_history = api.get_ohlcv_backfill(
+                exchange=exchange,
+                symbol=symbol,
+                interval=interval,
+                startTime=time_now - 60 * 60 * 48,
+                endTime=time_now,
+                seconds_interval=60,
+            )
+            print(exchange, type(market_history).__name__, server.requests[exchange])
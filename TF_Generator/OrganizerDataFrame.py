@@ -1,4 +1,12 @@
 import pandas as pd
+import numpy as np
+
+### OHLCV_COLUMNS (list): Columns of a regularized OHLCV DataFrame (besides the Datetime index).
+OHLCV_COLUMNS = ["TimeStamp", "Open", "High", "Low", "Close", "Volume"]
+### STORAGE_TIMEZONE (str): Timezone of the index of the kept, converted and stored OHLCV DataFrames.
+STORAGE_TIMEZONE = "UTC"
+### COMPACT_VALUE_DTYPE (type): Dtype of the price and volume columns of a compact OHLCV DataFrame.
+COMPACT_VALUE_DTYPE = np.float32
 
 
 class DataFrameOrg:
@@ -7,18 +15,21 @@ class DataFrameOrg:
 
     Methods:
         - __init__(logger=None): Initializes the DataFrameOrg instance.
-        - _regularize_dataframe(ohlcv_dataframe: pd.DataFrame) -> pd.DataFrame: Regularizes the OHLCV DataFrame by dropping NaN values, changing column order, and renaming columns.
         - _index_dataframe(ohlcv_dataframe: pd.DataFrame) -> pd.DataFrame: Indexes the OHLCV DataFrame based on the 'TimeStamp' column, converts 'TimeStamp' to Datetime, and sets it as the index.
-        - _concatenate_dataframe(existing_ohlcv_df: pd.DataFrame, new_ohlcv_data: pd.DataFrame, actual_candles: int) -> pd.DataFrame: Concatenates existing and new OHLCV DataFrames, drops duplicates, and trims the DataFrame to the specified number of actual candles.
+        - _decode_market_history(exchange: str, market_history) -> pd.DataFrame: Decodes a raw exchange payload directly into an indexed OHLCV DataFrame.
+        - _build_dataframe(ohlcv_values: np.ndarray) -> pd.DataFrame: Builds the indexed OHLCV DataFrame from a (TimeStamp, Open, High, Low, Close, Volume) array.
+        - _compact_dataframe(ohlcv_dataframe: pd.DataFrame) -> pd.DataFrame: Converts the OHLCV DataFrame to the compact representation (no TimeStamp column, float32 values).
+        - _localize_dataframe(ohlcv_dataframe: pd.DataFrame, timezone: str = STORAGE_TIMEZONE) -> pd.DataFrame: Returns the OHLCV DataFrame with its index in the timezone, without copying the values.
+        - _concatenate_dataframe(existing_ohlcv_df: pd.DataFrame, new_ohlcv_data: pd.DataFrame, actual_candles: int, candle_buffer: CandleRingBuffer = None) -> pd.DataFrame: Concatenates existing and new OHLCV DataFrames, drops duplicates, and trims the DataFrame to the specified number of actual candles.
         - __del__(): Destructor, logs a message when the instance is deleted.
     """
 
-    EXCHANGE_FUNCTIONS = {
-        "Wallex": "_reg_df_wallex_nobitex",
-        "Nobitex": "_reg_df_wallex_nobitex",
-        "Binance": "_reg_df_binance",
-        "Coinbase": "_reg_df_coinbase",
-        "BingX": "_reg_df_bingx",
+    DECODE_FUNCTIONS = {
+        "Wallex": "_decode_udf",
+        "Nobitex": "_decode_udf",
+        "Binance": "_decode_binance",
+        "Coinbase": "_decode_coinbase",
+        "BingX": "_decode_bingx",
     }
 
     def __init__(self, logger=None):
@@ -33,187 +44,97 @@ class DataFrameOrg:
 
         self.logger.logger.warning(f"--- Start : Class {self.__class__.__name__} ---")
 
-    def _regularize_dataframe(
-        self, exchange: str, ohlcv_dataframe: pd.DataFrame
-    ) -> pd.DataFrame:
+    def _decode_market_history(self, exchange: str, market_history) -> pd.DataFrame:
         """
-        Regularizes the OHLCV DataFrame based on the specified exchange.
+        Decodes a raw exchange payload directly into an indexed OHLCV DataFrame,
+        without building intermediate DataFrames. This is the only parser of the exchange payloads.
 
         Parameters:
-            exchange (str): The name of the exchange from which the data originates (e.g., "Wallex", "Binance", "Coinbase").
-            ohlcv_dataframe (pd.DataFrame): The input OHLCV DataFrame containing columns 't' (timestamp), 'o' (open), 'h' (high), 'l' (low), 'c' (close), and 'v' (volume).
+            exchange (str): The name of the exchange from which the data originates.
+            market_history (dict | list): The raw payload returned by HistoryOHLCV.
 
         Returns:
-            pd.DataFrame: The regularized OHLCV DataFrame with standardized column names.
+            pd.DataFrame: The indexed OHLCV DataFrame, or None if the payload can not be decoded.
 
         Raises:
             ValueError: If the specified exchange is not supported.
         """
-        self.logger.logger.info("_regularize_dataframe (function)")
+        self.logger.logger.info("_decode_market_history (function)")
 
-        if exchange in self.EXCHANGE_FUNCTIONS:
-            reg_func = getattr(self, self.EXCHANGE_FUNCTIONS[exchange])
-            ohlcv_dataframe = reg_func(ohlcv_dataframe)
-        else:
+        if exchange not in self.DECODE_FUNCTIONS:
             raise ValueError(f"Exchange '{exchange}' not supported")
 
-        ohlcv_dataframe = ohlcv_dataframe.astype(
-            {
-                "Open": float,
-                "High": float,
-                "Low": float,
-                "Close": float,
-                "Volume": float,
-            }
-        )
-        self.logger.log_debug(f"Regularized ohlcv_dataframe: \n{ohlcv_dataframe}")
-        self.logger.log_debug(
-            f"Regularized ohlcv_dataframe length: {len(ohlcv_dataframe)}\n"
-        )
-        return ohlcv_dataframe
-
-    def _reg_df_wallex_nobitex(self, ohlcv_dataframe: pd.DataFrame) -> pd.DataFrame:
-        ### Wallex and Nobitex specific logic
-        """
-        Regularizes the OHLCV DataFrame from Wallex and Nobitex exchanges.
-
-        Parameters:
-            ohlcv_dataframe (pd.DataFrame): The input OHLCV DataFrame.
-
-        Returns:
-            pd.DataFrame: The regularized OHLCV DataFrame with standardized column names.
-
-        Raises:
-            KeyError: If required columns are not found in the input DataFrame.
-        """
         try:
-            # Drop rows with NaN values & additional column
-            ohlcv_dataframe = ohlcv_dataframe.dropna().drop("s", axis=1)
-
-            # change the order of columns
-            # ohlcv_dataframe = ohlcv_dataframe[list("tohlcv")]
-            ohlcv_dataframe = ohlcv_dataframe[["t", "o", "h", "l", "c", "v"]]
-            ohlcv_dataframe = ohlcv_dataframe.rename(
-                columns={
-                    "t": "TimeStamp",
-                    "o": "Open",
-                    "h": "High",
-                    "l": "Low",
-                    "c": "Close",
-                    "v": "Volume",
-                }
-            )
-            return ohlcv_dataframe
+            decode_func = getattr(self, self.DECODE_FUNCTIONS[exchange])
+            ohlcv_values = decode_func(market_history)
         except Exception as e:
-            self.logger.logger.error(f"regularize_dataframe: {str(e)}")
-
-    def _reg_df_binance(self, ohlcv_dataframe: pd.DataFrame) -> pd.DataFrame:
-        ### Binance specific logic
-        """
-        Regularizes the OHLCV DataFrame from Binance exchange.
-
-        Parameters:
-            ohlcv_dataframe (pd.DataFrame): The input OHLCV DataFrame.
+            self.logger.logger.error(f"decode_market_history: {str(e)}")
+            return None
 
-        Returns:
-            pd.DataFrame: The regularized OHLCV DataFrame with standardized column names and timestamp conversion.
-
-        Raises:
-            KeyError: If required columns are not found in the input DataFrame.
-        """
-        try:
-            # change the order of columns
-            ohlcv_dataframe = ohlcv_dataframe[ohlcv_dataframe.columns[:6]]
-            # ohlcv_dataframe.columns = [
-            #     "TimeStamp",
-            #     "Open",
-            #     "High",
-            #     "Low",
-            #     "Close",
-            #     "Volume",
-            # ]
-
-            ohlcv_dataframe = ohlcv_dataframe.rename(
-                columns={
-                    0: "TimeStamp",
-                    1: "Open",
-                    2: "High",
-                    3: "Low",
-                    4: "Close",
-                    5: "Volume",
-                }
-            )
-            ohlcv_dataframe["TimeStamp"] = ohlcv_dataframe["TimeStamp"] / 1000
-            return ohlcv_dataframe
-        except Exception as e:
-            self.logger.logger.error(f"regularize_dataframe: {str(e)}")
-
-    def _reg_df_coinbase(self, ohlcv_dataframe: pd.DataFrame) -> pd.DataFrame:
-        ### Coinbase specific logic
-        """
-        Regularizes the OHLCV DataFrame from Coinbase exchange.
-
-        Parameters:
-            ohlcv_dataframe (pd.DataFrame): The input OHLCV DataFrame.
-
-        Returns:
-            pd.DataFrame: The regularized OHLCV DataFrame with standardized column names.
+        ohlcv_dataframe = self._build_dataframe(ohlcv_values=ohlcv_values)
+        self.logger.log_debug(
+            f"Decoded ohlcv_dataframe length: {len(ohlcv_dataframe)}\n"
+        )
+        return ohlcv_dataframe
 
-        Raises:
-            KeyError: If required columns are not found in the input DataFrame.
-        """
-        try:
-            # change the order of columns
-            ohlcv_dataframe = ohlcv_dataframe[ohlcv_dataframe.columns[:6]]
-            ohlcv_dataframe = ohlcv_dataframe.rename(
-                columns={
-                    0: "TimeStamp",
-                    1: "Open",
-                    2: "High",
-                    3: "Low",
-                    4: "Close",
-                    5: "Volume",
-                }
-            )
-            return ohlcv_dataframe
-        except Exception as e:
-            self.logger.logger.error(f"regularize_dataframe: {str(e)}")
+    @staticmethod
+    def _decode_udf(market_history: dict) -> np.ndarray:
+        ### Wallex and Nobitex: {"s": "ok", "t": [...], "o": [...], ...}
+        if market_history.get("s") != "ok":
+            return np.empty((0, 6))
+        return np.column_stack(
+            [np.asarray(market_history[key], dtype=float) for key in "tohlcv"]
+        )
 
-    def _reg_df_bingx(self, ohlcv_dataframe: pd.DataFrame) -> pd.DataFrame:
-        ### BingX specific logic
+    @staticmethod
+    def _decode_binance(market_history: list) -> np.ndarray:
+        ### Binance: [[open time (ms), open, high, low, close, volume, ...], ...]
+        ohlcv_values = np.array(
+            [row[:6] for row in market_history], dtype=float
+        ).reshape(-1, 6)
+        ohlcv_values[:, 0] /= 1000
+        return ohlcv_values
+
+    @staticmethod
+    def _decode_coinbase(market_history: list) -> np.ndarray:
+        ### Coinbase: [[time, low, high, open, close, volume], ...]
+        ohlcv_values = np.array(market_history, dtype=float).reshape(-1, 6)
+        return ohlcv_values[:, [0, 3, 2, 1, 4, 5]]
+
+    @staticmethod
+    def _decode_bingx(market_history: dict) -> np.ndarray:
+        ### BingX: {"code": 0, "data": [{"time": ms, "open": ..., ...}, ...]}
+        ohlcv_values = np.array(
+            [
+                (row["time"], row["open"], row["high"], row["low"], row["close"], row["volume"])
+                for row in market_history["data"]
+            ],
+            dtype=float,
+        ).reshape(-1, 6)
+        ohlcv_values[:, 0] /= 1000
+        return ohlcv_values
+
+    def _build_dataframe(self, ohlcv_values: np.ndarray) -> pd.DataFrame:
         """
-        Regularizes the OHLCV DataFrame from BingX exchange.
+        Builds the indexed OHLCV DataFrame from a float array in one allocation.
+        Rows with NaN values are dropped and rows are sorted by time.
 
         Parameters:
-            ohlcv_dataframe (pd.DataFrame): The input OHLCV DataFrame.
+            ohlcv_values (np.ndarray): Array of shape (n, 6) with TimeStamp (seconds), Open, High, Low, Close and Volume.
 
         Returns:
-            pd.DataFrame: The regularized OHLCV DataFrame with standardized column names and timestamp conversion.
-
-        Raises:
-            KeyError: If required columns are not found in the input DataFrame.
+            pd.DataFrame: The OHLCV DataFrame indexed by the UTC Datetime.
         """
-        try:
-            ohlcv_dataframe = pd.DataFrame.from_records(ohlcv_dataframe["data"])
-
-            # change the order of columns
-            ohlcv_dataframe = ohlcv_dataframe[
-                ["time", "open", "high", "low", "close", "volume"]
-            ]
-            ohlcv_dataframe = ohlcv_dataframe.rename(
-                columns={
-                    "time": "TimeStamp",
-                    "open": "Open",
-                    "high": "High",
-                    "low": "Low",
-                    "close": "Close",
-                    "volume": "Volume",
-                }
-            )
-            ohlcv_dataframe["TimeStamp"] = ohlcv_dataframe["TimeStamp"] / 1000
-            return ohlcv_dataframe
-        except Exception as e:
-            self.logger.logger.error(f"regularize_dataframe: {str(e)}")
+        ohlcv_values = ohlcv_values[~np.isnan(ohlcv_values).any(axis=1)]
+        order = np.argsort(ohlcv_values[:, 0], kind="stable")
+        if (order[1:] < order[:-1]).any():
+            ohlcv_values = ohlcv_values[order]
+
+        index = pd.DatetimeIndex(
+            pd.to_datetime(ohlcv_values[:, 0].astype(np.int64), unit="s", utc=True),
+            name="Datetime",
+        )
+        return pd.DataFrame(ohlcv_values, index=index, columns=OHLCV_COLUMNS, copy=False)
 
     def _index_dataframe(self, ohlcv_dataframe: pd.DataFrame) -> pd.DataFrame:
         """
@@ -229,20 +150,23 @@ class DataFrameOrg:
 
         try:
             # Convert TimeStamp to Datetime and set as index
-            ohlcv_dataframe["Datetime"] = pd.to_datetime(
-                ohlcv_dataframe["TimeStamp"], unit="s", utc=True
-            )
+            if "TimeStamp" in ohlcv_dataframe.columns:
+                ohlcv_dataframe["Datetime"] = pd.to_datetime(
+                    ohlcv_dataframe["TimeStamp"], unit="s", utc=True
+                )
+            else:
+                ### Compact DataFrames are saved without the TimeStamp column
+                ohlcv_dataframe["Datetime"] = pd.to_datetime(
+                    ohlcv_dataframe["Datetime"], utc=True
+                )
 
             # # Convert the Datetime to local time zone
             # ohlcv_dataframe["Datetime"] = ohlcv_dataframe["Datetime"].dt.tz_localize("UTC")
             # ohlcv_dataframe["Datetime"] = ohlcv_dataframe["Datetime"].dt.tz_convert("Asia/Tehran")
 
+            ### The index stays in UTC, it is localized when the DataFrame is released
             ohlcv_dataframe = ohlcv_dataframe.set_index("Datetime").sort_index()
 
-            # Convert the index to local time zone
-            # ohlcv_dataframe.index = ohlcv_dataframe.index.tz_localize("UTC")
-            ohlcv_dataframe.index = ohlcv_dataframe.index.tz_convert("Asia/Tehran")
-
             self.logger.log_debug(f"ohlcv_dataframe indexed: \n{ohlcv_dataframe}")
             self.logger.log_debug(
                 f"Len ohlcv_dataframe indexed: {len(ohlcv_dataframe)}\n"
@@ -252,35 +176,103 @@ class DataFrameOrg:
         except Exception as e:
             self.logger.logger.error(f"index_dataframe: {str(e)}")
 
+    @staticmethod
+    def _compact_dataframe(ohlcv_dataframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converts the OHLCV DataFrame to the compact representation: the Datetime index (int64 nanoseconds,
+        the timezone is only applied when fields are accessed) is the only timestamp, and the price and volume
+        columns are COMPACT_VALUE_DTYPE. A compact DataFrame takes half the memory of a regular one.
+        Compact DataFrames are returned unchanged.
+
+        Parameters:
+            ohlcv_dataframe (pd.DataFrame): The OHLCV DataFrame.
+
+        Returns:
+            pd.DataFrame: The compact OHLCV DataFrame (None if ohlcv_dataframe is None).
+        """
+        if ohlcv_dataframe is None:
+            return None
+        if "TimeStamp" in ohlcv_dataframe.columns:
+            ohlcv_dataframe = ohlcv_dataframe.drop(columns="TimeStamp")
+        if (ohlcv_dataframe.dtypes != COMPACT_VALUE_DTYPE).any():
+            ohlcv_dataframe = ohlcv_dataframe.astype(COMPACT_VALUE_DTYPE)
+        return ohlcv_dataframe
+
+    @staticmethod
+    def _localize_dataframe(
+        ohlcv_dataframe: pd.DataFrame, timezone: str = STORAGE_TIMEZONE
+    ) -> pd.DataFrame:
+        """
+        Returns the OHLCV DataFrame with its index in the timezone. The int64 index values do not change,
+        so only the index dtype is replaced and the values are not copied.
+        A DataFrame already in the timezone is returned unchanged, a naive index is taken as UTC.
+
+        Parameters:
+            ohlcv_dataframe (pd.DataFrame): The OHLCV DataFrame.
+            timezone (str): Timezone of the returned index (default STORAGE_TIMEZONE).
+
+        Returns:
+            pd.DataFrame: The localized OHLCV DataFrame (None if ohlcv_dataframe is None).
+        """
+        if ohlcv_dataframe is None or not isinstance(ohlcv_dataframe.index, pd.DatetimeIndex):
+            return ohlcv_dataframe
+        index = ohlcv_dataframe.index
+        if index.tz is None:
+            index = index.tz_localize(STORAGE_TIMEZONE)
+        elif str(index.tz) == str(timezone):
+            return ohlcv_dataframe
+        return ohlcv_dataframe.set_axis(index.tz_convert(timezone), axis=0, copy=False)
+
     def _concatenate_dataframe(
         self,
         existing_ohlcv_df: pd.DataFrame,
         new_ohlcv_data: pd.DataFrame,
         actual_candles: int,
+        candle_buffer: "CandleRingBuffer" = None,
     ) -> pd.DataFrame:
         """
         Concatenates existing and new OHLCV DataFrames, drops duplicates, and trims the DataFrame to the specified number of actual candles.
+        With a candle_buffer (of actual_candles capacity), the new rows are upserted into the buffer instead,
+        which costs the number of new rows; the buffer is loaded from existing_ohlcv_df when it does not hold it,
+        and reloaded from the concatenated DataFrame when the rows can not be upserted.
 
         Parameters:
             existing_ohlcv_df (pd.DataFrame): The existing OHLCV DataFrame.
             new_ohlcv_data (pd.DataFrame): The new OHLCV DataFrame to be concatenated.
             actual_candles (int): The number of actual candles to trim the concatenated DataFrame.
+            candle_buffer (CandleRingBuffer): Ring buffer of the series (optional).
 
         Returns:
             pd.DataFrame: The concatenated and trimmed OHLCV DataFrame.
         """
         self.logger.logger.info("_concatenate_detaframe_ohlcv (function)")
 
+        if candle_buffer is not None and new_ohlcv_data is not None:
+            if not candle_buffer.holds(existing_ohlcv_df):
+                candle_buffer.load(existing_ohlcv_df)
+            if candle_buffer.upsert(new_ohlcv_data):
+                return candle_buffer.to_dataframe()
+
         # Concatenate dataframes and drop duplicates based on TimeStamp
         concatenated_df = pd.concat([existing_ohlcv_df, new_ohlcv_data])
-        concatenated_df.drop_duplicates(subset=["TimeStamp"], keep="last", inplace=True)
+        if "TimeStamp" in concatenated_df.columns:
+            concatenated_df.drop_duplicates(subset=["TimeStamp"], keep="last", inplace=True)
+        else:
+            ### Compact DataFrames: the index is the only timestamp
+            concatenated_df = concatenated_df[
+                ~concatenated_df.index.duplicated(keep="last")
+            ]
 
+        ### Rows replaced by drop_duplicates are moved to the end, restore the time order before trimming
+        concatenated_df = concatenated_df.sort_index()
         if len(concatenated_df) > actual_candles:
-            concatenated_df = concatenated_df.iloc[-actual_candles:].sort_index()
+            concatenated_df = concatenated_df.iloc[-actual_candles:]
 
         self.logger.log_debug(
             f"concatenated_dataframe length (fix): {len(concatenated_df)}\n"
         )
+        if candle_buffer is not None:
+            candle_buffer.load(concatenated_df)
         ### Return the concatenated DataFrame regardless of trimming
         return concatenated_df
 
@@ -289,3 +281,178 @@ class DataFrameOrg:
         Destructor, logs a message when the instance is deleted.
         """
         self.logger.logger.info(f"Call __del__ (Class : {self.__class__.__name__})")
+
+
+class CandleRingBuffer:
+    """
+    Fixed-capacity, timestamp-ordered ring buffer of OHLCV candles, the in-memory series of GenerateOHLCV.
+    Updates overwrite the last (still open) candle in place and append the new candles, the oldest candles
+    fall off the front, so an update costs the number of new candles, not the length of the history.
+    DataFrames are only built (one contiguous copy) when to_dataframe is called, and are never modified afterwards.
+
+    Methods:
+        - __init__(capacity: int): Initializes an empty CandleRingBuffer.
+        - load(ohlcv_dataframe: pd.DataFrame): Loads the last candles of a DataFrame, replacing the content of the buffer.
+        - holds(ohlcv_dataframe: pd.DataFrame) -> bool: Checks if the DataFrame is the current content of the buffer.
+        - upsert(ohlcv_dataframe: pd.DataFrame) -> bool: Overwrites the existing candles and appends the new ones.
+        - to_dataframe() -> pd.DataFrame: Builds the OHLCV DataFrame of the buffer.
+        - _positions(time_values: np.ndarray) -> np.ndarray | None: Returns the slots of existing candles.
+        - _ordered(array: np.ndarray) -> np.ndarray: Returns a time-ordered copy of a buffer array.
+        - __len__() -> int: Returns the number of candles in the buffer.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Initialize CandleRingBuffer class.
+
+        Parameters:
+            capacity (int): Maximum number of candles (the actual candles of the series).
+        """
+        self.capacity = int(capacity)
+        self.columns = None
+        self.time_values = np.empty(0, dtype=np.int64)
+        self.values = np.empty((0, 0))
+        self.head = 0
+        self.size = 0
+        self.timezone = None
+        self.index_name = None
+        ### Built DataFrame of the current content, and the DataFrame the content was loaded from or built to
+        self.frame = None
+        self.source = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def load(self, ohlcv_dataframe: pd.DataFrame):
+        """
+        Loads the last candles (up to the capacity) of a sorted OHLCV DataFrame, replacing the content of the buffer.
+
+        Parameters:
+            ohlcv_dataframe (pd.DataFrame): OHLCV DataFrame indexed by Datetime.
+        """
+        tail_dataframe = ohlcv_dataframe.iloc[-self.capacity :]
+        self.columns = list(ohlcv_dataframe.columns)
+        self.timezone = ohlcv_dataframe.index.tz
+        self.index_name = ohlcv_dataframe.index.name
+        self.time_values = np.empty(self.capacity, dtype=np.int64)
+        self.values = np.empty(
+            (self.capacity, len(self.columns)), dtype=np.result_type(*ohlcv_dataframe.dtypes)
+        )
+        self.size = len(tail_dataframe)
+        self.head = 0
+        self.time_values[: self.size] = tail_dataframe.index.asi8
+        self.values[: self.size] = tail_dataframe.to_numpy(dtype=self.values.dtype)
+        self.frame = ohlcv_dataframe if len(ohlcv_dataframe) <= self.capacity else None
+        self.source = ohlcv_dataframe
+
+    def holds(self, ohlcv_dataframe: pd.DataFrame) -> bool:
+        """
+        Checks if the DataFrame is the current content of the buffer (the last one loaded or built).
+        """
+        return self.source is not None and ohlcv_dataframe is self.source
+
+    def _positions(self, time_values: np.ndarray) -> np.ndarray | None:
+        """
+        Returns the slots of existing candles, searching the two sorted segments of the ring.
+
+        Returns:
+            np.ndarray | None: The slots, or None if a candle is not in the buffer.
+        """
+        first_length = min(self.size, self.capacity - self.head)
+        first_segment = self.time_values[self.head : self.head + first_length]
+        second_segment = self.time_values[: self.size - first_length]
+
+        in_first = time_values <= first_segment[-1]
+        positions = np.empty(len(time_values), dtype=np.int64)
+        positions[in_first] = self.head + np.searchsorted(first_segment, time_values[in_first])
+        positions[~in_first] = np.searchsorted(second_segment, time_values[~in_first])
+
+        found = positions < np.where(in_first, self.head + first_length, len(second_segment))
+        if not found.all():
+            return None
+        if (self.time_values[positions] != time_values).any():
+            return None
+        return positions
+
+    def _ordered(self, array: np.ndarray) -> np.ndarray:
+        """
+        Returns a time-ordered copy of a buffer array (the two segments of the ring, copied with slices).
+        """
+        end = self.head + self.size
+        if end <= self.capacity:
+            return array[self.head : end].copy()
+        return np.concatenate([array[self.head :], array[: end - self.capacity]])
+
+    def upsert(self, ohlcv_dataframe: pd.DataFrame) -> bool:
+        """
+        Overwrites the candles already in the buffer (usually the open candle) in place and appends the new ones;
+        when the buffer is full, the oldest candles fall off the front. Duplicated candles keep the last row.
+
+        Parameters:
+            ohlcv_dataframe (pd.DataFrame): New OHLCV rows indexed by Datetime, with the columns of the buffer.
+
+        Returns:
+            bool: True if the rows were upserted. False (buffer unchanged) if they can not be:
+            other columns, an unsorted index, or a candle older than the last one that is not in the buffer.
+        """
+        if self.columns is None or list(ohlcv_dataframe.columns) != self.columns:
+            return False
+        if ohlcv_dataframe.empty:
+            return True
+        if not ohlcv_dataframe.index.is_monotonic_increasing:
+            return False
+        if ohlcv_dataframe.index.has_duplicates:
+            ohlcv_dataframe = ohlcv_dataframe[~ohlcv_dataframe.index.duplicated(keep="last")]
+
+        time_values = ohlcv_dataframe.index.asi8
+        values = ohlcv_dataframe.to_numpy(dtype=self.values.dtype)
+
+        ### Candles up to the last one are overwritten, the later ones are appended
+        if self.size:
+            last_time = self.time_values[(self.head + self.size - 1) % self.capacity]
+            split = int(np.searchsorted(time_values, last_time, side="right"))
+        else:
+            split = 0
+        if split:
+            positions = self._positions(time_values[:split])
+            if positions is None:
+                return False
+            self.values[positions] = values[:split]
+
+        append_times, append_values = time_values[split:], values[split:]
+        if len(append_times) >= self.capacity:
+            self.head, self.size = 0, self.capacity
+            self.time_values[:] = append_times[-self.capacity :]
+            self.values[:] = append_values[-self.capacity :]
+        elif len(append_times):
+            positions = (self.head + self.size + np.arange(len(append_times))) % self.capacity
+            self.time_values[positions] = append_times
+            self.values[positions] = append_values
+            overflow = max(self.size + len(append_times) - self.capacity, 0)
+            self.head = (self.head + overflow) % self.capacity
+            self.size += len(append_times) - overflow
+
+        self.frame = None
+        self.source = None
+        return True
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Builds the OHLCV DataFrame of the buffer in time order (one contiguous copy).
+        The DataFrame is owned by the caller, later upserts do not modify it.
+
+        Returns:
+            pd.DataFrame: OHLCV DataFrame indexed by Datetime.
+        """
+        if self.frame is not None:
+            return self.frame
+        index = pd.DatetimeIndex(
+            self._ordered(self.time_values).view("datetime64[ns]"), name=self.index_name
+        )
+        if self.timezone is not None:
+            index = index.tz_localize("UTC").tz_convert(self.timezone)
+        self.frame = pd.DataFrame(
+            self._ordered(self.values), index=index, columns=self.columns, copy=False
+        )
+        self.source = self.frame
+        return self.frame
@@ -1,5 +1,8 @@
 import pandas as pd
+import numpy as np
+import threading
 import sys
+import re
 import os
 
 
@@ -11,6 +14,31 @@ app_directory = os.path.abspath(os.path.join(folder_path, os.pardir))
 
 sys.path.append(app_directory)
 from TF_Generator.ManagerInputs import InputsManager
+from TF_Generator.ManagerTime import TIMEZONE
+from TF_Generator.OrganizerDataFrame import DataFrameOrg
+
+### RESAMPLE_ENGINES (dict): Mapping of resampling engines to their functions.
+RESAMPLE_ENGINES = {"numpy": "_resample_numpy", "pandas": "_resample_pandas"}
+### DEFAULT_RESAMPLE_ENGINE (str): Engine of convert_timeframe, the pandas engine is the fallback.
+DEFAULT_RESAMPLE_ENGINE = "numpy"
+### RESAMPLE_UNIT_SECONDS (dict): Fixed-length time units resampled by the NumPy engine (W and M use pandas).
+RESAMPLE_UNIT_SECONDS = {"min": 60, "H": 3600, "D": 86400}
+### TIME_UNIT_ORDER (list): Time units from the finest, a DataFrame converts to its own or a coarser unit.
+TIME_UNIT_ORDER = ["min", "H", "D", "W", "M"]
+### COVERAGE_UNIT_SECONDS (dict): Length of the time units when checking the history coverage (M: shortest month).
+COVERAGE_UNIT_SECONDS = {**RESAMPLE_UNIT_SECONDS, "W": 7 * 86400, "M": 28 * 86400}
+### DAY_ANCHOR_MARGIN_DAYS (int): Days of local midnights computed after the last candle, so new days reuse them.
+DAY_ANCHOR_MARGIN_DAYS = 32
+### TIMEFRAME_PATTERN (re.Pattern): Numeric value and time unit of a timeframe.
+TIMEFRAME_PATTERN = re.compile(r"^(\d+)(min|H|D|W|M)$")
+### AGGREGATIONS (dict): Aggregation of each OHLCV column when resampling.
+AGGREGATIONS = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Volume": "sum",
+}
 
 
 class TimeFrameOrg:
@@ -18,10 +46,21 @@ class TimeFrameOrg:
     Class for organizing and converting OHLCV (Open, High, Low, Close, Volume) DataFrame to a new timeframe.
 
     Methods:
-        - __init__(ohlcv_dataframe: pd.DataFrame = None, new_timeframe: str = None, logger=None): Initializes the TimeFrameOrganizer instance.
+        - __init__(exchange: str, ohlcv_dataframe: pd.DataFrame = None, new_timeframe: str = None, logger=None, engine: str = DEFAULT_RESAMPLE_ENGINE, timezone: str = TIMEZONE): Initializes the TimeFrameOrganizer instance.
         - _calculate_time_unit(ohlcv_dataframe: pd.DataFrame) -> str: Calculates the time unit based on the time difference between consecutive timestamps in the DataFrame.
-        - _can_converted(ohlcv_dataframe: pd.DataFrame, new_timeframe: str) -> bool: Checks if conversion is possible between the initial and new timeframes.
-        - convert_timeframe(ohlcv_dataframe: pd.DataFrame = None, new_timeframe: str = None) -> pd.DataFrame: Converts the OHLCV DataFrame to the desired time frame.
+        - _can_converted(ohlcv_dataframe: pd.DataFrame, new_timeframe: str, num_candles: int = None, expected_candles: int = None) -> bool: Checks if conversion is possible between the initial and new timeframes.
+        - _covered_candles(ohlcv_dataframe: pd.DataFrame, new_timeframe: str) -> int: Returns the number of candles of the new timeframe the DataFrame covers.
+        - convert_timeframe(ohlcv_dataframe: pd.DataFrame = None, new_timeframe: str = None, series_key: tuple = None, source_timeframe: str = None, num_candles: int = None, expected_candles: int = None) -> pd.DataFrame: Converts the OHLCV DataFrame to the desired time frame.
+        - convert_timeframes(ohlcv_dataframe: pd.DataFrame = None, new_timeframes: list = None, series_key: tuple = None, num_candles: int = None, expected_candles: int = None) -> dict: Converts the OHLCV DataFrame to several timeframes, each from the nearest finer one.
+        - _timeframe_seconds(timeframe: str) -> int | None: Returns the length of a fixed-length timeframe in seconds.
+        - _cascade_source(new_timeframe: str, converted: dict) -> str | None: Returns the converted timeframe a timeframe is cascaded from.
+        - _convert_incremental(ohlcv_dataframe: pd.DataFrame, new_timeframe: str, series_key: tuple, source_timeframe: str = None) -> pd.DataFrame | None: Converts a series by updating its aggregated frame from the last call.
+        - invalidate_aggregates(series_key: tuple = None): Drops the aggregated frames of a series (or of all series).
+        - _resample_numpy(ohlcv_dataframe: pd.DataFrame, new_timeframe: str) -> pd.DataFrame | None: Resamples with ufunc.reduceat kernels in one pass.
+        - _resample_grid(ohlcv_dataframe: pd.DataFrame, new_timeframe: str) -> tuple | None: Returns the bin grid of the NumPy engine.
+        - _day_anchors(first_time: int, last_time: int) -> tuple | None: Returns the UTC and wall clock times of the local midnights of the timezone.
+        - _aggregate_bins(ohlcv_dataframe: pd.DataFrame, time_values: np.ndarray, origin: int, step: int, anchors: tuple = None) -> Tuple[pd.DataFrame | None, np.ndarray, np.ndarray]: Aggregates the candles into the non-empty bins of the grid.
+        - _resample_pandas(ohlcv_dataframe: pd.DataFrame, new_timeframe: str) -> pd.DataFrame: Resamples with DataFrame.resample.
         - __del__(): Destructor, logs a message when the instance is deleted.
     """
 
@@ -31,6 +70,8 @@ class TimeFrameOrg:
         ohlcv_dataframe: pd.DataFrame = None,
         new_timeframe: str = None,
         logger=None,
+        engine: str = DEFAULT_RESAMPLE_ENGINE,
+        timezone: str = TIMEZONE,
     ):
         """
         Initialize TimeFrameOrganizer class.
@@ -39,11 +80,26 @@ class TimeFrameOrg:
             ohlcv_dataframe (pd.DataFrame): OHLCV DataFrame with the initial time frame.
             new_timeframe (str): Desired time frame for conversion.
             logger: LoggerManager instance.
+            engine (str): Resampling engine ("numpy" or "pandas").
+            timezone (str): Timezone whose midnights the bins are counted from, whatever the timezone of the index.
+
+        Raises:
+            ValueError: If the engine is not supported.
         """
+        if engine not in RESAMPLE_ENGINES:
+            raise ValueError(f"Resample engine '{engine}' not supported")
+
         self.exchange = exchange
         self.ohlcv_dataframe = ohlcv_dataframe
         self.new_timeframe = new_timeframe
         self.logger = logger
+        self.engine = engine
+        self.timezone = timezone or "UTC"
+        ### UTC and wall clock times of the local midnights of the timezone, see _day_anchors
+        self._anchors = None
+        ### Aggregated frame of each (series_key, source_timeframe, new_timeframe), updated by the next conversion
+        self._aggregates = {}
+        self._aggregates_lock = threading.Lock()
 
         # Log class initialization
         if self.logger is not None:
@@ -84,13 +140,25 @@ class TimeFrameOrg:
 
         return time_unit
 
-    def _can_converted(self, ohlcv_dataframe: pd.DataFrame, new_timeframe: str) -> bool:
+    def _can_converted(
+        self,
+        ohlcv_dataframe: pd.DataFrame,
+        new_timeframe: str,
+        num_candles: int = None,
+        expected_candles: int = None,
+    ) -> bool:
         """
         Checks if conversion is possible between the initial and new timeframes.
+        The time unit of the new timeframe must be the unit of the initial DataFrame or a coarser one
+        (e.g. a minute series converts to H and D timeframes), and the DataFrame must cover num_candles
+        candles of the new timeframe. Without num_candles, a coverage shorter than expected_candles
+        is only logged as a warning.
 
         Parameters:
             ohlcv_dataframe (pd.DataFrame): Initial OHLCV DataFrame.
             new_timeframe (str): New timeframe for conversion.
+            num_candles (int): Number of candles of the new timeframe the DataFrame must cover (optional).
+            expected_candles (int): Number of candles of the new timeframe expected when num_candles is not given (optional).
 
         Returns:
             bool: True if conversion is possible, False otherwise.
@@ -107,23 +175,79 @@ class TimeFrameOrg:
         )
         new_time_unit = new_inputs._time_unit()
 
-        ### Check if the time units match
-        if init_time_unit != new_time_unit:
+        ### Check if the new time unit is the initial one or a coarser one
+        if TIME_UNIT_ORDER.index(init_time_unit) > TIME_UNIT_ORDER.index(new_time_unit):
             if self.logger is not None:
                 self.logger.log_error("----- Error: mismatch (time unit) ! ------\n")
             return False
 
+        ### Check if the history covers the requested candles
+        if num_candles is not None:
+            covered_candles = self._covered_candles(
+                ohlcv_dataframe=ohlcv_dataframe, new_timeframe=new_timeframe
+            )
+            if covered_candles < num_candles:
+                if self.logger is not None:
+                    self.logger.log_error(
+                        f"----- Error: insufficient history ({covered_candles} of {num_candles} {new_timeframe} candles) ! ------\n"
+                    )
+                return False
+        elif expected_candles is not None and self.logger is not None:
+            covered_candles = self._covered_candles(
+                ohlcv_dataframe=ohlcv_dataframe, new_timeframe=new_timeframe
+            )
+            if covered_candles < expected_candles:
+                self.logger.logger.warning(
+                    f"----- Warning: short history ({covered_candles} of {expected_candles} {new_timeframe} candles) ! ------\n"
+                )
+
         return True
 
+    @staticmethod
+    def _covered_candles(ohlcv_dataframe: pd.DataFrame, new_timeframe: str) -> int:
+        """
+        Returns the number of candles of the new timeframe the DataFrame covers: the time from its first candle
+        to the close of its last candle, in candles of the new timeframe (rounded up, M counted as 28 days).
+
+        Parameters:
+            ohlcv_dataframe (pd.DataFrame): Initial OHLCV DataFrame.
+            new_timeframe (str): New timeframe for conversion.
+
+        Returns:
+            int: Number of covered candles.
+        """
+        match = TIMEFRAME_PATTERN.match(str(new_timeframe))
+        if match is None:
+            return 0
+        new_seconds = int(match.group(1)) * COVERAGE_UNIT_SECONDS[match.group(2)]
+
+        time_values = ohlcv_dataframe.index.asi8 // 10**9
+        ### Length of one initial candle, the shortest step of the last candles
+        candle_seconds = int(np.diff(time_values[-10:]).min())
+        covered_seconds = int(time_values[-1] - time_values[0]) + candle_seconds
+        return -(-covered_seconds // new_seconds)
+
     def convert_timeframe(
-        self, ohlcv_dataframe: pd.DataFrame = None, new_timeframe: str = None
+        self,
+        ohlcv_dataframe: pd.DataFrame = None,
+        new_timeframe: str = None,
+        series_key: tuple = None,
+        source_timeframe: str = None,
+        num_candles: int = None,
+        expected_candles: int = None,
     ) -> pd.DataFrame:
         """
         Converts the OHLCV DataFrame to the desired time frame.
+        With a series_key, the aggregated frame is kept and the next conversion of the same series
+        only aggregates the candles of its open bar and after it (see _convert_incremental).
 
         Parameters:
             ohlcv_dataframe (pd.DataFrame): OHLCV dataframe with the initial time frame.
             new_timeframe (str): Desired time frame for conversion.
+            series_key (tuple): Key of the series the DataFrame is an updated version of (optional).
+            source_timeframe (str): Timeframe of the DataFrame when it is a converted frame of the series (optional).
+            num_candles (int): Number of candles of the new timeframe the DataFrame must cover (optional).
+            expected_candles (int): Number of candles of the new timeframe expected, a shorter coverage is logged (optional).
 
         Returns:
             pd.DataFrame: OHLCV dataframe with aggregated data for the desired time frame.
@@ -155,29 +279,483 @@ class TimeFrameOrg:
 
         ### Check if conversion is possible
         if not self._can_converted(
-            ohlcv_dataframe=ohlcv_dataframe, new_timeframe=new_timeframe
+            ohlcv_dataframe=ohlcv_dataframe,
+            new_timeframe=new_timeframe,
+            num_candles=num_candles,
+            expected_candles=expected_candles,
         ):
             return None
 
         if self.logger is not None:
             self.logger.logger.info("convert_timeframe (function)")
 
+        if series_key is not None and self.engine == "numpy":
+            converted_dataframe = self._convert_incremental(
+                ohlcv_dataframe=ohlcv_dataframe,
+                new_timeframe=new_timeframe,
+                series_key=series_key,
+                source_timeframe=source_timeframe,
+            )
+            if converted_dataframe is not None:
+                return converted_dataframe
+
         # Resample the data to the desired time frame
+        converted_dataframe = getattr(self, RESAMPLE_ENGINES[self.engine])(
+            ohlcv_dataframe=ohlcv_dataframe, new_timeframe=new_timeframe
+        )
+        if converted_dataframe is None:
+            ### Not supported by the engine (e.g. W and M timeframes), use pandas
+            converted_dataframe = self._resample_pandas(
+                ohlcv_dataframe=ohlcv_dataframe, new_timeframe=new_timeframe
+            )
+
+        return converted_dataframe
+
+    def convert_timeframes(
+        self,
+        ohlcv_dataframe: pd.DataFrame = None,
+        new_timeframes: list = None,
+        series_key: tuple = None,
+        num_candles: int = None,
+        expected_candles: int = None,
+    ) -> dict:
+        """
+        Converts the OHLCV DataFrame to several timeframes in one pass.
+        The timeframes are converted from the finest to the coarsest and each one is aggregated from the nearest
+        converted timeframe that divides it (e.g. 5min -> 15min -> 1H -> 4H) instead of from the base DataFrame.
+
+        Parameters:
+            ohlcv_dataframe (pd.DataFrame): OHLCV dataframe with the initial time frame.
+            new_timeframes (list): Desired time frames for conversion.
+            series_key (tuple): Key of the series the DataFrame is an updated version of (optional).
+            num_candles (int): Number of candles of each new timeframe the DataFrame must cover (optional).
+            expected_candles (int): Number of candles of each new timeframe expected, a shorter coverage is logged (optional).
+
+        Returns:
+            dict: Converted DataFrames keyed by timeframe (None if a timeframe can not be converted).
+        """
+        if ohlcv_dataframe is None:
+            ohlcv_dataframe = self.ohlcv_dataframe
+        if not new_timeframes:
+            if self.logger is not None:
+                self.logger.logger.error("New timeframes are not provided.")
+            return {}
+
+        if self.logger is not None:
+            self.logger.logger.info("convert_timeframes (function)")
+
+        ### Fixed-length timeframes from the finest, W and M (no length) last
+        ordered_timeframes = sorted(
+            dict.fromkeys(new_timeframes),
+            key=lambda timeframe: (
+                self._timeframe_seconds(timeframe) is None,
+                self._timeframe_seconds(timeframe) or 0,
+            ),
+        )
+        converted = {}
+        for new_timeframe in ordered_timeframes:
+            converted_dataframe = None
+            source_timeframe = self._cascade_source(
+                new_timeframe=new_timeframe, converted=converted
+            )
+            if source_timeframe is not None:
+                converted_dataframe = self.convert_timeframe(
+                    ohlcv_dataframe=converted[source_timeframe],
+                    new_timeframe=new_timeframe,
+                    series_key=series_key,
+                    source_timeframe=source_timeframe,
+                    num_candles=num_candles,
+                    expected_candles=expected_candles,
+                )
+            if converted_dataframe is None:
+                ### No finer timeframe to cascade from (or it is too short), use the base DataFrame
+                converted_dataframe = self.convert_timeframe(
+                    ohlcv_dataframe=ohlcv_dataframe,
+                    new_timeframe=new_timeframe,
+                    series_key=series_key,
+                    num_candles=num_candles,
+                    expected_candles=expected_candles,
+                )
+            converted[new_timeframe] = converted_dataframe
+
+        return {new_timeframe: converted[new_timeframe] for new_timeframe in new_timeframes}
+
+    @staticmethod
+    def _timeframe_seconds(timeframe: str) -> int | None:
+        """
+        Returns the length of a fixed-length timeframe in seconds, or None for W and M timeframes.
+        """
+        match = TIMEFRAME_PATTERN.match(str(timeframe))
+        if match is None or match.group(2) not in RESAMPLE_UNIT_SECONDS:
+            return None
+        return int(match.group(1)) * RESAMPLE_UNIT_SECONDS[match.group(2)]
+
+    def _cascade_source(self, new_timeframe: str, converted: dict) -> str | None:
+        """
+        Returns the coarsest converted timeframe a timeframe can be aggregated from: a shorter timeframe that
+        divides it, binned on the same clock (D bins are counted on local midnights, shorter bins are not).
+        Both are binned from the local midnight of the first candle, so every bin of the timeframe is
+        the union of whole bins of the source.
+
+        Returns:
+            str | None: The source timeframe, or None if it has to be converted from the base DataFrame.
+        """
+        new_seconds = self._timeframe_seconds(new_timeframe)
+        if new_seconds is None:
+            return None
+
+        source_timeframe, source_seconds = None, 0
+        for timeframe, converted_dataframe in converted.items():
+            seconds = self._timeframe_seconds(timeframe)
+            if (
+                converted_dataframe is None
+                or seconds is None
+                or seconds >= new_seconds
+                or new_seconds % seconds != 0
+                or timeframe.endswith("D") != new_timeframe.endswith("D")
+            ):
+                continue
+            if seconds > source_seconds:
+                source_timeframe, source_seconds = timeframe, seconds
+        return source_timeframe
+
+    def _convert_incremental(
+        self,
+        ohlcv_dataframe: pd.DataFrame,
+        new_timeframe: str,
+        series_key: tuple,
+        source_timeframe: str = None,
+    ) -> pd.DataFrame | None:
+        """
+        Converts a series by updating its aggregated frame from the last call.
+        Closed base candles are never rewritten (see FileManager), so the bars before the open bar are kept;
+        only the first bar (the window start may have moved) and the bars from the open bar on are aggregated.
+        The first call of a series, and any call the kept frame does not fit, resamples the whole series.
+
+        Parameters:
+            ohlcv_dataframe (pd.DataFrame): Updated OHLCV DataFrame of the series.
+            new_timeframe (str): Desired time frame for conversion.
+            series_key (tuple): Key of the series.
+            source_timeframe (str): Timeframe of the DataFrame when it is a converted frame of the series (optional).
+
+        Returns:
+            pd.DataFrame | None: The converted DataFrame, or None if the series is not supported by the
+            NumPy engine (its aggregated frame is dropped).
+        """
+        key = (series_key, source_timeframe, new_timeframe)
+        grid = None
+        if not new_timeframe.endswith("D"):
+            grid = self._resample_grid(
+                ohlcv_dataframe=ohlcv_dataframe, new_timeframe=new_timeframe
+            )
+        if grid is None:
+            ### Days are binned on the local midnights of the whole series (D bases are short anyway)
+            with self._aggregates_lock:
+                self._aggregates.pop(key, None)
+            return None
+        time_values, origin, step, _ = grid
+
+        with self._aggregates_lock:
+            aggregate = self._aggregates.get(key)
+
+        converted_dataframe = None
+        if aggregate is not None:
+            converted_dataframe, labels, counts = self._update_aggregate(
+                ohlcv_dataframe=ohlcv_dataframe,
+                time_values=time_values,
+                origin=origin,
+                step=step,
+                aggregate=aggregate,
+            )
+        if converted_dataframe is None:
+            converted_dataframe, labels, counts = self._aggregate_bins(
+                ohlcv_dataframe=ohlcv_dataframe,
+                time_values=time_values,
+                origin=origin,
+                step=step,
+            )
+        elif self.logger is not None:
+            self.logger.logger.info("_convert_incremental (function)")
+
+        with self._aggregates_lock:
+            if converted_dataframe is None:
+                self._aggregates.pop(key, None)
+            else:
+                self._aggregates[key] = {
+                    "step": step,
+                    "frame": converted_dataframe,
+                    "labels": labels,
+                    "counts": counts,
+                    "last_time": int(time_values[-1]),
+                }
+        return converted_dataframe
+
+    def _update_aggregate(
+        self,
+        ohlcv_dataframe: pd.DataFrame,
+        time_values: np.ndarray,
+        origin: int,
+        step: int,
+        aggregate: dict,
+    ) -> (pd.DataFrame | None, np.ndarray, np.ndarray):
+        """
+        Updates a kept aggregated frame with the updated series: the first bar is aggregated again from
+        the candles left in the window, the bars up to the open bar are kept and the candles from the open bar
+        on are aggregated into the open bar and the new bars.
+
+        Returns:
+            Tuple[pd.DataFrame | None, np.ndarray, np.ndarray]: The converted DataFrame, its bin labels and
+            candle counts, or (None, None, None) if the kept frame does not fit the series.
+        """
+        labels = aggregate["labels"]
+        counts = aggregate["counts"]
+        if (
+            step != aggregate["step"]
+            or (origin - int(labels[0])) % step != 0
+            or int(time_values[-1]) < aggregate["last_time"]
+        ):
+            return None, None, None
+
+        ### First bar of the series and the open bar of the kept frame
+        first_label = int(time_values[0]) - (int(time_values[0]) - origin) % step
+        first_position = int(np.searchsorted(labels, first_label))
+        if (
+            first_position >= len(labels) - 1
+            or int(labels[first_position]) != first_label
+        ):
+            return None, None, None
+        head_end = int(np.searchsorted(time_values, first_label + step))
+        open_start = int(np.searchsorted(time_values, labels[-1]))
+
+        ### The candles between the first and the open bar must be the ones already aggregated
+        if int(counts[first_position + 1 : -1].sum()) != open_start - head_end:
+            return None, None, None
+
+        head_dataframe, head_labels, head_counts = self._aggregate_bins(
+            ohlcv_dataframe=ohlcv_dataframe.iloc[:head_end],
+            time_values=time_values[:head_end],
+            origin=first_label,
+            step=step,
+        )
+        tail_dataframe, tail_labels, tail_counts = self._aggregate_bins(
+            ohlcv_dataframe=ohlcv_dataframe.iloc[open_start:],
+            time_values=time_values[open_start:],
+            origin=int(labels[-1]),
+            step=step,
+        )
+        if head_dataframe is None or tail_dataframe is None:
+            return None, None, None
+
+        kept = slice(first_position + 1, len(labels) - 1)
+        converted_dataframe = pd.concat(
+            [head_dataframe, aggregate["frame"].iloc[kept], tail_dataframe]
+        )
+        return (
+            converted_dataframe,
+            np.concatenate([head_labels, labels[kept], tail_labels]),
+            np.concatenate([head_counts, counts[kept], tail_counts]),
+        )
+
+    def invalidate_aggregates(self, series_key: tuple = None):
+        """
+        Drops the aggregated frames of a series, so its next conversion resamples the whole series.
+        Needed when closed candles of the series are rewritten (e.g. repaired gaps).
+
+        Parameters:
+            series_key (tuple): Key of the series, None drops the frames of all series.
+        """
+        with self._aggregates_lock:
+            if series_key is None:
+                self._aggregates.clear()
+            else:
+                for key in [key for key in self._aggregates if key[0] == series_key]:
+                    del self._aggregates[key]
+
+    def _resample_pandas(
+        self, ohlcv_dataframe: pd.DataFrame, new_timeframe: str
+    ) -> pd.DataFrame:
+        """
+        Resamples the OHLCV DataFrame with DataFrame.resample and drops the empty bins.
+        A timezone-aware index is resampled in the timezone of the instance and returned in its own timezone.
+        """
+        index_timezone = ohlcv_dataframe.index.tz
+        if index_timezone is not None:
+            ohlcv_dataframe = DataFrameOrg._localize_dataframe(
+                ohlcv_dataframe=ohlcv_dataframe, timezone=self.timezone
+            )
         converted_dataframe = ohlcv_dataframe.resample(f"{new_timeframe}").agg(
-            {
-                "Open": "first",
-                "High": "max",
-                "Low": "min",
-                "Close": "last",
-                "Volume": "sum",
-            }
+            AGGREGATIONS
         )
 
         # Drop rows with NaN values (introduced by resampling)
         converted_dataframe = converted_dataframe.dropna()
 
+        if index_timezone is not None:
+            converted_dataframe = DataFrameOrg._localize_dataframe(
+                ohlcv_dataframe=converted_dataframe, timezone=index_timezone
+            )
+        return converted_dataframe
+
+    def _resample_numpy(
+        self, ohlcv_dataframe: pd.DataFrame, new_timeframe: str
+    ) -> pd.DataFrame | None:
+        """
+        Resamples the OHLCV DataFrame in one pass: the bin of every candle is computed once from the int64
+        timestamps, then first/max/min/last/sum are taken per bin with ufunc.reduceat.
+        Bins are aligned like DataFrame.resample in the timezone of the instance (from the local midnight of
+        the first candle, days on local midnights) and only non-empty bins are returned, like the pandas engine
+        after dropna. The index is not converted, the result is in the timezone of the index.
+
+        Returns:
+            pd.DataFrame | None: The resampled DataFrame, or None if the timeframe or the data
+            is not supported (W and M timeframes, unsorted index, NaN values).
+        """
+        grid = self._resample_grid(
+            ohlcv_dataframe=ohlcv_dataframe, new_timeframe=new_timeframe
+        )
+        if grid is None:
+            return None
+        time_values, origin, step, anchors = grid
+        converted_dataframe, _, _ = self._aggregate_bins(
+            ohlcv_dataframe=ohlcv_dataframe,
+            time_values=time_values,
+            origin=origin,
+            step=step,
+            anchors=anchors,
+        )
         return converted_dataframe
 
+    def _resample_grid(self, ohlcv_dataframe: pd.DataFrame, new_timeframe: str) -> tuple | None:
+        """
+        Returns the bin grid of the NumPy engine: the int64 candle times (UTC nanoseconds; for D, the wall clock
+        time of the local midnight of each candle), the origin of the bins (local midnight of the first candle),
+        the bin length in nanoseconds and the day anchors of D timeframes (None otherwise).
+        A naive index is binned on its own clock. None if the timeframe or the index is not supported.
+        """
+        match = TIMEFRAME_PATTERN.match(str(new_timeframe))
+        if match is None or match.group(2) not in RESAMPLE_UNIT_SECONDS:
+            return None
+        index = ohlcv_dataframe.index
+        if not isinstance(index, pd.DatetimeIndex) or not index.is_monotonic_increasing:
+            return None
+
+        step = int(match.group(1)) * RESAMPLE_UNIT_SECONDS[match.group(2)] * 10**9
+        time_values = index.asi8
+        if index.tz is None:
+            anchors = None
+            origin = index[0].normalize().value
+        elif match.group(2) == "D":
+            ### Days are counted on the local midnights: the kept midnights are searched in the candles
+            ### (one search per day) and each candle takes the wall clock midnight of its day
+            anchors = self._day_anchors(
+                first_time=int(time_values[0]), last_time=int(time_values[-1])
+            )
+            if anchors is None:
+                return None
+            midnights, walls = anchors
+            day_starts = np.searchsorted(time_values, midnights)
+            time_values = np.repeat(walls[:-1], np.diff(day_starts))
+            origin = int(time_values[0])
+        else:
+            anchors = None
+            origin = (
+                pd.Timestamp(int(time_values[0]), tz="UTC")
+                .tz_convert(self.timezone)
+                .normalize()
+                .value
+            )
+        return time_values, origin, step, anchors
+
+    def _day_anchors(self, first_time: int, last_time: int) -> tuple | None:
+        """
+        Returns the local midnights of the timezone from the day of first_time to the day after last_time
+        (and DAY_ANCHOR_MARGIN_DAYS more), as int64 nanoseconds: their UTC times and their wall clock times.
+        They are computed once and kept until a series ends after them, so binning days does no timezone work.
+
+        Returns:
+            tuple | None: (UTC times, wall clock times), or None if a local midnight does not exist or is
+            ambiguous (DST), the D timeframe is then resampled with pandas.
+        """
+        anchors = self._anchors
+        if anchors is not None and anchors[0][0] <= first_time and last_time < anchors[0][-1]:
+            return anchors
+
+        first_day, last_day = (
+            pd.Timestamp(time_value, tz="UTC")
+            .tz_convert(self.timezone)
+            .tz_localize(None)
+            .normalize()
+            for time_value in (first_time, last_time)
+        )
+        for margin_days in (DAY_ANCHOR_MARGIN_DAYS, 0):
+            walls = pd.date_range(
+                first_day, last_day + pd.Timedelta(days=1 + margin_days), freq="D"
+            )
+            try:
+                midnights = walls.tz_localize(
+                    self.timezone, ambiguous="raise", nonexistent="raise"
+                )
+            except Exception:
+                continue
+            self._anchors = (midnights.asi8, walls.asi8)
+            return self._anchors
+        return None
+
+    @staticmethod
+    def _aggregate_bins(
+        ohlcv_dataframe: pd.DataFrame,
+        time_values: np.ndarray,
+        origin: int,
+        step: int,
+        anchors: tuple = None,
+    ) -> (pd.DataFrame | None, np.ndarray, np.ndarray):
+        """
+        Aggregates the candles into the non-empty bins of the grid (origin + k * step) with ufunc.reduceat.
+        With the day anchors of the grid, the labels are wall clock midnights and are mapped to their UTC times.
+
+        Returns:
+            Tuple[pd.DataFrame | None, np.ndarray, np.ndarray]: The aggregated DataFrame (None if the data
+            is not supported), the bin labels (in the time_values clock) and the number of candles of each bin.
+        """
+        index = ohlcv_dataframe.index
+        ### Column views, no copy of the frame
+        columns = [ohlcv_dataframe[column].to_numpy() for column in AGGREGATIONS]
+        if np.isnan(columns[0]).any() or np.isnan(columns[3]).any():
+            return None, None, None
+
+        bins = (time_values - origin) // step
+        starts = np.flatnonzero(np.diff(bins)) + 1
+        starts = np.concatenate([[0], starts])
+        ends = np.concatenate([starts[1:], [len(bins)]]) - 1
+        labels = origin + bins[starts] * step
+
+        converted_values = np.column_stack(
+            [
+                columns[0][starts],
+                np.maximum.reduceat(columns[1], starts),
+                np.minimum.reduceat(columns[2], starts),
+                columns[3][ends],
+                np.add.reduceat(columns[4], starts),
+            ]
+        )
+        if np.isnan(converted_values).any():
+            ### NaN values are skipped by pandas, not by the kernels
+            return None, None, None
+
+        label_values = labels
+        if anchors is not None:
+            midnights, walls = anchors
+            label_values = midnights[np.searchsorted(walls, labels)]
+        converted_index = pd.DatetimeIndex(
+            label_values.view("datetime64[ns]"), name=index.name
+        )
+        if index.tz is not None:
+            converted_index = converted_index.tz_localize("UTC").tz_convert(index.tz)
+        converted_dataframe = pd.DataFrame(
+            converted_values, index=converted_index, columns=list(AGGREGATIONS), copy=False
+        )
+        return converted_dataframe, labels, ends - starts + 1
+
     def __del__(self):
         """
         Destructor, logs a message when the instance is deleted.
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+import sys
+import os
+
+file_path = os.path.abspath(__file__)
+folder_path = os.path.dirname(file_path)
+app_directory = os.path.abspath(os.path.join(folder_path, os.pardir))
+
+sys.path.append(app_directory)
+from TF_Generator.HistoryFetch import ExchangeAPI
+from TF_Generator.ManagerLogger import LoggerManager
+from TF_Generator.MockExchange import MockExchangeServer
+
+### MOCK_RATE_LIMIT (dict): Request budget of every exchange while the mock server runs (no throttling).
+MOCK_RATE_LIMIT = {"budget": 100000, "period": 1}
+
+
+@pytest.fixture(scope="session")
+def logger(tmp_path_factory):
+    ### Keep the log files out of the repository
+    return LoggerManager(log_directory=str(tmp_path_factory.mktemp("log_files")))
+
+
+@pytest.fixture
+def mock_exchange():
+    """
+    MockExchangeServer pointed at by every exchange of ExchangeAPI, with an unthrottled request budget.
+    The budgets of the shared scheduler are restored afterwards.
+    """
+    scheduler = ExchangeAPI.SCHEDULER
+    rate_limits = {
+        exchange: dict(scheduler._rate_limit(exchange)) for exchange in ExchangeAPI.BASE_URL
+    }
+    for exchange in ExchangeAPI.BASE_URL:
+        scheduler.configure(exchange, **MOCK_RATE_LIMIT)
+
+    with MockExchangeServer() as server:
+        yield server
+
+    for exchange, limit in rate_limits.items():
+        scheduler.configure(exchange, budget=limit["budget"], period=limit["period"])
+
+
+def _make_ohlcv(
+    periods: int,
+    freq: str = "min",
+    start: str = "2024-03-01 00:07",
+    timezone: str = "UTC",
+    drop_share: float = 0.0,
+    timestamp: bool = False,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Random OHLCV DataFrame indexed by Datetime, optionally with a share of the candles missing.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=periods, freq=freq, tz="UTC", name="Datetime")
+    if drop_share:
+        keep = np.sort(rng.choice(periods, int(periods * (1 - drop_share)), replace=False))
+        index = index[keep]
+    close = 1000 + rng.random(len(index)) * 100
+    ohlcv_dataframe = pd.DataFrame(
+        {
+            "Open": close - rng.random(len(index)),
+            "High": close + rng.random(len(index)) + 1,
+            "Low": close - rng.random(len(index)) - 1,
+            "Close": close,
+            "Volume": rng.random(len(index)) * 10,
+        },
+        index=index.tz_convert(timezone),
+    )
+    if timestamp:
+        ohlcv_dataframe.insert(0, "TimeStamp", (index.asi8 // 10**9).astype(float))
+    return ohlcv_dataframe
+
+
+@pytest.fixture
+def make_ohlcv():
+    return _make_ohlcv
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from TF_Generator.GenerateTimeFrame import GenerateOHLCV
+
+### GAP_EXCHANGES (list): (exchange, symbol) repaired through the mock, one per payload dialect.
+GAP_EXCHANGES = [
+    ("Binance", "BTCUSDT"),
+    ("Coinbase", "BTC-USDT"),
+    ("Wallex", "BTCUSDT"),
+    ("BingX", "BTC-USDT"),
+]
+
+
+@pytest.mark.parametrize("exchange, symbol", GAP_EXCHANGES)
+def test_repair_fills_missing_candles(mock_exchange, logger, tmp_path, exchange, symbol):
+    ohlcv_object = GenerateOHLCV(
+        symbol=symbol,
+        timeframe="5min",
+        exchange=exchange,
+        num_candles=1000,
+        data_directory=str(tmp_path),
+        enable_cache=False,
+        logger=logger,
+    )
+    ### The merged series is trimmed to the actual candles, like every update
+    actual_candles = ohlcv_object.reg_input_values_instance._actual_candles()
+    full = ohlcv_object.dataframe_release().iloc[-actual_candles:].copy()
+    dropped = np.r_[100:105, 110:112, 1500:1800, 2500:2501]
+    ohlcv_object.ohlcv_df = full.drop(full.index[dropped])
+
+    requests = mock_exchange.requests[exchange]
+    report = ohlcv_object.repair_gaps()
+
+    assert report["gaps"] == 4
+    assert report["missing"] == len(dropped)
+    assert report["filled"] == len(dropped)
+    assert not report["unfilled"]
+    assert mock_exchange.requests[exchange] - requests == report["requests"]
+    ### The series is kept in UTC, the released DataFrame is in the display timezone
+    pd.testing.assert_frame_equal(ohlcv_object.ohlcv_df, full.tz_convert("UTC"), check_freq=False)
+
+    ### Nothing is left to repair
+    requests = mock_exchange.requests[exchange]
+    assert ohlcv_object.repair_gaps()["gaps"] == 0
+    assert mock_exchange.requests[exchange] == requests
+
+
+def gapped_object(logger, tmp_path, exchange: str, symbol: str) -> (GenerateOHLCV, pd.DataFrame):
+    ohlcv_object = GenerateOHLCV(
+        symbol=symbol,
+        timeframe="5min",
+        exchange=exchange,
+        num_candles=1000,
+        data_directory=str(tmp_path),
+        enable_cache=False,
+        logger=logger,
+    )
+    full = ohlcv_object.dataframe_release().copy()
+    ohlcv_object.ohlcv_df = full.drop(full.index[200:210])
+    return ohlcv_object, full
+
+
+def test_repair_keeps_ranges_the_exchange_can_not_fill(mock_exchange, logger, tmp_path, monkeypatch):
+    ohlcv_object, full = gapped_object(logger, tmp_path, exchange="Wallex", symbol="BTCUSDT")
+    ### The exchange answers the gap window without candles
+    monkeypatch.setattr(mock_exchange, "_candles", lambda *args, **kwargs: np.empty((0, 6)))
+
+    report = ohlcv_object.repair_gaps()
+
+    assert report["filled"] == 0
+    assert report["unfilled"] == 1
+    assert len(ohlcv_object.ohlcv_df) == len(full) - 10
+
+    ### Unfilled ranges are not requested again
+    requests = mock_exchange.requests["Wallex"]
+    assert ohlcv_object.repair_gaps()["requests"] == 0
+    assert mock_exchange.requests["Wallex"] == requests
+
+
+def test_repair_requests_failed_windows_again(mock_exchange, logger, tmp_path, monkeypatch):
+    ohlcv_object, full = gapped_object(logger, tmp_path, exchange="Binance", symbol="BTCUSDT")
+    monkeypatch.setattr(mock_exchange, "_fail_status", lambda: 500)
+
+    report = ohlcv_object.repair_gaps()
+
+    assert report["filled"] == 0
+    assert report["unfilled"] == 0
+
+    monkeypatch.setattr(mock_exchange, "_fail_status", lambda: None)
+    report = ohlcv_object.repair_gaps()
+
+    assert report["requests"] == 1
+    assert report["filled"] == 10
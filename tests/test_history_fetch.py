@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+import time
+
+from TF_Generator.GenerateTimeFrame import GenerateOHLCV
+from TF_Generator.HistoryFetch import ExchangeAPI, HistoryOHLCV, MAX_RATE_LIMIT_RETRIES
+from TF_Generator.OrganizerDataFrame import DataFrameOrg
+
+### PAGED_EXCHANGES (list): (exchange, symbol, one minute interval) of the exchanges with a page limit.
+PAGED_EXCHANGES = [
+    ("Binance", "BTCUSDT", "1m"),
+    ("Coinbase", "BTC-USDT", "60"),
+    ("BingX", "BTC-USDT", "1m"),
+]
+
+
+def closed_window(candles: int, seconds_interval: int = 60) -> (int, int):
+    ### Closed candles only, so the mock never cuts the window at the open candle
+    end = (int(time.time()) // seconds_interval - 10) * seconds_interval
+    return end - (candles - 1) * seconds_interval, end
+
+
+@pytest.mark.parametrize("exchange, symbol, interval", PAGED_EXCHANGES)
+def test_backfill_pages_and_stitches(mock_exchange, logger, exchange, symbol, interval):
+    page_limit = HistoryOHLCV.PAGE_LIMIT[exchange]
+    candles = page_limit * 3 + page_limit // 2
+    start, end = closed_window(candles)
+
+    payload = HistoryOHLCV().get_ohlcv_backfill(
+        exchange=exchange,
+        symbol=symbol,
+        interval=interval,
+        startTime=start,
+        endTime=end,
+        seconds_interval=60,
+    )
+
+    ### One request per page, and the pages are stitched in time order without overlap
+    assert mock_exchange.requests[exchange] == -(-candles // page_limit)
+    ohlcv_dataframe = DataFrameOrg(logger=logger)._decode_market_history(exchange, payload)
+    assert ohlcv_dataframe.index.is_monotonic_increasing
+    assert ohlcv_dataframe.index.is_unique
+    expected = mock_exchange._candles(exchange, symbol, 60, start, end)
+    assert len(ohlcv_dataframe) == candles
+    np.testing.assert_allclose(ohlcv_dataframe.to_numpy(), expected)
+
+
+def test_release_backfills_more_than_one_page(mock_exchange, logger, tmp_path):
+    page_limit = HistoryOHLCV.PAGE_LIMIT["Binance"]
+    num_candles = page_limit * 2 + 500
+    ohlcv_object = GenerateOHLCV(
+        symbol="BTCUSDT",
+        timeframe="1min",
+        exchange="Binance",
+        num_candles=num_candles,
+        data_directory=str(tmp_path),
+        enable_cache=False,
+        logger=logger,
+    )
+    ohlcv_dataframe = ohlcv_object.dataframe_release()
+
+    ### The requested candles and the open one, on an unbroken minute grid
+    assert len(ohlcv_dataframe) >= num_candles
+    assert mock_exchange.requests["Binance"] == -(-len(ohlcv_dataframe) // page_limit)
+    assert (np.diff(ohlcv_dataframe.index.asi8) == 60 * 10**9).all()
+    expected = mock_exchange._synthetic_candles(
+        "BTCUSDT", ohlcv_dataframe.index.asi8 // 10**9, 60
+    )
+    np.testing.assert_allclose(ohlcv_dataframe.to_numpy(), expected)
+
+
+def test_rate_limit_response_backs_off_for_retry_after(mock_exchange, monkeypatch):
+    statuses = iter([429])
+    monkeypatch.setattr(mock_exchange, "_fail_status", lambda: next(statuses, None))
+    backoffs = ExchangeAPI.SCHEDULER.stats("Binance")["backoffs"]
+    start, end = closed_window(10)
+
+    started = time.monotonic()
+    payload = HistoryOHLCV().get_ohlcv_history(
+        exchange="Binance", symbol="BTCUSDT", interval="1m", startTime=start, endTime=end
+    )
+
+    ### The mock answers 429 with "Retry-After: 1"
+    assert time.monotonic() - started >= 1.0
+    assert mock_exchange.requests["Binance"] == 2
+    assert ExchangeAPI.SCHEDULER.stats("Binance")["backoffs"] == backoffs + 1
+    assert len(payload) == 10
+
+
+def test_rate_limit_retries_are_capped(mock_exchange, monkeypatch):
+    monkeypatch.setattr(mock_exchange, "_fail_status", lambda: 429)
+    monkeypatch.setattr(ExchangeAPI, "_retry_after", staticmethod(lambda headers: 0.05))
+    backoffs = ExchangeAPI.SCHEDULER.stats("Binance")["backoffs"]
+    start, end = closed_window(10)
+
+    payload = HistoryOHLCV().get_ohlcv_history(
+        exchange="Binance", symbol="BTCUSDT", interval="1m", startTime=start, endTime=end
+    )
+
+    assert mock_exchange.requests["Binance"] == MAX_RATE_LIMIT_RETRIES + 1
+    assert ExchangeAPI.SCHEDULER.stats("Binance")["backoffs"] == backoffs + MAX_RATE_LIMIT_RETRIES
+    assert payload["code"] == 429
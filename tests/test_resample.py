@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+import warnings
+
+from TF_Generator.OrganizerTimeFrame import AGGREGATIONS, TimeFrameOrg
+
+### TIMEZONES (list): Display timezones the bins are counted in (Asia/Tehran has a half-hour offset).
+TIMEZONES = ["UTC", "Asia/Tehran", "America/New_York"]
+### MINUTE_TIMEFRAMES (list): Timeframes converted from a minute series.
+MINUTE_TIMEFRAMES = ["5min", "7min", "15min", "45min", "1H", "4H", "1D"]
+### CASCADE_TIMEFRAMES (list): Timeframes released together, in no particular order.
+CASCADE_TIMEFRAMES = ["30min", "5min", "4H", "15min", "1H", "7min", "1D", "2D"]
+
+
+@pytest.fixture(autouse=True)
+def ignore_frequency_warnings():
+    ### pandas 2.2 deprecates the "H" alias the exchanges use
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        yield
+
+
+def pandas_resample(ohlcv_dataframe: pd.DataFrame, new_timeframe: str, timezone: str) -> pd.DataFrame:
+    """
+    Reference conversion: DataFrame.resample in the display timezone, without the empty bins.
+    """
+    converted_dataframe = (
+        ohlcv_dataframe.tz_convert(timezone).resample(new_timeframe).agg(AGGREGATIONS).dropna()
+    )
+    return converted_dataframe.tz_convert(ohlcv_dataframe.index.tz)
+
+
+def assert_same_bars(result: pd.DataFrame, expected: pd.DataFrame) -> None:
+    assert result.index.equals(expected.index)
+    ### Open, High, Low and Close are picked, not computed: they must match exactly
+    np.testing.assert_array_equal(result.iloc[:, :4].to_numpy(), expected.iloc[:, :4].to_numpy())
+    np.testing.assert_allclose(result["Volume"].to_numpy(), expected["Volume"].to_numpy(), rtol=1e-12)
+
+
+@pytest.mark.parametrize("timezone", TIMEZONES)
+@pytest.mark.parametrize("new_timeframe", MINUTE_TIMEFRAMES)
+def test_numpy_engine_matches_pandas(logger, make_ohlcv, timezone, new_timeframe):
+    ohlcv_dataframe = make_ohlcv(periods=20000, drop_share=0.2)
+    tf_organizer = TimeFrameOrg(exchange="Binance", logger=logger, timezone=timezone)
+
+    converted_dataframe = tf_organizer._resample_numpy(
+        ohlcv_dataframe=ohlcv_dataframe, new_timeframe=new_timeframe
+    )
+
+    ### Fixed-length timeframes never fall back to the pandas engine
+    assert converted_dataframe is not None
+    assert_same_bars(converted_dataframe, pandas_resample(ohlcv_dataframe, new_timeframe, timezone))
+
+
+@pytest.mark.parametrize("new_timeframe", ["15min", "7min", "1H"])
+def test_incremental_conversion_matches_pandas(logger, make_ohlcv, new_timeframe):
+    full = make_ohlcv(periods=12000, timezone="Asia/Tehran")
+    tf_organizer = TimeFrameOrg(exchange="Binance", logger=logger, timezone="Asia/Tehran")
+
+    ### A sliding window whose last (open) candle changes between the updates
+    for first in range(0, 2000, 37):
+        ohlcv_dataframe = full.iloc[first : 10000 + first].copy()
+        ohlcv_dataframe.iloc[-1, 1] += 5.0
+        converted_dataframe = tf_organizer.convert_timeframe(
+            ohlcv_dataframe=ohlcv_dataframe, new_timeframe=new_timeframe, series_key=("BTCUSDT",)
+        )
+        assert_same_bars(
+            converted_dataframe, pandas_resample(ohlcv_dataframe, new_timeframe, "Asia/Tehran")
+        )
+
+
+def test_incremental_conversion_after_filled_gap(logger, make_ohlcv):
+    full = make_ohlcv(periods=1200)
+    tf_organizer = TimeFrameOrg(exchange="Binance", logger=logger)
+
+    tf_organizer.convert_timeframe(
+        ohlcv_dataframe=full.drop(full.index[500:510]).iloc[:1000],
+        new_timeframe="5min",
+        series_key=("BTCUSDT",),
+    )
+    converted_dataframe = tf_organizer.convert_timeframe(
+        ohlcv_dataframe=full.iloc[:1005], new_timeframe="5min", series_key=("BTCUSDT",)
+    )
+
+    assert_same_bars(converted_dataframe, pandas_resample(full.iloc[:1005], "5min", "UTC"))
+
+
+@pytest.mark.parametrize("timezone", TIMEZONES)
+def test_cascade_matches_pandas(logger, make_ohlcv, timezone):
+    full = make_ohlcv(periods=12000, drop_share=0.05, seed=1)
+    tf_organizer = TimeFrameOrg(exchange="Binance", logger=logger, timezone=timezone)
+
+    for first in range(0, 1500, 251):
+        ohlcv_dataframe = full.iloc[first : 10000 + first]
+        converted = tf_organizer.convert_timeframes(
+            ohlcv_dataframe=ohlcv_dataframe,
+            new_timeframes=CASCADE_TIMEFRAMES,
+            series_key=("BTCUSDT",),
+        )
+        assert list(converted) == CASCADE_TIMEFRAMES
+        for new_timeframe, converted_dataframe in converted.items():
+            assert_same_bars(
+                converted_dataframe, pandas_resample(ohlcv_dataframe, new_timeframe, timezone)
+            )
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from TF_Generator.OrganizerDataFrame import CandleRingBuffer, DataFrameOrg
+
+### CAPACITY (int): Actual candles of the tested series.
+CAPACITY = 5000
+
+
+@pytest.fixture
+def df_organizer(logger):
+    return DataFrameOrg(logger=logger)
+
+
+def candles(df_organizer: DataFrameOrg, first_time: int, count: int, seed: int, compact: bool = False) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    times = (first_time + 60 * np.arange(count)).astype(float)
+    ohlcv_dataframe = df_organizer._build_dataframe(np.column_stack([times, rng.random((count, 5))]))
+    return df_organizer._compact_dataframe(ohlcv_dataframe) if compact else ohlcv_dataframe
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_ring_buffer_matches_concat(df_organizer, compact):
+    first_time = 1_700_000_040
+    candle_buffer = CandleRingBuffer(capacity=CAPACITY)
+    buffered = concatenated = candles(df_organizer, first_time, CAPACITY, seed=0, compact=compact)
+    last_time = first_time + 60 * (CAPACITY - 1)
+    rng = np.random.default_rng(1)
+
+    ### Each update rewrites the open candle and appends 0-3 new ones
+    for step in range(300):
+        new_candles = int(rng.integers(0, 4))
+        new_data = candles(df_organizer, last_time, new_candles + 1, seed=step + 2, compact=compact)
+        last_time += 60 * new_candles
+
+        buffered = df_organizer._concatenate_dataframe(
+            buffered, new_data, CAPACITY, candle_buffer=candle_buffer
+        )
+        concatenated = df_organizer._concatenate_dataframe(concatenated, new_data, CAPACITY)
+        pd.testing.assert_frame_equal(buffered, concatenated, check_freq=False)
+
+
+def test_ring_buffer_falls_back_for_filled_gap(df_organizer):
+    full = candles(df_organizer, 1_700_000_040, 10, seed=0)
+    with_gap = full.drop(full.index[5])
+    candle_buffer = CandleRingBuffer(capacity=20)
+    candle_buffer.load(with_gap)
+
+    ### A candle older than the last one that is not in the buffer can not be upserted
+    assert not candle_buffer.upsert(full.iloc[5:6])
+    assert len(candle_buffer) == 9
+
+    filled = df_organizer._concatenate_dataframe(
+        with_gap, full.iloc[5:6], 20, candle_buffer=candle_buffer
+    )
+    pd.testing.assert_frame_equal(filled, full, check_freq=False)
+    assert candle_buffer.holds(filled) or len(candle_buffer) == 10
+
+
+def test_ring_buffer_keeps_the_last_candles(df_organizer):
+    full = candles(df_organizer, 1_700_000_040, 10, seed=0)
+    candle_buffer = CandleRingBuffer(capacity=5)
+    candle_buffer.load(full.iloc[:3])
+
+    assert candle_buffer.upsert(full.iloc[3:])
+    pd.testing.assert_frame_equal(candle_buffer.to_dataframe(), full.iloc[-5:], check_freq=False)
@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+import time
+
+from TF_Generator.ManagerFile import FileManager, STORAGE_FUNCTIONS, STORE_FORMATS
+
+### STORAGE_FORMATS (list): Every storage format of FileManager.
+STORAGE_FORMATS = list(STORAGE_FUNCTIONS)
+### FILE_FORMATS (list): Storage formats that keep the trimmed window of the series (not the whole history).
+FILE_FORMATS = [storage_format for storage_format in STORAGE_FORMATS if storage_format not in STORE_FORMATS]
+
+
+@pytest.fixture
+def ohlcv_frames(make_ohlcv):
+    ### Minute series across a month boundary, so the partitioned store writes two partitions
+    full = make_ohlcv(periods=400, start="2024-01-31 22:00", timestamp=True)
+    return lambda first, last: full.iloc[first:last].copy()
+
+
+def read_back(
+    tmp_path, logger, storage_format: str, window: pd.DataFrame = None, file_name: str = "BTCUSDT-1min"
+) -> pd.DataFrame:
+    ### A new FileManager reads what is on disk, not the flushed state of the writer
+    file_manager = FileManager(
+        data_directory=str(tmp_path), logger=logger, storage_format=storage_format
+    )
+    if window is None:
+        return file_manager._read_df_ohlcv(file_name=file_name)
+    ### Like a release, only the rows of the window (trimmed rows stay on disk until a compaction)
+    return file_manager._read_df_ohlcv(
+        file_name=file_name,
+        start=int(window.index[0].timestamp()),
+        end=int(window.index[-1].timestamp()),
+    )
+
+
+def assert_same_frame(result: pd.DataFrame, expected: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+@pytest.mark.parametrize("storage_format", STORAGE_FORMATS)
+def test_round_trip(tmp_path, logger, ohlcv_frames, storage_format):
+    file_manager = FileManager(
+        data_directory=str(tmp_path), logger=logger, storage_format=storage_format
+    )
+    file_manager._save_df_ohlcv(file_name="BTCUSDT-1min", ohlcv_dataframe=ohlcv_frames(0, 200))
+    file_manager._wait_compactions()
+
+    assert_same_frame(read_back(tmp_path, logger, storage_format), ohlcv_frames(0, 200))
+
+
+@pytest.mark.parametrize("storage_format", STORAGE_FORMATS)
+def test_incremental_saves(tmp_path, logger, ohlcv_frames, storage_format):
+    file_manager = FileManager(
+        data_directory=str(tmp_path), logger=logger, storage_format=storage_format
+    )
+    ### Appended candles, then a trimmed window, then a rewritten open candle
+    last_frame = ohlcv_frames(30, 300)
+    last_frame.iloc[-1, 1:] += 1.0
+    for ohlcv_dataframe in (ohlcv_frames(0, 200), ohlcv_frames(0, 260), ohlcv_frames(30, 300), last_frame):
+        file_manager._save_df_ohlcv(file_name="BTCUSDT-1min", ohlcv_dataframe=ohlcv_dataframe)
+    file_manager._wait_compactions()
+
+    assert_same_frame(read_back(tmp_path, logger, storage_format, window=last_frame), last_frame)
+
+
+@pytest.mark.parametrize("storage_format", sorted(STORE_FORMATS))
+def test_store_replaces_only_matching_rows(tmp_path, logger, ohlcv_frames, storage_format):
+    file_manager = FileManager(
+        data_directory=str(tmp_path), logger=logger, storage_format=storage_format
+    )
+    file_manager._save_df_ohlcv(file_name="BTCUSDT-1min", ohlcv_dataframe=ohlcv_frames(0, 300))
+    expected = ohlcv_frames(0, 300)
+    expected.iloc[[50, 120, 250], 1:] += 1.0
+    file_manager._save_store(file_name="BTCUSDT-1min", ohlcv_dataframe=expected.iloc[[50, 120, 250]])
+
+    assert_same_frame(read_back(tmp_path, logger, storage_format), expected)
+
+
+@pytest.mark.parametrize("storage_format", FILE_FORMATS)
+def test_append_during_compaction(tmp_path, logger, ohlcv_frames, monkeypatch, storage_format):
+    compact = FileManager._compact
+
+    def slow_compact(self, *args, **kwargs):
+        time.sleep(0.3)
+        return compact(self, *args, **kwargs)
+
+    monkeypatch.setattr(FileManager, "_compact", slow_compact)
+    file_manager = FileManager(
+        data_directory=str(tmp_path), logger=logger, storage_format=storage_format
+    )
+    file_manager._save_df_ohlcv(file_name="BTCUSDT-1min", ohlcv_dataframe=ohlcv_frames(0, 100))
+    ### The trimmed rows start a background compaction, the next save appends while it runs
+    file_manager._save_df_ohlcv(file_name="BTCUSDT-1min", ohlcv_dataframe=ohlcv_frames(20, 110))
+    file_manager._save_df_ohlcv(file_name="BTCUSDT-1min", ohlcv_dataframe=ohlcv_frames(21, 115))
+    file_manager._wait_compactions()
+
+    expected = ohlcv_frames(21, 115)
+    assert_same_frame(read_back(tmp_path, logger, storage_format, window=expected), expected)